@@ -1,31 +1,122 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import (
-    JWTManager,
     jwt_required,
-    get_jwt_identity,
-    create_access_token,
-    get_jwt
+    get_jwt_identity
 )
-from bson.objectid import ObjectId
-from datetime import datetime
 import os
-from werkzeug.utils import secure_filename
-from models import init_db, create_user, find_user
+import threading
+import click
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.local import LocalProxy
+from werkzeug.middleware.proxy_fix import ProxyFix
+import handlers
+from models import init_db, LISTING_CARD_FIELDS
+from validation import ValidationError
 from auth import auth_bp, role_required
+from pagination import paginate, InvalidCursor
+from search import search_results
+from media import (
+    ImageProcessor,
+    UploadRequest,
+    create_media_storage,
+    image_url,
+    send_media,
+    sweep_stale_uploads
+)
+from geo import PostalCentroids, near_results
+from indexes import ensure_indexes, verify_query_plans
+from migrations import migrate_embedded_adoption_requests, backfill_listing_locations
+from cache import create_response_cache
+from stats import reconcile_stats, start_reconciler
+from streaming import stream_documents, wants_ndjson
+from archive import ListingArchiver, export_pipeline, requester_history_pipeline
+from events import SSE_HEADERS, EventBroker, event_stream
+from serialization import BSONJSONProvider
+from telemetry import Telemetry
+from hashing import PasswordHasher
+from tokens import CachingJWTManager, VerifiedTokenCache, create_stream_token
+from ratelimit import RateLimiter, busy_response, rate_limited
+from config import load_config
+
+jwt = CachingJWTManager()
+api_bp = Blueprint('api', __name__, cli_group=None)
+
+# Per-app services live in app.config, as auth.py reads them; the proxies
+# keep the route bodies short
+mongo = LocalProxy(lambda: current_app.config["mongo"])
+media_storage = LocalProxy(lambda: current_app.config["media_storage"])
+image_processor = LocalProxy(lambda: current_app.config["image_processor"])
+listing_cache = LocalProxy(lambda: current_app.config["listing_cache"])
+event_broker = LocalProxy(lambda: current_app.config["event_broker"])
+
+def create_app(config=None):
+    """Build the Flask app; ``config`` overrides the environment settings.
+
+    Nothing here connects to MongoDB or starts a thread, so the module is
+    cheap to import and the app is safe to preload in a pre-fork server:
+    the client is created on first use and the background threads on the
+    first request of each worker process.
+    """
+    app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.json = BSONJSONProvider(app)
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": ["http://localhost:3000"],
+            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE"],
+            "allow_headers": ["Content-Type", "Authorization"],
+            "supports_credentials": True,
+            "max_age": 86400
+        }
+    })
+    app.after_request(after_request)
+
+    # --- Configuration
+    load_config(app.config)
+    app.config.update(config or {})
+    # Client address and scheme from the trusted proxies' X-Forwarded-* headers
+    if app.config["TRUSTED_PROXY_HOPS"]:
+        hops = app.config["TRUSTED_PROXY_HOPS"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # --- Request telemetry; the command listener times every Mongo call
+    telemetry = Telemetry(app)
+
+    # --- MongoDB, connected lazily in each process
+    connection = init_db(app, event_listeners=[telemetry.command_listener])
+    app.config["mongo"] = connection
+    app.config["media_storage"] = create_media_storage(app.config, connection)
+    sweep_stale_uploads(app.config["media_storage"].tmp_dir)
+    app.config["image_processor"] = ImageProcessor.from_config(app.config, app.config["media_storage"])
+
+    # --- Password hashing runs off the request threads
+    app.config["password_hasher"] = PasswordHasher.from_config(app.config)
+    app.config["postal_centroids"] = PostalCentroids.from_config(app.config)
+
+    # --- Decoded claims of recently verified tokens, per process
+    app.config["token_cache"] = VerifiedTokenCache.from_config(app.config)
+
+    # --- Server-sent events for request and listing changes
+    app.config["event_broker"] = EventBroker(app.config["EVENTS_MAX_STREAMS"])
+
+    # --- Public listing feed cache, invalidated by every write that changes it
+    app.config["listing_cache"] = create_response_cache(app)
+
+    # --- Moves adopted and stale listings to the archive collections
+    app.config["listing_archiver"] = ListingArchiver.from_config(app.config, connection, telemetry.metrics)
+
+    # --- Per-process threads, started by start_background_work
+    app.extensions["petpal"] = {"pid": None, "lock": threading.Lock()}
+
+    # --- Write quotas and load shedding for the @rate_limited views
+    app.config["rate_limiter"] = RateLimiter.from_config(app.config)
+
+    jwt.init_app(app)
+    app.register_blueprint(auth_bp, url_prefix="/api")
+    app.register_blueprint(api_bp)
+    return app
 
-app = Flask(__name__)
-CORS(app, resources={
-    r"/api/*": {
-        "origins": ["http://localhost:3000"],
-        "methods": ["GET", "POST", "PUT", "PATCH", "DELETE"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "supports_credentials": True,
-        "max_age": 86400
-    }
-})
-
-@app.after_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', 'http://localhost:3000')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
@@ -34,487 +125,319 @@ def after_request(response):
     response.headers.add('Access-Control-Max-Age', '86400')
     return response
 
-# --- Configuration
-app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "super-secret-key")
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = False 
-app.config["JWT_SUBJECT_CLAIM"] = None 
-app.config["JWT_IDENTITY_CLAIM"] = "identity"  
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
-
-# --- Initialize MongoDB
-mongo = init_db(app)
-app.config["mongo"] = mongo
-
-# --- Initialize JWT
-jwt = JWTManager(app)
-
-@jwt.additional_claims_loader
-def add_additional_claims(identity):
-    return {
-        "iss": "pet-pal-app",
-        "aud": "pet-pal-users",
-        "identity": identity
-    }
-
-@jwt.token_verification_loader
-def custom_token_verification(jwt_header, jwt_data):
-    jwt_data.pop('sub', None)
-    return jwt_data
-
-# --- Register authentication blueprint
-app.register_blueprint(auth_bp, url_prefix="/api")
-
-def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
-
-@app.route('/uploads/<filename>')
+def prepare_database(app):
+    """Apply the index manifest, and check query plans if CHECK_QUERY_PLANS is set.
+
+    Signup uniqueness, one pending request per requester, text search and
+    /near all rely on these indexes, so the production entry point runs
+    this before serving. It uses a short-lived client of its own, so a
+    pre-fork master holds no connection when it forks the workers.
+    """
+    connection = init_db(app)
+    try:
+        ensure_indexes(connection.db)
+        if app.config.get("CHECK_QUERY_PLANS"):
+            verify_query_plans(connection.db)
+    finally:
+        connection.cx.close()
+
+@api_bp.before_app_request
+def start_background_work():
+    """Start this process's threads on its first request, i.e. after any fork."""
+    state = current_app.extensions["petpal"]
+    if not current_app.config["BACKGROUND_WORK"] or state["pid"] == os.getpid():
+        return
+    with state["lock"]:
+        if state["pid"] == os.getpid():
+            return
+        # Admin stats counters, rebuilt from the collections every STATS_RECONCILE_INTERVAL
+        start_reconciler(current_app.config["mongo"], current_app.config["STATS_RECONCILE_INTERVAL"])
+        current_app.config["listing_archiver"].start()
+        event_broker.watch(mongo.db)
+        state["pid"] = os.getpid()
+
+# --- Database maintenance commands
+@api_bp.cli.command("ensure-indexes")
+@click.option("--check", is_flag=True, help="Fail if any route's query plan is a COLLSCAN.")
+def ensure_indexes_command(check):
+    for collection, names in ensure_indexes(mongo.db).items():
+        click.echo(f"{collection}: {', '.join(names)}")
+    if check:
+        for route, stages in verify_query_plans(mongo.db).items():
+            click.echo(f"{route}: {' <- '.join(stages)}")
+
+@api_bp.cli.command("migrate-adoption-requests")
+def migrate_adoption_requests_command():
+    moved, dropped = migrate_embedded_adoption_requests(mongo.db)
+    click.echo(f"Moved {moved} adoption requests out of pet_listings")
+    for req in dropped:
+        click.echo(
+            f"Dropped request {req['_id']} on pet {req['pet_id']}: "
+            f"{req.get('requester_id')} already has a pending request"
+        )
+
+@api_bp.cli.command("backfill-locations")
+def backfill_locations_command():
+    updated = backfill_listing_locations(mongo.db, current_app.config["postal_centroids"])
+    click.echo(f"Set location on {updated} pet listings")
+
+@api_bp.cli.command("reconcile-stats")
+def reconcile_stats_command():
+    reconcile_stats(mongo.db)
+    click.echo("Rebuilt admin stats counters")
+
+@api_bp.cli.command("archive-listings")
+def archive_listings_command():
+    moved = current_app.config["listing_archiver"].run_once()
+    for status, (listings, requests) in moved.items():
+        click.echo(f"{status}: archived {listings} listings, {requests} requests")
+
+@api_bp.app_errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({"error": "Upload too large"}), 413
+
+@api_bp.route('/uploads/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    return send_media(media_storage, filename, current_app.config)
+
+def process_image_later(filename):
+    """Generate variants of an uploaded image and point its listings at them."""
+    # attach runs on a worker thread, outside the app context
+    db = mongo.db
+    cache = listing_cache._get_current_object()
+
+    def attach(variants):
+        db.pet_listings.update_many(
+            {"image": image_url(filename)},
+            {"$set": {"image_variants": variants}}
+        )
+        cache.invalidate()
 
-@app.before_request
-def log_request():
-    print(f"\nIncoming {request.method} {request.path}")
-    print("Headers:", dict(request.headers))
-    print("JSON:", request.get_json(silent=True))
+    image_processor.process_later(filename, attach)
 
 # --- User Endpoints ---
 
-@app.route('/api/me', methods=['GET'])
+@api_bp.route('/api/me', methods=['GET'])
 @jwt_required()
 def me():
     return jsonify(get_jwt_identity()), 200
 
-@app.route('/api/pet-listing', methods=['POST'])
+@api_bp.route('/api/pet-listing', methods=['POST'])
 @jwt_required()
+@rate_limited
 def add_pet_listing():
-    # Check if the request contains form data
-    if not request.form:
-        return jsonify({"error": "No form data received"}), 400
-
-    # Get form data
-    data = request.form
-    required_fields = ["name", "species", "age", "description", "ownerName", "phone", "street", "city", "state", "postalCode"]
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing required fields"}), 400
-
-    # Validate string fields
-    string_fields = ["name", "species", "description"]
-    for field in string_fields:
-        if not isinstance(data.get(field), str) or not data[field].strip():
-            return jsonify({"error": f"{field} must be a non-empty string"}), 422
-
-    # Validate age
-    try:
-        age = int(data["age"])
-        if age <= 0:
-            raise ValueError
-    except (ValueError, TypeError):
-        return jsonify({"error": "Age must be a positive integer"}), 422
-
-    # Validate phone
-    if not data["phone"].isdigit() or len(data["phone"]) != 10:
-        return jsonify({"error": "Phone must be 10 digits"}), 422
+    # The parser already streamed the image to a temp upload, hashing it on the way
+    return handlers.add_pet_listing(
+        mongo.db,
+        media_storage,
+        listing_cache,
+        current_app.config["postal_centroids"],
+        current_app.config['ALLOWED_EXTENSIONS'],
+        get_jwt_identity()["email"],
+        request.form,
+        request.files,
+        process_image_later
+    )
 
-    # Check if image file exists
-    if 'image' not in request.files:
-        return jsonify({"error": "No image file provided"}), 400
+@api_bp.route('/api/pet-listings/bulk', methods=['POST'])
+@jwt_required()
+@rate_limited
+def bulk_ingest_pet_listings():
+    # Archives are far bigger than a single image upload
+    request.max_content_length = current_app.config["MAX_BULK_CONTENT_LENGTH"]
+    request.max_file_size = current_app.config["MAX_BULK_CONTENT_LENGTH"]
+    return handlers.bulk_ingest_pet_listings(
+        mongo.db,
+        media_storage,
+        listing_cache,
+        current_app.config["postal_centroids"],
+        current_app.config,
+        get_jwt_identity()["email"],
+        request.files,
+        process_image_later
+    )
 
-    image_file = request.files['image']
-    if image_file.filename == '':
-        return jsonify({"error": "No selected image file"}), 400
+@api_bp.route('/api/pet-listings', methods=['GET'])
+def get_pet_listings():
+    cache_key = listing_cache.key(request.host + request.full_path)
+    cached = listing_cache.get(cache_key)
+    if cached:
+        return listing_cache.respond(cached)
 
-    if not allowed_file(image_file.filename):
-        return jsonify({"error": "Invalid file type. Allowed types: png, jpg, jpeg, gif"}), 400
+    try:
+        listings, next_cursor = paginate(
+            mongo.read_db.pet_listings,
+            handlers.FEED_QUERY,
+            LISTING_CARD_FIELDS,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit")
+        )
+    except InvalidCursor as e:
+        return handlers.request_error(e)
+    body = jsonify({"items": listings, "next": next_cursor}).get_data()
+    return listing_cache.respond(listing_cache.set(cache_key, body))
+
+@api_bp.route('/api/pet-listings/search', methods=['GET'])
+def search_pet_listings():
+    cache_key = listing_cache.key(request.host + request.full_path)
+    cached = listing_cache.get(cache_key)
+    if cached:
+        return listing_cache.respond(cached)
 
-    # Save the image file
     try:
-        filename = secure_filename(image_file.filename)
-        image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-        image_file.save(image_path)
-        image_url = f"/uploads/{filename}"
-    except Exception as e:
-        return jsonify({"error": f"Failed to save image: {str(e)}"}), 500
+        query, pipeline, cursor, size = handlers.search_query(request.args)
+    except (ValidationError, InvalidCursor) as e:
+        return handlers.request_error(e)
+    results = mongo.read_db.pet_listings.aggregate(pipeline)
+    body = jsonify(search_results(results, query, cursor, size)).get_data()
+    return listing_cache.respond(listing_cache.set(cache_key, body))
+
+@api_bp.route('/api/pet-listings/near', methods=['GET'])
+def get_pet_listings_near():
+    cache_key = listing_cache.key(request.host + request.full_path)
+    cached = listing_cache.get(cache_key)
+    if cached:
+        return listing_cache.respond(cached)
 
-    user = get_jwt_identity()
-    listing = {
-        "name": data["name"],
-        "species": data["species"],
-        "age": age,
-        "description": data["description"],
-        "image": image_url,
-        "owner": user["email"],
-        "owner_contact": {
-            "name": data["ownerName"],
-            "phone": data["phone"],
-            
-            "address": {
-                "street": data["street"],
-                "city": data["city"],
-                "state": data["state"],
-                "postal_code": data["postalCode"]
-            }
-        },
-        "status": "Available",
-        "adoption_requests": [],
-        "created_at": datetime.utcnow()
-    }
-    
     try:
-        result = mongo.db.pet_listings.insert_one(listing)
-        listing["_id"] = str(result.inserted_id)
-        return jsonify({
-            "message": "Pet listing created successfully!",
-            "listing": listing
-        }), 201
-    except Exception as e:
-        if os.path.exists(image_path):
-            os.remove(image_path)
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-
-@app.route('/api/pet-listings', methods=['GET'])
-def get_pet_listings():
-    listings = list(mongo.db.pet_listings.find({"status": {"$in": ["Available", "Pending"]}}))
-    for pet in listings:
-        pet["_id"] = str(pet["_id"])
-        # Construct full image URL
-        if pet["image"].startswith('/uploads/'):
-            pet["image"] = f"http://{request.host}{pet['image']}"
-    return jsonify(listings), 200
-
-@app.route('/api/adoption-request', methods=['POST', 'OPTIONS'])
+        pipeline, size = handlers.near_query(request.args, current_app.config["postal_centroids"])
+    except (ValidationError, InvalidCursor) as e:
+        return handlers.request_error(e)
+    results = mongo.read_db.pet_listings.aggregate(pipeline)
+    body = jsonify(near_results(results, size)).get_data()
+    return listing_cache.respond(listing_cache.set(cache_key, body))
+
+@api_bp.route('/api/adoption-request', methods=['POST', 'OPTIONS'])
 @jwt_required()
+@rate_limited
 def send_adoption_request():
     if request.method == 'OPTIONS':
         return jsonify({}), 200
-    
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "No JSON data received"}), 400
-
-        # Required fields validation
-        required_fields = [
-            "pet_listing_id", "contact", "address", "city", 
-            "state", "postalCode", "homeType", "hoursAlone",
-            "petExperience", "adoptionReason"
-        ]
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            return jsonify({
-                "error": "Missing required fields",
-                "missing": missing_fields
-            }), 400
-
-        user = get_jwt_identity()
-        
-        try:
-            pet_listing_id = ObjectId(data["pet_listing_id"])
-        except:
-            return jsonify({"error": "Invalid pet listing ID format"}), 400
-
-        # Check if pet exists
-        pet = mongo.db.pet_listings.find_one({"_id": pet_listing_id})
-        if not pet:
-            return jsonify({"error": "Pet listing not found"}), 404
-            
-        if pet["status"] == "Adopted":
-            return jsonify({"error": "This pet has already been adopted"}), 400
-
-        # Check for existing request
-        existing_request = next(
-            (req for req in pet.get("adoption_requests", []) 
-             if req.get("requester_id") == user["email"] and req.get("status") == "Pending"),
-            None
-        )
-        if existing_request:
-            return jsonify({
-                "error": "You already have a pending request for this pet",
-                "request_id": existing_request.get("_id")
-            }), 400
-
-        # Create adoption request
-        adoption_request = {
-            "_id": str(ObjectId()),
-            "requester_id": user["email"],
-            "requester_name": user.get("name", ""),
-            "contact_info": {
-                "phone": data["contact"],
-                "address": {
-                    "street": data["address"],
-                    "city": data["city"],
-                    "state": data["state"],
-                    "postal_code": data["postalCode"]
-                }
-            },
-            "home_info": {
-                "type": data["homeType"],
-                "yard_size": data.get("yardSize", ""),
-                "hours_alone": data["hoursAlone"]
-            },
-            "experience": {
-                "other_pets": data.get("otherPets", ""),
-                "previous_experience": data["petExperience"]
-            },
-            "reason": data["adoptionReason"],
-            "status": "Pending",
-            "request_date": datetime.utcnow()
-        }
+    return handlers.send_adoption_request(
+        mongo.db, event_broker, listing_cache, get_jwt_identity(), request.get_json(), debug=current_app.debug
+    )
 
-        # Update database
-        result = mongo.db.pet_listings.update_one(
-            {"_id": pet_listing_id},
-            {
-                "$push": {"adoption_requests": adoption_request},
-                "$set": {"status": "Pending"} if pet["status"] == "Available" else {}
-            }
-        )
-        
-        if result.modified_count == 0:
-            return jsonify({"error": "Failed to submit adoption request"}), 400
-
-        return jsonify({
-            "message": "Adoption request submitted!",
-            "request": adoption_request,
-            "pet_listing_id": str(pet_listing_id)
-        }), 201
-
-    except Exception as e:
-        print(f"Error in send_adoption_request: {str(e)}")
-        return jsonify({
-            "error": "Internal server error",
-            "details": str(e) if app.debug else None
-        }), 500
-
-@app.route('/api/my-pet-listings', methods=['GET'])
+@api_bp.route('/api/events/token', methods=['POST'])
+@jwt_required()
+def create_events_token():
+    ttl = current_app.config["EVENTS_TOKEN_TTL"]
+    token = create_stream_token(get_jwt_identity(), current_app.config["JWT_SECRET_KEY"], ttl)
+    return jsonify({"token": token, "expires_in": ttl}), 200
+
+@api_bp.route('/api/events', methods=['GET'])
+def stream_events():
+    user, failed = handlers.stream_user(request.args, current_app.config["JWT_SECRET_KEY"])
+    if failed:
+        return failed
+
+    # Each open stream holds one of this worker's threads
+    broker = event_broker._get_current_object()
+    if not broker.open_stream():
+        return busy_response()
+    # The generator runs after the request context is gone, so it gets the
+    # objects behind the proxies
+    body = event_stream(
+        mongo.db,
+        broker,
+        user["email"],
+        handlers.last_event_id(request.headers, request.args),
+        current_app.config["EVENTS_HEARTBEAT"]
+    )
+    response = Response(body, mimetype="text/event-stream", headers=SSE_HEADERS)
+    # Runs when the server closes the response, even if the body never started
+    response.call_on_close(broker.close_stream)
+    return response
+
+@api_bp.route('/api/my-pet-listings', methods=['GET'])
 @jwt_required()
 def get_my_pet_listings():
     user = get_jwt_identity()
-    listings = list(mongo.db.pet_listings.find({"owner": user["email"]}))
-    for pet in listings:
-        pet["_id"] = str(pet["_id"])
-        if pet["image"].startswith('/uploads/'):
-            pet["image"] = f"http://{request.host}{pet['image']}"
-    return jsonify(listings), 200
-
-@app.route('/api/adoption-request/<string:pet_listing_id>/<string:request_id>', methods=['PUT'])
-@jwt_required()
-def update_adoption_request(pet_listing_id, request_id):
     try:
-        data = request.get_json()
-        if not data or "status" not in data:
-            return jsonify({"error": "Missing status in request body"}), 400
-
-        # Validate status
-        if data["status"] not in ["Approved", "Rejected"]:
-            return jsonify({"error": "Invalid status value"}), 400
-
-        # Convert IDs to ObjectId
-        try:
-            pet_listing_obj_id = ObjectId(pet_listing_id)
-        except:
-            return jsonify({"error": "Invalid pet listing ID format"}), 400
-
-        user = get_jwt_identity()
-        pet = mongo.db.pet_listings.find_one({"_id": pet_listing_obj_id})
-        
-        if not pet:
-            return jsonify({"error": "Pet listing not found"}), 404
-
-        # Verify pet owner
-        if pet["owner"] != user["email"]:
-            return jsonify({"error": "Unauthorized to modify this listing"}), 403
-
-        # Find the request to update
-        request_exists = False
-        for req in pet.get("adoption_requests", []):
-            if req["_id"] == request_id:
-                request_exists = True
-                break
-
-        if not request_exists:
-            return jsonify({"error": "Adoption request not found"}), 404
-
-        # Update the request status
-        result = mongo.db.pet_listings.update_one(
-            {"_id": pet_listing_obj_id, "adoption_requests._id": request_id},
-            {"$set": {"adoption_requests.$.status": data["status"]}}
+        listings, next_cursor = paginate(
+            mongo.db.pet_listings,
+            {"owner": user["email"]},
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit")
         )
-        
-        if result.modified_count == 0:
-            return jsonify({"error": "Failed to update adoption request"}), 400
-
-        # Additional status handling
-        if data["status"] == "Approved":
-            # Update pet status
-            mongo.db.pet_listings.update_one(
-                {"_id": pet_listing_obj_id},
-                {"$set": {"status": "Adopted"}}
-            )
-            
-            # Reject all other pending requests
-            mongo.db.pet_listings.update_one(
-                {"_id": pet_listing_obj_id},
-                {"$set": {"adoption_requests.$[elem].status": "Rejected"}},
-                array_filters=[{"elem.status": "Pending", "elem._id": {"$ne": request_id}}]
-            )
-            
-        elif data["status"] == "Rejected":
-            # Check if there are no more pending requests
-            updated_pet = mongo.db.pet_listings.find_one({"_id": pet_listing_obj_id})
-            has_pending = any(req["status"] == "Pending" for req in updated_pet.get("adoption_requests", []))
-            
-            if not has_pending:
-                mongo.db.pet_listings.update_one(
-                    {"_id": pet_listing_obj_id},
-                    {"$set": {"status": "Available"}}
-                )
-
-        return jsonify({"message": f"Request {data['status'].lower()} successfully"}), 200
-
-    except Exception as e:
-        print(f"Error in update_adoption_request: {str(e)}")
-        return jsonify({"error": "Internal server error"}), 500
-
-@app.route('/api/pet-listing/<string:pet_id>', methods=['PATCH'])
-@jwt_required()
-def update_pet_status(pet_id):
-    data = request.json
-    if "status" not in data:
-        return jsonify({"error": "Missing status field"}), 400
+    except InvalidCursor as e:
+        return handlers.request_error(e)
 
-    user = get_jwt_identity()
-    pet = mongo.db.pet_listings.find_one({"_id": ObjectId(pet_id)})
-    
-    if not pet or pet["owner"] != user["email"]:
-        return jsonify({"error": "Unauthorized"}), 403
+    adoption_requests = mongo.db.adoption_requests.find(handlers.owner_requests_query(listings))
+    handlers.attach_adoption_requests(listings, adoption_requests.sort("request_date", 1))
+    return jsonify({"items": listings, "next": next_cursor}), 200
 
-    result = mongo.db.pet_listings.update_one(
-        {"_id": ObjectId(pet_id)},
-        {"$set": {"status": data["status"]}}
+@api_bp.route('/api/adoption-request/<string:pet_listing_id>/<string:request_id>', methods=['PUT'])
+@jwt_required()
+def update_adoption_request(pet_listing_id, request_id):
+    return handlers.update_adoption_request(
+        mongo, event_broker, listing_cache, get_jwt_identity(), pet_listing_id, request_id, request.get_json()
     )
-    
-    if result.modified_count == 0:
-        return jsonify({"error": "Failed to update pet status"}), 400
 
-    return jsonify({"message": "Pet status updated successfully"}), 200
+@api_bp.route('/api/pet-listing/<string:pet_id>', methods=['PATCH'])
+@jwt_required()
+def update_pet_status(pet_id):
+    return handlers.update_pet_status(
+        mongo.db, event_broker, listing_cache, get_jwt_identity(), pet_id, request.json
+    )
 
 # --- Admin Endpoints ---
 
-@app.route('/api/admin/users', methods=['GET'])
+@api_bp.route('/api/admin/users', methods=['GET'])
 @jwt_required()
 @role_required("admin")
 def get_all_users():
-    users = list(mongo.db.users.find())
-    for u in users:
-        u["_id"] = str(u["_id"])
-        u.pop("password", None)
-    return jsonify(users), 200
+    return stream_documents(mongo.read_db.users.find({}, {"password": 0}))
 
-@app.route('/api/admin/pet-listings', methods=['GET'])
+@api_bp.route('/api/admin/stats', methods=['GET'])
 @jwt_required()
 @role_required("admin")
-def get_all_pet_listings():
-    listings = list(mongo.db.pet_listings.find())
-    for pet in listings:
-        pet["_id"] = str(pet["_id"])
-        if pet["image"].startswith('/uploads/'):
-            pet["image"] = f"http://{request.host}{pet['image']}"
-    return jsonify(listings), 200
-
-@app.route('/api/pet-listing/<string:pet_id>', methods=['DELETE'])
+def get_admin_stats():
+    return handlers.admin_stats(mongo.db)
+
+@api_bp.route('/api/admin/pet-listings', methods=['GET'])
 @jwt_required()
-def delete_pet_listing(pet_id):
-    try:
-        # Convert to ObjectId
-        pet_listing_id = ObjectId(pet_id)
-    except:
-        return jsonify({"error": "Invalid pet listing ID format"}), 400
+@role_required("admin")
+def get_all_pet_listings():
+    # Full export including the archive, streamed straight from the cursor
+    if request.args.get("export") or wants_ndjson():
+        return stream_documents(mongo.read_db.pet_listings.aggregate(export_pipeline()))
 
-    user = get_jwt_identity()
-    
-    # Verify pet owner
-    pet = mongo.db.pet_listings.find_one({"_id": pet_listing_id})
-    if not pet:
-        return jsonify({"error": "Pet listing not found"}), 404
-    if pet["owner"] != user["email"]:
-        return jsonify({"error": "Unauthorized to delete this listing"}), 403
-
-    # Delete the pet listing
-    result = mongo.db.pet_listings.delete_one({"_id": pet_listing_id})
-    
-    if result.deleted_count == 0:
-        return jsonify({"error": "Failed to delete pet listing"}), 400
+    try:
+        listings, next_cursor = paginate(
+            mongo.read_db.pet_listings,
+            {},
+            LISTING_CARD_FIELDS,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit")
+        )
+    except InvalidCursor as e:
+        return handlers.request_error(e)
+    return jsonify({"items": listings, "next": next_cursor}), 200
 
-    return jsonify({"message": "Pet listing deleted successfully"}), 200
+@api_bp.route('/api/pet-listing/<string:pet_id>', methods=['DELETE'])
+@jwt_required()
+def delete_pet_listing(pet_id):
+    return handlers.delete_pet_listing(mongo.db, media_storage, listing_cache, get_jwt_identity(), pet_id)
 
-@app.route('/api/my-adoption-requests', methods=['GET'])
+@api_bp.route('/api/my-adoption-requests', methods=['GET'])
 @jwt_required()
 def get_user_adoption_requests():
     user = get_jwt_identity()
     
-    # Find all pets that have adoption requests from this user
-    pets_with_requests = list(mongo.db.pet_listings.aggregate([
-        {
-            '$match': {
-                'adoption_requests.requester_id': user['email']
-            }
-        },
-        {
-            '$unwind': '$adoption_requests'
-        },
-        {
-            '$match': {
-                'adoption_requests.requester_id': user['email']
-            }
-        },
-        {
-            '$project': {
-                '_id': 0,
-                'request_id': '$adoption_requests._id',
-                'status': '$adoption_requests.status',
-                'request_date': '$adoption_requests.request_date',
-                'updated_at': '$adoption_requests.updated_at',
-                'pet': {
-                    '_id': '$_id',
-                    'name': '$name',
-                    'image': '$image',
-                    'owner_contact': '$owner_contact'
-                }
-            }
-        }
-    ]))
+    # Requests are indexed by requester in both tiers; each one joins its pet by _id
+    pets_with_requests = list(mongo.db.adoption_requests.aggregate(
+        requester_history_pipeline(user['email'])
+    ))
     
     return jsonify(pets_with_requests), 200
 
-@app.route('/api/adoption-request/<string:request_id>', methods=['DELETE'])
+@api_bp.route('/api/adoption-request/<string:request_id>', methods=['DELETE'])
 @jwt_required()
 def delete_adoption_request(request_id):
-    user = get_jwt_identity()
-    
-    # Find and remove the request
-    result = mongo.db.pet_listings.update_one(
-        {
-            'adoption_requests._id': request_id,
-            'adoption_requests.requester_id': user['email']
-        },
-        {
-            '$pull': {
-                'adoption_requests': {
-                    '_id': request_id,
-                    'requester_id': user['email']
-                }
-            }
-        }
-    )
-    
-    if result.modified_count == 0:
-        return jsonify({"error": "Request not found or already removed"}), 404
-    
-    return jsonify({"message": "Adoption request removed successfully"}), 200
+    return handlers.delete_adoption_request(mongo.db, event_broker, listing_cache, get_jwt_identity(), request_id)
 
 if __name__ == '__main__':
+    app = create_app()
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    prepare_database(app)
+    app.run(debug=True, port=5000)
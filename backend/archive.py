@@ -0,0 +1,227 @@
+# backend/archive.py
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+from leases import Lease
+from models import run_in_transaction
+from stats import ARCHIVE_COLLECTIONS
+
+logger = logging.getLogger("petpal.archive")
+
+# Archived listings keep their _id and fields plus archived_at; their
+# requests move along with them, so history reads can join the archive
+# pair exactly like the live one.
+ARCHIVED_LISTINGS = ARCHIVE_COLLECTIONS["pet_listings"]
+ARCHIVED_REQUESTS = ARCHIVE_COLLECTIONS["adoption_requests"]
+DEFAULT_BATCH_SIZE = 200
+
+
+def requester_history_pipeline(requester):
+    """A requester's adoption requests, newest first, from the live and archived collections."""
+    def with_pet(listings):
+        return [
+            {"$match": {"requester_id": requester}},
+            {"$lookup": {
+                "from": listings,
+                "localField": "pet_id",
+                "foreignField": "_id",
+                "as": "pet"
+            }},
+        ]
+
+    return with_pet("pet_listings") + [
+        {"$unionWith": {"coll": ARCHIVED_REQUESTS, "pipeline": with_pet(ARCHIVED_LISTINGS)}},
+        {"$unwind": "$pet"},
+        {"$sort": {"request_date": -1}},
+        {"$project": {
+            "_id": 1,
+            "request_id": "$_id",
+            "status": 1,
+            "request_date": 1,
+            "updated_at": 1,
+            "pet": {
+                "_id": "$pet._id",
+                "name": "$pet.name",
+                "image": "$pet.image",
+                "owner_contact": "$pet.owner_contact"
+            }
+        }}
+    ]
+
+
+def export_pipeline():
+    """Every listing, live ones first and then the archive (those carry archived_at)."""
+    return [{"$unionWith": ARCHIVED_LISTINGS}]
+
+
+def last_activity(db, listings):
+    """pet _id -> latest of its creation, own status change and any request activity."""
+    activity = {
+        listing["_id"]: max(filter(None, [listing.get("created_at"), listing.get("updated_at")]))
+        for listing in listings
+    }
+    for group in db.adoption_requests.aggregate([
+        {"$match": {"pet_id": {"$in": list(activity)}}},
+        {"$group": {"_id": "$pet_id", "last": {"$max": {"$ifNull": ["$updated_at", "$request_date"]}}}},
+    ]):
+        if group["last"] and group["last"] > activity[group["_id"]]:
+            activity[group["_id"]] = group["last"]
+    return activity
+
+
+def idle_listings(db, status, cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield (scanned, idle ids) batches of listings in ``status`` with no activity since ``cutoff``.
+
+    Walks the status_feed index oldest first; nothing created after the
+    cutoff can be idle, so the scan stops there.
+    """
+    after = None
+    while True:
+        query = {"status": status, "created_at": {"$lt": cutoff}}
+        if after:
+            query["$or"] = [
+                {"created_at": {"$gt": after[0]}},
+                {"created_at": after[0], "_id": {"$gt": after[1]}}
+            ]
+        batch = list(
+            db.pet_listings.find(query, {"created_at": 1, "updated_at": 1})
+            .sort([("created_at", 1), ("_id", 1)])
+            .limit(batch_size)
+        )
+        if not batch:
+            return
+        after = (batch[-1]["created_at"], batch[-1]["_id"])
+        activity = last_activity(db, batch)
+        yield len(batch), [listing["_id"] for listing in batch if activity[listing["_id"]] < cutoff]
+
+
+def move_listings(mongo, pet_ids, status):
+    """Move the listings still in ``status`` and their requests to the archive.
+
+    One transaction where the server supports it. Without one, a listing
+    that changed after it was read (a new request made it Pending, a
+    rejection reopened it) fails the status guard on delete and its archive
+    copy is removed again. Returns (listings moved, requests moved).
+    """
+    def move(session):
+        db = mongo.db
+        now = datetime.utcnow()
+        listings = list(db.pet_listings.find({"_id": {"$in": pet_ids}, "status": status}, session=session))
+        ids = [listing["_id"] for listing in listings]
+        if not ids:
+            return 0, 0
+        requests = list(db.adoption_requests.find({"pet_id": {"$in": ids}}, session=session))
+        for collection, docs in [(ARCHIVED_LISTINGS, listings), (ARCHIVED_REQUESTS, requests)]:
+            if docs:
+                db[collection].bulk_write([
+                    ReplaceOne({"_id": doc["_id"]}, dict(doc, archived_at=now), upsert=True) for doc in docs
+                ], ordered=False, session=session)
+
+        db.pet_listings.delete_many({"_id": {"$in": ids}, "status": status}, session=session)
+        still_live = set(db.pet_listings.distinct("_id", {"_id": {"$in": ids}}, session=session))
+        if still_live:
+            db[ARCHIVED_LISTINGS].delete_many({"_id": {"$in": list(still_live)}}, session=session)
+            db[ARCHIVED_REQUESTS].delete_many({"pet_id": {"$in": list(still_live)}}, session=session)
+            ids = [pet_id for pet_id in ids if pet_id not in still_live]
+        removed = db.adoption_requests.delete_many({"pet_id": {"$in": ids}}, session=session)
+        return len(ids), removed.deleted_count
+
+    return run_in_transaction(mongo, move)
+
+
+class ListingArchiver:
+    """Moves adopted and stale listings out of the live collections in batches.
+
+    A listing is archived once it has been Adopted for ``adopted_days``, or
+    Available without any activity for ``stale_days``; Pending listings
+    always stay live. Admin stats count both tiers, so archiving leaves the
+    counters alone. Progress goes to the /metrics ``Metrics`` when given.
+    Every worker starts the thread, but a pass only runs in the process
+    holding the "listing-archiver" lease.
+    """
+
+    def __init__(self, mongo, adopted_days=90, stale_days=365, batch_size=DEFAULT_BATCH_SIZE,
+                 interval=3600, metrics=None):
+        self.mongo = mongo
+        self.rules = [(status, days) for status, days in [("Adopted", adopted_days), ("Available", stale_days)] if days]
+        self.batch_size = batch_size
+        self.interval = interval
+        self.metrics = metrics
+        self.lease = Lease(mongo, "listing-archiver", interval)
+
+    @classmethod
+    def from_config(cls, config, mongo, metrics=None):
+        return cls(
+            mongo,
+            adopted_days=config.get("ARCHIVE_ADOPTED_DAYS", 90),
+            stale_days=config.get("ARCHIVE_STALE_DAYS", 365),
+            batch_size=config.get("ARCHIVE_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            interval=config.get("ARCHIVE_INTERVAL", 3600),
+            metrics=metrics
+        )
+
+    def _count(self, name, amount, help_text):
+        if self.metrics and amount:
+            self.metrics.increment(name, amount, help_text)
+
+    def run_once(self, now=None, still_held=None):
+        """One full pass over every rule; returns {status: (listings, requests)} moved.
+
+        ``still_held`` is called before each batch (the scheduled pass
+        passes Lease.acquire, which also renews the lease); once it returns
+        False another process may be archiving, so the pass stops.
+        """
+        now = now or datetime.utcnow()
+        started = time.monotonic()
+        moved = {}
+        for status, days in self.rules:
+            listings = requests = 0
+            for scanned, pet_ids in idle_listings(self.mongo.db, status, now - timedelta(days=days), self.batch_size):
+                self._count("petpal_archive_scanned_total", scanned, "Listings checked for archiving.")
+                if not pet_ids:
+                    continue
+                if still_held and not still_held():
+                    logger.warning("Lost the listing-archiver lease; stopping this pass")
+                    moved[status] = (listings, requests)
+                    return moved
+                batch_listings, batch_requests = move_listings(self.mongo, pet_ids, status)
+                listings += batch_listings
+                requests += batch_requests
+                self._count("petpal_archive_batches_total", 1, "Archive batches moved.")
+                self._count("petpal_archive_listings_total", batch_listings, "Listings moved to the archive.")
+                self._count("petpal_archive_requests_total", batch_requests, "Adoption requests moved to the archive.")
+            moved[status] = (listings, requests)
+        if self.metrics:
+            self.metrics.set_gauge(
+                "petpal_archive_last_run_timestamp_seconds", time.time(), "End of the last archive pass."
+            )
+            self.metrics.set_gauge(
+                "petpal_archive_last_run_duration_seconds", time.monotonic() - started, "Length of the last archive pass."
+            )
+        logger.info("Archived %s", ", ".join(
+            f"{status}: {listings} listings, {requests} requests" for status, (listings, requests) in moved.items()
+        ) or "nothing")
+        return moved
+
+    def start(self):
+        """Run a pass every ``interval`` seconds on a daemon thread (0 disables).
+
+        Only the lease holder runs the pass; the rest just check the lease.
+        """
+        if not self.interval or not self.rules:
+            return None
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(self.interval):
+                try:
+                    if self.lease.acquire():
+                        self.run_once(still_held=self.lease.acquire)
+                except Exception:
+                    self._count("petpal_archive_failures_total", 1, "Archive passes that failed.")
+                    logger.exception("Listing archival failed")
+
+        threading.Thread(target=run, name="listing-archiver", daemon=True).start()
+        return stop
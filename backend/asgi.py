@@ -0,0 +1,583 @@
+# backend/asgi.py
+"""Async serving mode: the /api routes of app.py on Quart over Motor.
+
+    hypercorn asgi:app --bind 0.0.0.0:5000
+
+Requests and responses match the Flask app, including JWT handling, so
+either mode can sit behind the React frontend. The views here are thin
+adapters: what a route does lives in handlers.py, shared with app.py.
+Reads query through Motor; writes and logins run the shared PyMongo
+handlers on the client Motor wraps, off the event loop.
+"""
+import asyncio
+import os
+from functools import wraps
+from types import SimpleNamespace
+import jwt as pyjwt
+from hypercorn.middleware import ProxyFixMiddleware
+from motor.motor_asyncio import AsyncIOMotorClient
+from quart import Quart, Request, Response, abort, g, has_request_context, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+import handlers
+from cache import create_response_cache
+from config import load_config
+from hashing import PasswordHasher
+from indexes import ensure_indexes, verify_query_plans
+from models import LISTING_CARD_FIELDS, mongo_client_options, read_preference
+from pagination import InvalidCursor, SORT_ORDER, keyset_query, page_size, split_page
+from ratelimit import RateLimiter, busy_response, identity_key, rate_limited_response
+from search import search_results
+from media import (
+    HashedUpload,
+    ImageProcessor,
+    LocalStorage,
+    apply_cache_policy,
+    create_media_storage,
+    image_url,
+    media_etag,
+    media_mimetype,
+    offload_header,
+    sweep_stale_uploads
+)
+from geo import PostalCentroids, near_results
+from serialization import BSONJSONProvider
+from stats import start_reconciler
+from streaming import EXPORT_BATCH_SIZE, export_framing, ndjson_requested
+from tokens import (
+    AuthorizationError,
+    VerifiedTokenCache,
+    bearer_token,
+    create_stream_token,
+    decode_access_token,
+    encode_access_token,
+    token_error
+)
+from archive import ListingArchiver, export_pipeline, requester_history_pipeline
+from events import (
+    EVENTS_COLLECTION,
+    KEEPALIVE,
+    MAX_REPLAY,
+    RETRY_FIELD,
+    SSE_HEADERS,
+    EventBroker,
+    format_event,
+    parse_event_id,
+    replay_query
+)
+from validation import ValidationError
+
+
+class QuartBSONJSONProvider(BSONJSONProvider):
+    def request_host(self):
+        return request.host if has_request_context() else None
+
+
+class QuartUploadRequest(Request):
+    """Streams file parts into HashedUpload temp files, like media.UploadRequest."""
+
+    max_file_size = None
+
+    def make_form_data_parser(self):
+        parser = super().make_form_data_parser()
+        parser.stream_factory = self._upload_stream
+        return parser
+
+    def _upload_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload = HashedUpload(media.storage.tmp_dir, self.max_file_size or app.config["MAX_IMAGE_BYTES"])
+        self.__dict__.setdefault("_uploads", []).append(upload)
+        return upload
+
+
+app = Quart(__name__)
+app.request_class = QuartUploadRequest
+app.json = QuartBSONJSONProvider(app)
+load_config(app.config)
+
+# Client address from the trusted proxies' X-Forwarded-For, as in app.py
+if app.config["TRUSTED_PROXY_HOPS"]:
+    app.asgi_app = ProxyFixMiddleware(app.asgi_app, mode="legacy", trusted_hops=app.config["TRUSTED_PROXY_HOPS"])
+
+# client/db are Motor objects; sync exposes the PyMongo client Motor wraps,
+# in the (cx, db) shape handlers.py and the transactional helpers expect.
+# read_db carries MONGO_READ_PREFERENCE for the read-only routes.
+mongo = SimpleNamespace(client=None, db=None, read_db=None, sync=None)
+hasher = PasswordHasher.from_config(app.config)
+centroids = PostalCentroids.from_config(app.config)
+# Storage needs a database handle, so both are created in connect()
+media = SimpleNamespace(storage=None, processor=None)
+reconciler = SimpleNamespace(stop=None)
+archiver = SimpleNamespace(stop=None)
+event_broker = EventBroker()
+listing_cache = create_response_cache(app)
+token_cache = VerifiedTokenCache.from_config(app.config)
+rate_limiter = RateLimiter.from_config(app.config)
+
+
+@app.before_serving
+async def connect():
+    mongo.client = AsyncIOMotorClient(app.config["MONGO_URI"], **mongo_client_options(app.config))
+    mongo.db = mongo.client.get_default_database()
+    mongo.read_db = mongo.db.with_options(read_preference=read_preference(app.config))
+    mongo.sync = SimpleNamespace(cx=mongo.client.delegate, db=mongo.client.delegate[mongo.db.name])
+    if app.config["ENSURE_INDEXES"]:
+        await asyncio.to_thread(ensure_indexes, mongo.sync.db)
+        if app.config["CHECK_QUERY_PLANS"]:
+            await asyncio.to_thread(verify_query_plans, mongo.sync.db)
+    media.storage = create_media_storage(app.config, mongo.sync)
+    media.processor = ImageProcessor.from_config(app.config, media.storage)
+    await asyncio.to_thread(sweep_stale_uploads, media.storage.tmp_dir)
+    if app.config["BACKGROUND_WORK"]:
+        reconciler.stop = start_reconciler(mongo.sync, app.config["STATS_RECONCILE_INTERVAL"])
+        archiver.stop = ListingArchiver.from_config(app.config, mongo.sync).start()
+        event_broker.watch(mongo.sync.db)
+
+
+@app.after_serving
+async def disconnect():
+    for job in (reconciler, archiver):
+        if job.stop:
+            job.stop.set()
+    mongo.client.close()
+
+
+@app.after_request
+async def after_request(response):
+    response.headers.add('Access-Control-Allow-Origin', 'http://localhost:3000')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
+    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
+    response.headers.add('Access-Control-Allow-Credentials', 'true')
+    response.headers.add('Access-Control-Max-Age', '86400')
+    return response
+
+@app.teardown_request
+async def close_uploads(exc):
+    # Temp uploads that were not committed are removed here
+    for upload in request.__dict__.get("_uploads", []):
+        upload.close()
+
+
+@app.errorhandler(RequestEntityTooLarge)
+async def request_too_large(e):
+    return jsonify({"error": "Upload too large"}), 413
+
+# --- JWT, compatible with the tokens flask_jwt_extended issues in app.py
+
+def create_access_token(identity):
+    return encode_access_token(identity, app.config)
+
+
+def jwt_required(fn):
+    @wraps(fn)
+    async def decorator(*args, **kwargs):
+        try:
+            token = bearer_token(request.headers.get("Authorization"))
+            # A locked cache and the signature check; keep both off the loop
+            claims = await asyncio.to_thread(decode_access_token, token, app.config, token_cache)
+        except (AuthorizationError, pyjwt.InvalidTokenError) as e:
+            return token_error(e)
+        g.jwt_identity = claims["identity"]
+        return await fn(*args, **kwargs)
+    return decorator
+
+
+def get_jwt_identity():
+    return g.jwt_identity
+
+
+def role_required(role):
+    def wrapper(fn):
+        @wraps(fn)
+        async def decorator(*args, **kwargs):
+            return handlers.role_error(get_jwt_identity(), role) or await fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+def rate_limited(fn):
+    """Async twin of ratelimit.rate_limited; use below @jwt_required to reuse its identity."""
+    @wraps(fn)
+    async def decorator(*args, **kwargs):
+        quota = rate_limiter.quotas.get(fn.__name__)
+        if quota is None:
+            return await fn(*args, **kwargs)
+        if not rate_limiter.acquire():
+            return busy_response()
+        try:
+            identity = identity_key(g.get("jwt_identity"), request.remote_addr)
+            # A Redis bucket store is a network round trip
+            wait = await asyncio.to_thread(rate_limiter.retry_after, fn.__name__, quota, identity)
+            if wait:
+                return rate_limited_response(wait)
+            return await fn(*args, **kwargs)
+        finally:
+            rate_limiter.release()
+    return decorator
+
+# --- Helpers
+
+def run_handler(handler, *args, **kwargs):
+    """Run a blocking handlers.py function on a worker thread."""
+    return asyncio.to_thread(handler, *args, **kwargs)
+
+
+def process_image_later(filename):
+    # The worker thread reports back through the synchronous client
+    def attach(variants):
+        mongo.sync.db.pet_listings.update_many(
+            {"image": image_url(filename)},
+            {"$set": {"image_variants": variants}}
+        )
+        listing_cache.invalidate()
+
+    media.processor.process_later(filename, attach)
+
+
+async def paginate(collection, query, projection=None):
+    size = page_size(request.args.get("limit"))
+    cursor = collection.find(keyset_query(query, request.args.get("cursor")), projection)
+    docs = await cursor.sort(SORT_ORDER).limit(size + 1).to_list(size + 1)
+    return split_page(docs, size)
+
+
+# listing_cache may be backed by Redis, so its calls run in a thread
+
+async def cache_lookup():
+    """(cache key, cached entry or None) for this request."""
+    path = request.host + request.full_path
+
+    def lookup():
+        key = listing_cache.key(path)
+        return key, listing_cache.get(key)
+
+    return await asyncio.to_thread(lookup)
+
+
+async def cache_and_respond(key, body):
+    return await cached_response(await asyncio.to_thread(listing_cache.set, key, body))
+
+
+async def cached_response(entry):
+    response = listing_cache.tag(Response(entry.body, mimetype="application/json"), entry)
+    return await response.make_conditional(request)
+
+
+def stream_documents(cursor):
+    mimetype, opening, separator, line_end, closing = export_framing(ndjson_requested(request.accept_mimetypes))
+    dumps = app.json.dumps
+    cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+
+    async def generate():
+        yield opening.encode()
+        count = 0
+        async for doc in cursor:
+            yield ((separator if count else "") + dumps(doc) + line_end).encode()
+            count += 1
+        yield closing.encode()
+
+    return Response(generate(), mimetype=mimetype)
+
+
+def event_response(user, last_event_id):
+    """SSE response for one client; the async twin of events.event_stream."""
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Queue()
+
+    # The broker calls this from the change stream thread
+    def deliver(event):
+        loop.call_soon_threadsafe(pending.put_nowait, event)
+
+    async def generate():
+        event_broker.subscribe(user, deliver)
+        try:
+            yield RETRY_FIELD.encode()
+            replayed = set()
+            last_id = parse_event_id(last_event_id)
+            if last_id:
+                cursor = mongo.db[EVENTS_COLLECTION].find(replay_query(user, last_id))
+                async for event in cursor.sort("_id", 1).limit(MAX_REPLAY):
+                    replayed.add(event["_id"])
+                    yield format_event(event).encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(pending.get(), app.config["EVENTS_HEARTBEAT"])
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE.encode()
+                    continue
+                if event["_id"] not in replayed:
+                    yield format_event(event).encode()
+        finally:
+            event_broker.unsubscribe(user, deliver)
+
+    response = Response(generate(), mimetype="text/event-stream", headers=SSE_HEADERS)
+    response.timeout = None
+    return response
+
+# --- Authentication
+
+@app.route('/api/login', methods=['POST'])
+@rate_limited
+async def login():
+    return await run_handler(handlers.login, mongo.sync, hasher, await request.get_json(), create_access_token)
+
+
+@app.route('/api/signup', methods=['POST'])
+@rate_limited
+async def signup():
+    return await run_handler(handlers.signup, mongo.sync, hasher, await request.get_json(), create_access_token)
+
+# --- User Endpoints
+
+def read_media(filename):
+    with media.storage.open(filename) as f:
+        return f.read()
+
+
+@app.route('/uploads/<filename>')
+async def uploaded_file(filename):
+    stat = await asyncio.to_thread(media.storage.stat, filename)
+    if stat is None:
+        abort(404)
+
+    offload = offload_header(media.storage, filename, app.config)
+    if offload:
+        response = Response(b"", mimetype=media_mimetype(filename))
+        response.headers[offload[0]] = offload[1]
+        response.set_etag(media_etag(filename, stat))
+        apply_cache_policy(response, filename)
+        return await response.make_conditional(request)
+
+    if isinstance(media.storage, LocalStorage):
+        body = app.response_class.file_body_class(media.storage.path(filename))
+    else:
+        body = await asyncio.to_thread(read_media, filename)
+    response = Response(body, mimetype=media_mimetype(filename))
+    response.content_length = stat.size
+    response.last_modified = stat.modified
+    response.set_etag(media_etag(filename, stat))
+    apply_cache_policy(response, filename)
+    return await response.make_conditional(request, accept_ranges=True, complete_length=stat.size)
+
+
+@app.route('/api/me', methods=['GET'])
+@jwt_required
+async def me():
+    return jsonify(get_jwt_identity()), 200
+
+
+@app.route('/api/pet-listing', methods=['POST'])
+@jwt_required
+@rate_limited
+async def add_pet_listing():
+    form = await request.form
+    files = await request.files
+    return await run_handler(
+        handlers.add_pet_listing,
+        mongo.sync.db,
+        media.storage,
+        listing_cache,
+        centroids,
+        app.config['ALLOWED_EXTENSIONS'],
+        get_jwt_identity()["email"],
+        form,
+        files,
+        process_image_later
+    )
+
+
+@app.route('/api/pet-listings/bulk', methods=['POST'])
+@jwt_required
+@rate_limited
+async def bulk_ingest_pet_listings():
+    request.max_content_length = app.config["MAX_BULK_CONTENT_LENGTH"]
+    request.max_file_size = app.config["MAX_BULK_CONTENT_LENGTH"]
+    files = await request.files
+    return await run_handler(
+        handlers.bulk_ingest_pet_listings,
+        mongo.sync.db,
+        media.storage,
+        listing_cache,
+        centroids,
+        app.config,
+        get_jwt_identity()["email"],
+        files,
+        process_image_later
+    )
+
+
+@app.route('/api/pet-listings', methods=['GET'])
+async def get_pet_listings():
+    cache_key, cached = await cache_lookup()
+    if cached:
+        return await cached_response(cached)
+
+    try:
+        listings, next_cursor = await paginate(mongo.read_db.pet_listings, handlers.FEED_QUERY, LISTING_CARD_FIELDS)
+    except InvalidCursor as e:
+        return handlers.request_error(e)
+    body = app.json.dumpb({"items": listings, "next": next_cursor})
+    return await cache_and_respond(cache_key, body)
+
+
+@app.route('/api/pet-listings/search', methods=['GET'])
+async def search_pet_listings():
+    cache_key, cached = await cache_lookup()
+    if cached:
+        return await cached_response(cached)
+
+    try:
+        query, pipeline, cursor, size = handlers.search_query(request.args)
+    except (ValidationError, InvalidCursor) as e:
+        return handlers.request_error(e)
+    results = await mongo.read_db.pet_listings.aggregate(pipeline).to_list(None)
+    body = app.json.dumpb(search_results(results, query, cursor, size))
+    return await cache_and_respond(cache_key, body)
+
+
+@app.route('/api/pet-listings/near', methods=['GET'])
+async def get_pet_listings_near():
+    cache_key, cached = await cache_lookup()
+    if cached:
+        return await cached_response(cached)
+
+    try:
+        pipeline, size = handlers.near_query(request.args, centroids)
+    except (ValidationError, InvalidCursor) as e:
+        return handlers.request_error(e)
+    results = await mongo.read_db.pet_listings.aggregate(pipeline).to_list(None)
+    body = app.json.dumpb(near_results(results, size))
+    return await cache_and_respond(cache_key, body)
+
+
+@app.route('/api/adoption-request', methods=['POST'])
+@jwt_required
+@rate_limited
+async def send_adoption_request():
+    return await run_handler(
+        handlers.send_adoption_request,
+        mongo.sync.db,
+        event_broker,
+        listing_cache,
+        get_jwt_identity(),
+        await request.get_json(),
+        debug=app.debug
+    )
+
+
+@app.route('/api/events/token', methods=['POST'])
+@jwt_required
+async def create_events_token():
+    ttl = app.config["EVENTS_TOKEN_TTL"]
+    token = create_stream_token(get_jwt_identity(), app.config["JWT_SECRET_KEY"], ttl)
+    return jsonify({"token": token, "expires_in": ttl}), 200
+
+
+@app.route('/api/events', methods=['GET'])
+async def stream_events():
+    # Streams are coroutines here, not threads, so EVENTS_MAX_STREAMS does not apply
+    user, failed = handlers.stream_user(request.args, app.config["JWT_SECRET_KEY"])
+    if failed:
+        return failed
+    return event_response(user["email"], handlers.last_event_id(request.headers, request.args))
+
+
+@app.route('/api/my-pet-listings', methods=['GET'])
+@jwt_required
+async def get_my_pet_listings():
+    user = get_jwt_identity()
+    try:
+        listings, next_cursor = await paginate(mongo.db.pet_listings, {"owner": user["email"]})
+    except InvalidCursor as e:
+        return handlers.request_error(e)
+
+    adoption_requests = mongo.db.adoption_requests.find(handlers.owner_requests_query(listings))
+    handlers.attach_adoption_requests(listings, await adoption_requests.sort("request_date", 1).to_list(None))
+    return jsonify({"items": listings, "next": next_cursor}), 200
+
+
+@app.route('/api/adoption-request/<string:pet_listing_id>/<string:request_id>', methods=['PUT'])
+@jwt_required
+async def update_adoption_request(pet_listing_id, request_id):
+    return await run_handler(
+        handlers.update_adoption_request,
+        mongo.sync,
+        event_broker,
+        listing_cache,
+        get_jwt_identity(),
+        pet_listing_id,
+        request_id,
+        await request.get_json()
+    )
+
+
+@app.route('/api/pet-listing/<string:pet_id>', methods=['PATCH'])
+@jwt_required
+async def update_pet_status(pet_id):
+    return await run_handler(
+        handlers.update_pet_status,
+        mongo.sync.db,
+        event_broker,
+        listing_cache,
+        get_jwt_identity(),
+        pet_id,
+        await request.get_json()
+    )
+
+# --- Admin Endpoints
+
+@app.route('/api/admin/users', methods=['GET'])
+@jwt_required
+@role_required("admin")
+async def get_all_users():
+    return stream_documents(mongo.read_db.users.find({}, {"password": 0}))
+
+
+@app.route('/api/admin/stats', methods=['GET'])
+@jwt_required
+@role_required("admin")
+async def get_admin_stats():
+    return await run_handler(handlers.admin_stats, mongo.sync.db)
+
+
+@app.route('/api/admin/pet-listings', methods=['GET'])
+@jwt_required
+@role_required("admin")
+async def get_all_pet_listings():
+    if request.args.get("export") or ndjson_requested(request.accept_mimetypes):
+        return stream_documents(mongo.read_db.pet_listings.aggregate(export_pipeline()))
+
+    try:
+        listings, next_cursor = await paginate(mongo.read_db.pet_listings, {}, LISTING_CARD_FIELDS)
+    except InvalidCursor as e:
+        return handlers.request_error(e)
+    return jsonify({"items": listings, "next": next_cursor}), 200
+
+
+@app.route('/api/pet-listing/<string:pet_id>', methods=['DELETE'])
+@jwt_required
+async def delete_pet_listing(pet_id):
+    return await run_handler(
+        handlers.delete_pet_listing, mongo.sync.db, media.storage, listing_cache, get_jwt_identity(), pet_id
+    )
+
+
+@app.route('/api/my-adoption-requests', methods=['GET'])
+@jwt_required
+async def get_user_adoption_requests():
+    user = get_jwt_identity()
+    pets_with_requests = await mongo.db.adoption_requests.aggregate(
+        requester_history_pipeline(user['email'])
+    ).to_list(None)
+
+    return jsonify(pets_with_requests), 200
+
+
+@app.route('/api/adoption-request/<string:request_id>', methods=['DELETE'])
+@jwt_required
+async def delete_adoption_request(request_id):
+    return await run_handler(
+        handlers.delete_adoption_request, mongo.sync.db, event_broker, listing_cache, get_jwt_identity(), request_id
+    )
+
+
+if __name__ == '__main__':
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    app.run(port=5000)
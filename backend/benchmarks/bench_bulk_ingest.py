@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_bulk_ingest.py
+"""Time one bulk import of generated listings against a running server.
+
+    python benchmarks/bench_bulk_ingest.py --base-url http://localhost:5000 \
+        --token <JWT> [--rows 10000] [--images 50]
+
+Builds a CSV manifest of --rows listings that cycle through --images small
+images in a zip, posts both to /api/pet-listings/bulk and prints the
+wall time plus the server's inserted/failed counts.
+"""
+import argparse
+import csv
+import io
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zipfile
+
+# Smallest valid PNG (1x1 transparent pixel)
+PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+def build_payload(rows, images):
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow([
+        "name", "species", "age", "description", "ownerName", "phone",
+        "street", "city", "state", "postalCode", "image"
+    ])
+    for i in range(rows):
+        writer.writerow([
+            f"Bench {i}", "Dog" if i % 2 else "Cat", i % 15 + 1, "Generated by bench_bulk_ingest",
+            "Bench Shelter", "9876543210", "1 Test Street", "Bengaluru", "KA", "560001",
+            f"pet{i % images}.png"
+        ])
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for i in range(images):
+            zf.writestr(f"pet{i}.png", PNG)
+    return manifest.getvalue().encode(), archive.getvalue()
+
+
+def multipart(fields):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, (filename, content_type, data) in fields.items():
+        body.write(f"--{boundary}\r\n".encode())
+        body.write(f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'.encode())
+        body.write(f"Content-Type: {content_type}\r\n\r\n".encode())
+        body.write(data)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--images", type=int, default=50)
+    args = parser.parse_args()
+
+    manifest, archive = build_payload(args.rows, args.images)
+    body, content_type = multipart({
+        "manifest": ("manifest.csv", "text/csv", manifest),
+        "images": ("images.zip", "application/zip", archive),
+    })
+    req = urllib.request.Request(
+        f"{args.base_url}/api/pet-listings/bulk",
+        data=body,
+        headers={"Content-Type": content_type, "Authorization": f"Bearer {args.token}"}
+    )
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as resp:
+            report = json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        report = json.loads(e.read())
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.rows} rows in {elapsed:.2f}s ({args.rows / elapsed:.0f} rows/s)")
+    print(f"inserted {report.get('inserted')}, failed {report.get('failed')}")
+
+
+if __name__ == "__main__":
+    main()
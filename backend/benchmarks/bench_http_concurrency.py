@@ -0,0 +1,108 @@
+# backend/benchmarks/bench_http_concurrency.py
+"""Hold many concurrent keep-alive connections against a running server.
+
+    python benchmarks/bench_http_concurrency.py --base-url http://localhost:5000 \
+        [--connections 500] [--duration 20] [--path /api/pet-listings?limit=20]
+
+Run it once against the WSGI app (python app.py / gunicorn app:app) and once
+against the async mode (hypercorn asgi:app) to compare throughput and p99
+at the same concurrency.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; return (status, keep_alive)."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.read()
+        return status, False
+    keep_alive = lines[0].startswith("HTTP/1.1") and headers.get("connection") != "close"
+    return status, keep_alive
+
+
+async def worker(host, port, request, deadline, latencies, statuses):
+    writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            statuses["error"] = statuses.get("error", 0) + 1
+            keep_alive = False
+        if not keep_alive and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(args):
+    url = urlsplit(args.base_url)
+    host, port = url.hostname, url.port or 80
+    request = (
+        f"GET {args.path} HTTP/1.1\r\n"
+        f"Host: {url.netloc}\r\n"
+        "Connection: keep-alive\r\n"
+        "\r\n"
+    ).encode()
+    latencies = []
+    statuses = {}
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(*(
+        worker(host, port, request, deadline, latencies, statuses)
+        for _ in range(args.connections)
+    ))
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--path", default="/api/pet-listings?limit=20")
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    latencies, statuses = asyncio.run(run(args))
+    print(f"{args.connections} connections, {args.duration:.0f}s: {len(latencies) / args.duration:.1f} req/s")
+    print(
+        f"latency p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.1f} ms"
+    )
+    print("responses:", ", ".join(f"{k}={v}" for k, v in sorted(statuses.items(), key=str)))
+
+
+if __name__ == "__main__":
+    main()
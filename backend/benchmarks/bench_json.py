@@ -0,0 +1,83 @@
+# backend/benchmarks/bench_json.py
+"""Compare listing serialization: per-document rewrite + Flask's default
+provider against BSONJSONProvider.
+
+    python benchmarks/bench_json.py [--docs 10000] [--repeat 5]
+"""
+import argparse
+import copy
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from flask import Flask, request
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serialization import BSONJSONProvider  # noqa: E402
+
+
+def make_listings(count):
+    base = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Pet {i}",
+            "species": ("Dog", "Cat", "Rabbit")[i % 3],
+            "age": i % 15 + 1,
+            "description": "Friendly, house-trained and good with children. " * 3,
+            "image": f"/uploads/pet-{i}.jpg",
+            "owner": f"owner{i % 500}@example.com",
+            "owner_contact": {
+                "name": f"Owner {i % 500}",
+                "phone": "5550100000",
+                "address": {"street": "1 Main St", "city": "Springfield", "state": "IL", "postal_code": "62701"}
+            },
+            "status": "Available",
+            "pending_count": i % 4,
+            "created_at": base + timedelta(minutes=i)
+        }
+        for i in range(count)
+    ]
+
+
+def current_path(app, listings):
+    for pet in listings:
+        pet["_id"] = str(pet["_id"])
+        if pet["image"].startswith('/uploads/'):
+            pet["image"] = f"http://{request.host}{pet['image']}"
+    return app.json.dumps({"items": listings, "next": None}).encode()
+
+
+def provider_path(app, listings):
+    return app.json.dumpb({"items": listings, "next": None})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    listings = make_listings(args.docs)
+    default_app = Flask("default")
+    default_app.json = DefaultJSONProvider(default_app)
+    bson_app = Flask("bson")
+    bson_app.json = BSONJSONProvider(bson_app)
+
+    for label, app, path in (
+        ("default provider + per-doc loop", default_app, current_path),
+        ("BSONJSONProvider", bson_app, provider_path),
+    ):
+        with app.test_request_context("/api/pet-listings", base_url="http://localhost:5000"):
+            # The current path mutates documents, so every run gets a fresh copy
+            runs = timeit.repeat(
+                lambda: path(app, copy.deepcopy(listings)), repeat=args.repeat, number=1
+            )
+            copy_cost = min(timeit.repeat(lambda: copy.deepcopy(listings), repeat=args.repeat, number=1))
+        print(f"{label:34} {(min(runs) - copy_cost) * 1000:8.1f} ms for {args.docs} listings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# backend/benchmarks/bench_jwt.py
+"""Authenticated requests per second with and without the verified-token cache.
+
+    python benchmarks/bench_jwt.py [--requests 20000] [--tokens 100]
+
+Sends GET /api/me (@jwt_required) and an admin-only probe route
+(@jwt_required + @role_required) through the test client, round-robin
+over --tokens distinct tokens. Neither route touches MongoDB, so the
+difference between the runs is token handling: JWT_TOKEN_CACHE_SIZE=0
+verifies every request, the default serves repeat tokens from the cache.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import create_app  # noqa: E402
+from auth import role_required  # noqa: E402
+from flask_jwt_extended import create_access_token, jwt_required  # noqa: E402
+from tokens import DEFAULT_TOKEN_CACHE_ENTRIES  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def build_app(cache_size):
+    app = create_app({
+        "JWT_TOKEN_CACHE_SIZE": cache_size,
+        "TELEMETRY_SAMPLE_RATE": 0,
+        "STATS_RECONCILE_INTERVAL": 0
+    })
+    # Skip the per-process threads; they would try to reach MongoDB
+    app.extensions["petpal"]["pid"] = os.getpid()
+
+    @jwt_required()
+    @role_required("admin")
+    def admin_probe():
+        return "", 204
+
+    app.add_url_rule("/bench/admin", "bench_admin", admin_probe)
+    return app
+
+
+def run(app, path, tokens, requests):
+    client = app.test_client()
+    headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+    latencies = []
+    start = time.perf_counter()
+    for i in range(requests):
+        sent = time.perf_counter()
+        response = client.get(path, headers=headers[i % len(headers)])
+        latencies.append(time.perf_counter() - sent)
+        if response.status_code >= 300:
+            raise SystemExit(f"{path} answered {response.status_code}: {response.get_data(as_text=True)}")
+    return requests / (time.perf_counter() - start), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+
+    for label, cache_size in [("no cache", 0), ("cache", DEFAULT_TOKEN_CACHE_ENTRIES)]:
+        app = build_app(cache_size)
+        with app.app_context():
+            tokens = [
+                create_access_token(identity={"email": f"user{i}@bench.petpal", "role": "admin", "name": f"User {i}"})
+                for i in range(args.tokens)
+            ]
+        for path in ["/api/me", "/bench/admin"]:
+            run(app, path, tokens, min(1000, args.requests))
+            rate, latencies = run(app, path, tokens, args.requests)
+            print(
+                f"{label:<9} {path:<13} {rate:8.0f} req/s  "
+                f"p50 {percentile(latencies, 50) * 1e6:6.0f} us  p99 {percentile(latencies, 99) * 1e6:6.0f} us"
+            )
+    print(f"token size: {len(tokens[0])} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# backend/benchmarks/bench_login_flood.py
+"""Flood /api/login while probing a read endpoint, against a running server.
+
+    python benchmarks/bench_login_flood.py --base-url http://localhost:5000 \
+        [--login-threads 32] [--duration 20]
+
+Reports login throughput (and how many were shed with 503 or rate limited
+with 429) plus the p50/p99 latency of GET /api/pet-listings measured during
+the flood. Run the server with RATE_LIMITS=login=off to load the hasher
+rather than the login quota.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+
+def post_json(url, payload):
+    req = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--login-threads", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    credentials = {"email": email, "password": "bench-password"}
+    post_json(f"{args.base_url}/api/signup", dict(credentials, name="Bench"))
+
+    deadline = time.monotonic() + args.duration
+    statuses = []
+    read_latencies = []
+    lock = threading.Lock()
+
+    def flood():
+        while time.monotonic() < deadline:
+            status = post_json(f"{args.base_url}/api/login", credentials)
+            with lock:
+                statuses.append(status)
+
+    def probe():
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            with urllib.request.urlopen(f"{args.base_url}/api/pet-listings?limit=20") as resp:
+                resp.read()
+            read_latencies.append(time.perf_counter() - start)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=flood) for _ in range(args.login_threads)]
+    threads.append(threading.Thread(target=probe))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ok = statuses.count(200)
+    shed = statuses.count(503)
+    limited = statuses.count(429)
+    print(
+        f"logins: {ok / args.duration:.1f}/s succeeded, {shed} shed with 503, "
+        f"{limited} rate limited with 429, {len(statuses)} total"
+    )
+    print(
+        f"GET /api/pet-listings during flood: p50 {percentile(read_latencies, 50) * 1000:.1f} ms, "
+        f"p99 {percentile(read_latencies, 99) * 1000:.1f} ms over {len(read_latencies)} requests"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# backend/benchmarks/bench_startup.py
+"""Measure how long the backend takes to import, build and serve its first request.
+
+    python benchmarks/bench_startup.py [--runs 10]
+
+Each run is a fresh interpreter, so module imports are not cached between
+runs. Reports the median and worst time for: importing app.py, calling
+create_app(), and the first request (/metrics, which does not touch
+MongoDB). Also checks that building the app opened no MongoDB client,
+which is what makes it safe to preload before forking.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app as module
+imported = time.perf_counter()
+application = module.create_app()
+created = time.perf_counter()
+connected = application.config["mongo"]._client is not None
+application.test_client().get("/metrics")
+served = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "create_app": created - imported,
+    "first_request": served - created,
+    "connected_before_request": connected
+}))
+"""
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    for phase in ("import", "create_app", "first_request"):
+        times = [run[phase] * 1000 for run in runs]
+        print(f"{phase:>14}: median {statistics.median(times):7.1f} ms, max {max(times):7.1f} ms")
+    if any(run["connected_before_request"] for run in runs):
+        print("WARNING: create_app() opened a MongoDB client; the app is not fork-safe to preload")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
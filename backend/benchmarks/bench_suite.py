@@ -0,0 +1,352 @@
+# backend/benchmarks/bench_suite.py
+"""Replay a mixed PetPal workload against the Flask app and report per-endpoint numbers.
+
+    python benchmarks/seed.py --mongo-uri mongodb://localhost:27017/petpal_bench --reset
+    python benchmarks/bench_suite.py --mongo-uri mongodb://localhost:27017/petpal_bench \
+        [--workers 8] [--duration 30] [--warmup 5] [--seed 42] \
+        [--output results/base.json] [--compare results/previous.json]
+
+Requests go through the app's test client in this process, so the numbers
+cover Flask, the app code and MongoDB but not the HTTP server (see
+bench_http_concurrency.py for that). The mix follows MIX: mostly anonymous
+browsing, some logins and submissions, owners approving or rejecting
+requests, and the occasional admin dump. For each endpoint the report has
+throughput, p50/p95/p99 latency, MongoDB commands per request and the
+status codes; --output writes it as JSON and --compare prints the change
+against an earlier result. Run it against a database made by seed.py: it
+writes adoption requests and decisions.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import create_app  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from seed import BENCH_PASSWORD, SPECIES, postal_codes, request_form  # noqa: E402
+
+# scenario -> relative weight
+MIX = {
+    "browse": 35,
+    "browse_next": 10,
+    "search": 10,
+    "near": 8,
+    "login": 5,
+    "my_requests": 8,
+    "my_listings": 6,
+    "submit": 10,
+    "decide": 4,
+    "admin_users": 1,
+    "admin_export": 1,
+    "admin_stats": 2,
+}
+POOL_SIZE = 5000
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the MongoDB commands each thread sends."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def count(self):
+        return getattr(self._local, "count", 0)
+
+    def started(self, event):
+        self._local.count = self.count + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class Workload:
+    """Users, listings and pending requests sampled from the seeded database."""
+
+    def __init__(self, app, rng):
+        db = app.config["mongo"].db
+        users = list(db.users.find({}, {"email": 1, "role": 1, "name": 1}))
+        listings = list(db.pet_listings.aggregate([
+            {"$match": {"status": {"$in": ["Available", "Pending"]}}},
+            {"$sample": {"size": POOL_SIZE}},
+            {"$project": {"owner": 1}}
+        ]))
+        pending = list(db.adoption_requests.aggregate([
+            {"$match": {"status": "Pending"}},
+            {"$sample": {"size": POOL_SIZE}},
+            {"$project": {"pet_id": 1}}
+        ]))
+        if not users or not listings:
+            raise SystemExit("No users or listings found; run benchmarks/seed.py first")
+
+        with app.app_context():
+            self.tokens = {
+                user["email"]: create_access_token(identity={
+                    "email": user["email"], "role": user["role"], "name": user.get("name")
+                })
+                for user in users
+            }
+        self.users = [user["email"] for user in users if user["role"] != "admin"]
+        self.admins = [user["email"] for user in users if user["role"] == "admin"]
+        self.owners = sorted({listing["owner"] for listing in listings})
+        self.listings = [(str(listing["_id"]), listing["owner"]) for listing in listings]
+        owners = {listing["_id"]: listing["owner"] for listing in db.pet_listings.find(
+            {"_id": {"$in": [request["pet_id"] for request in pending]}}, {"owner": 1}
+        )}
+        rng.shuffle(pending)
+        # Each pending request is decided once; deque pops are thread-safe
+        self.pending = deque(
+            (str(request["pet_id"]), request["_id"], owners[request["pet_id"]])
+            for request in pending if request["pet_id"] in owners
+        )
+        self.codes = postal_codes()
+
+    def auth(self, email):
+        return {"Authorization": f"Bearer {self.tokens[email]}"}
+
+
+def scenario_requests(name, workload, rng, client):
+    """Yield (endpoint, callable) pairs for one scenario run; each response is sent back in."""
+    if name == "browse":
+        yield "GET /api/pet-listings", lambda: client.get("/api/pet-listings?limit=20")
+    elif name == "browse_next":
+        first = yield "GET /api/pet-listings", lambda: client.get("/api/pet-listings?limit=20")
+        cursor = first is not None and (first.get_json(silent=True) or {}).get("next")
+        if cursor:
+            yield "GET /api/pet-listings?cursor", lambda: client.get(
+                f"/api/pet-listings?limit=20&cursor={cursor}"
+            )
+    elif name == "search":
+        yield "GET /api/pet-listings/search", lambda: client.get(
+            f"/api/pet-listings/search?species={rng.choice(SPECIES)}&max_age={rng.randint(2, 15)}&limit=20"
+        )
+    elif name == "near":
+        yield "GET /api/pet-listings/near", lambda: client.get(
+            f"/api/pet-listings/near?postal_code={rng.choice(workload.codes)}&radius_km={rng.choice([5, 25, 100])}"
+        )
+    elif name == "login":
+        yield "POST /api/login", lambda: client.post(
+            "/api/login", json={"email": rng.choice(workload.users), "password": BENCH_PASSWORD}
+        )
+    elif name == "my_requests":
+        yield "GET /api/my-adoption-requests", lambda: client.get(
+            "/api/my-adoption-requests", headers=workload.auth(rng.choice(workload.users))
+        )
+    elif name == "my_listings":
+        yield "GET /api/my-pet-listings", lambda: client.get(
+            "/api/my-pet-listings", headers=workload.auth(rng.choice(workload.owners))
+        )
+    elif name == "submit":
+        pet_id, owner = rng.choice(workload.listings)
+        requester = rng.choice([user for user in rng.sample(workload.users, 3) if user != owner] or workload.users)
+        yield "POST /api/adoption-request", lambda: client.post(
+            "/api/adoption-request", json=request_form(rng, pet_id), headers=workload.auth(requester)
+        )
+    elif name == "decide":
+        try:
+            pet_id, request_id, owner = workload.pending.popleft()
+        except IndexError:
+            return
+        status = "Approved" if rng.random() < 0.3 else "Rejected"
+        yield "PUT /api/adoption-request/<pet>/<request>", lambda: client.put(
+            f"/api/adoption-request/{pet_id}/{request_id}", json={"status": status}, headers=workload.auth(owner)
+        )
+    elif name == "admin_users":
+        yield "GET /api/admin/users", lambda: client.get(
+            "/api/admin/users", headers=workload.auth(rng.choice(workload.admins))
+        )
+    elif name == "admin_export":
+        yield "GET /api/admin/pet-listings?export", lambda: client.get(
+            "/api/admin/pet-listings?export=1", headers=workload.auth(rng.choice(workload.admins))
+        )
+    elif name == "admin_stats":
+        yield "GET /api/admin/stats", lambda: client.get(
+            "/api/admin/stats", headers=workload.auth(rng.choice(workload.admins))
+        )
+
+
+def worker(app, workload, counter, seed, warmup_until, deadline, results):
+    rng = random.Random(seed)
+    mix = [name for name in MIX if name not in ("admin_users", "admin_export", "admin_stats") or workload.admins]
+    weights = [MIX[name] for name in mix]
+    client = app.test_client()
+    while time.monotonic() < deadline:
+        name = rng.choices(mix, weights)[0]
+        steps = scenario_requests(name, workload, rng, client)
+        response = None
+        while True:
+            try:
+                endpoint, send = steps.send(response)
+            except StopIteration:
+                break
+            ops = counter.count
+            start = time.perf_counter()
+            try:
+                response = send()
+                response.get_data()
+                response.close()
+                status = response.status_code
+            except Exception:
+                response, status = None, "error"
+            elapsed = time.perf_counter() - start
+            if time.monotonic() >= warmup_until:
+                results.append((endpoint, status, elapsed, counter.count - ops))
+
+
+def summarize(results, duration):
+    by_endpoint = defaultdict(list)
+    for result in results:
+        by_endpoint[result[0]].append(result)
+
+    def stats(rows):
+        latencies = [row[2] for row in rows]
+        statuses = defaultdict(int)
+        for row in rows:
+            statuses[str(row[1])] += 1
+        return {
+            "requests": len(rows),
+            "throughput": round(len(rows) / duration, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "mongo_ops_per_request": round(sum(row[3] for row in rows) / len(rows), 2),
+            "errors": sum(n for status, n in statuses.items() if status == "error" or status.startswith("5")),
+            "statuses": dict(sorted(statuses.items()))
+        }
+
+    return {
+        "endpoints": {endpoint: stats(rows) for endpoint, rows in sorted(by_endpoint.items())},
+        "total": stats(results) if results else {}
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report):
+    print(f"{'endpoint':<40} {'req':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'ops':>6} {'err':>5}")
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    for endpoint, stats in rows:
+        if not stats:
+            continue
+        print(
+            f"{endpoint:<40} {stats['requests']:>7} {stats['throughput']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+            f"{stats['mongo_ops_per_request']:>6.1f} {stats['errors']:>5}"
+        )
+
+
+def print_comparison(report, previous):
+    """Relative change per endpoint; positive p95 and negative req/s are regressions."""
+    print(f"\nvs {previous['meta'].get('commit')} ({previous['meta'].get('started_at')})")
+    print(f"{'endpoint':<40} {'req/s':>9} {'p95':>9} {'p99':>9} {'ops':>7}")
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    before_rows = dict(previous["endpoints"], total=previous["total"])
+    for endpoint, stats in rows:
+        before = before_rows.get(endpoint)
+        if not stats or not before:
+            continue
+
+        def change(field):
+            if not before[field]:
+                return "n/a"
+            return f"{(stats[field] - before[field]) / before[field] * 100:+.1f}%"
+
+        print(
+            f"{endpoint:<40} {change('throughput'):>9} {change('p95_ms'):>9} {change('p99_ms'):>9} "
+            f"{stats['mongo_ops_per_request'] - before['mongo_ops_per_request']:>+7.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/petpal_bench")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this path.")
+    parser.add_argument("--compare", help="Earlier --output file to compare against.")
+    args = parser.parse_args()
+
+    # Registered before the app's client is created, so it sees every command
+    counter = CommandCounter()
+    monitoring.register(counter)
+    app = create_app({
+        "MONGO_URI": args.mongo_uri,
+        "TELEMETRY_SAMPLE_RATE": 0,
+        "STATS_RECONCILE_INTERVAL": 0
+    })
+    workload = Workload(app, random.Random(args.seed))
+
+    results = []
+    started_at = datetime.utcnow()
+    start = time.monotonic()
+    warmup_until = start + args.warmup
+    deadline = warmup_until + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(
+            app, workload, counter, args.seed + i, warmup_until, deadline, results
+        ))
+        for i in range(args.workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = summarize(results, args.duration)
+    report["meta"] = {
+        "started_at": started_at.isoformat() + "Z",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workers": args.workers,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "mix": MIX,
+        "database": {
+            name: app.config["mongo"].db[name].estimated_document_count()
+            for name in ("users", "pet_listings", "adoption_requests")
+        }
+    }
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
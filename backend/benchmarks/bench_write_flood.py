@@ -0,0 +1,124 @@
+# backend/benchmarks/bench_write_flood.py
+"""Flood the rate-limited write endpoints while probing a read, against a running server.
+
+    python benchmarks/bench_write_flood.py --base-url http://localhost:5000 \
+        [--write-threads 32] [--users 4] [--duration 20]
+
+Measures GET /api/pet-listings p50/p99 alone first, then again while
+--write-threads hammer /api/signup and /api/login (keyed by client address)
+and /api/adoption-request (keyed by the JWT email of --users accounts).
+Reports the write status counts: 429 is a spent quota, 503 the
+WRITE_CONCURRENCY cap. With the limiter doing its job the read p99 under
+the flood stays close to the baseline.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+
+
+def post_json(url, payload, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = urllib.request.Request(url, data=json.dumps(payload).encode(), headers=headers)
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def probe_reads(base_url, deadline, latencies):
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"{base_url}/api/pet-listings?limit=20") as resp:
+            resp.read()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.05)
+
+
+def report(label, latencies):
+    print(
+        f"GET /api/pet-listings {label}: p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.1f} ms over {len(latencies)} requests"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--write-threads", type=int, default=32)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    tokens = []
+    for i in range(args.users):
+        status, body = post_json(f"{args.base_url}/api/signup", {
+            "name": f"Bench {i}", "email": f"bench-{uuid.uuid4().hex[:8]}@example.com", "password": "bench-password"
+        })
+        if status != 201:
+            raise SystemExit(f"signup answered {status}; raise the signup quota (RATE_LIMITS=signup=100/minute)")
+        tokens.append(body["access_token"])
+    with urllib.request.urlopen(f"{args.base_url}/api/pet-listings?limit=1") as resp:
+        listings = json.loads(resp.read())["items"]
+    if not listings:
+        raise SystemExit("no listings to request; seed the database first (benchmarks/seed.py)")
+    pet_id = listings[0]["_id"]
+
+    baseline = []
+    probe_reads(args.base_url, time.monotonic() + min(5.0, args.duration), baseline)
+
+    deadline = time.monotonic() + args.duration
+    statuses = {"signup": Counter(), "login": Counter(), "adoption-request": Counter()}
+    lock = threading.Lock()
+
+    def flood(worker):
+        token = tokens[worker % len(tokens)]
+        n = 0
+        while time.monotonic() < deadline:
+            kind = ["signup", "login", "adoption-request"][n % 3]
+            if kind == "signup":
+                payload = {"name": "Flood", "email": f"flood-{uuid.uuid4().hex}@example.com", "password": "x" * 12}
+                status, _ = post_json(f"{args.base_url}/api/signup", payload)
+            elif kind == "login":
+                status, _ = post_json(f"{args.base_url}/api/login", {"email": "nobody@example.com", "password": "x"})
+            else:
+                payload = {
+                    "pet_listing_id": pet_id, "contact": "8000000000", "address": "1 Flood Street",
+                    "city": "Bench City", "state": "BC", "postalCode": "560001", "homeType": "House",
+                    "hoursAlone": "2", "petExperience": "Some", "adoptionReason": "Benchmark."
+                }
+                status, _ = post_json(f"{args.base_url}/api/adoption-request", payload, token)
+            with lock:
+                statuses[kind][status] += 1
+            n += 1
+
+    flood_latencies = []
+    threads = [threading.Thread(target=flood, args=(i,)) for i in range(args.write_threads)]
+    threads.append(threading.Thread(target=probe_reads, args=(args.base_url, deadline, flood_latencies)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for kind, counts in statuses.items():
+        print(f"{kind:<17} " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+    report("alone", baseline)
+    report("during flood", flood_latencies)
+
+
+if __name__ == "__main__":
+    main()
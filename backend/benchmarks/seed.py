@@ -0,0 +1,188 @@
+# backend/benchmarks/seed.py
+"""Fill a MongoDB database with synthetic users, listings and adoption requests.
+
+    python benchmarks/seed.py --mongo-uri mongodb://localhost:27017/petpal_bench --reset \
+        [--users 2000] [--listings 10000] [--requests-per-listing 3] [--seed 42]
+
+Documents are built with the same validation helpers the routes use, so
+they have the production shape. The same --seed always produces the same
+data (apart from ObjectIds), which keeps benchmark runs comparable. Every
+account's password is BENCH_PASSWORD; the first --admins accounts are
+admins and the next --owners post the listings.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+from werkzeug.security import generate_password_hash
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geo import DEFAULT_CENTROIDS_PATH, PostalCentroids  # noqa: E402
+from hashing import DEFAULT_HASH_METHOD  # noqa: E402
+from indexes import ensure_indexes  # noqa: E402
+from stats import ARCHIVE_COLLECTIONS, reconcile_stats  # noqa: E402
+from validation import adoption_request_from_json, listing_from_form  # noqa: E402
+
+BENCH_PASSWORD = "bench-password"
+SEEDED_COLLECTIONS = [
+    "users", "pet_listings", "adoption_requests", *ARCHIVE_COLLECTIONS.values(), "admin_stats", "events"
+]
+SPECIES = ["Dog", "Cat", "Rabbit", "Bird", "Hamster", "Guinea Pig"]
+PET_NAMES = ["Rex", "Luna", "Milo", "Bella", "Coco", "Max", "Daisy", "Simba", "Nala", "Oscar", "Pepper", "Toby"]
+TRAITS = [
+    "friendly", "playful", "calm", "house-trained", "vaccinated", "neutered", "curious",
+    "energetic", "shy", "gentle", "loves walks", "good with children", "likes cuddles"
+]
+# Share of listings whose postal code has no centroid, so they have no location
+UNKNOWN_POSTAL_SHARE = 0.1
+ADOPTED_SHARE = 0.15
+PENDING_SHARE = 0.6
+HISTORY_DAYS = 180
+
+
+def user_email(index):
+    return f"user{index}@bench.petpal"
+
+
+def postal_codes(path=DEFAULT_CENTROIDS_PATH):
+    with open(path, newline="") as f:
+        return [row["postal_code"] for row in csv.DictReader(f)]
+
+
+def listing_row(rng, index, codes):
+    postal_code = f"9{index % 100000:05d}" if rng.random() < UNKNOWN_POSTAL_SHARE else rng.choice(codes)
+    return {
+        "name": f"{rng.choice(PET_NAMES)} {index}",
+        "species": rng.choice(SPECIES),
+        "age": rng.randint(1, 15),
+        "description": ", ".join(rng.sample(TRAITS, 4)).capitalize() + ".",
+        "ownerName": f"Owner {index}",
+        "phone": f"9{rng.randint(0, 999999999):09d}",
+        "street": f"{rng.randint(1, 400)} Main Road",
+        "city": f"City {postal_code[:3]}",
+        "state": f"S{postal_code[:1]}",
+        "postalCode": postal_code
+    }
+
+
+def request_form(rng, pet_id):
+    return {
+        "pet_listing_id": str(pet_id),
+        "contact": f"8{rng.randint(0, 999999999):09d}",
+        "address": f"{rng.randint(1, 400)} Park Street",
+        "city": "Bench City",
+        "state": "BC",
+        "postalCode": "560001",
+        "homeType": rng.choice(["House", "Apartment", "Farm"]),
+        "hoursAlone": str(rng.randint(0, 10)),
+        "petExperience": rng.choice(["None", "Some", "Lots"]),
+        "adoptionReason": "Looking for a companion."
+    }
+
+
+def build_requests(rng, listing, applicants, count, now):
+    """Requests for one listing, with the listing's counters and status set to match."""
+    requests = []
+    requesters = rng.sample(applicants, count)
+    adopted = count and rng.random() < ADOPTED_SHARE
+    for position, email in enumerate(requesters):
+        request = adoption_request_from_json(
+            request_form(rng, listing["_id"]), {"email": email, "name": email.split("@")[0]}
+        )
+        request["request_date"] = listing["created_at"] + timedelta(hours=rng.randint(1, 24 * 14))
+        if adopted:
+            request["status"] = "Approved" if position == 0 else "Rejected"
+        elif rng.random() >= PENDING_SHARE:
+            request["status"] = "Rejected"
+        if request["status"] != "Pending":
+            request["updated_at"] = min(now, request["request_date"] + timedelta(days=rng.randint(0, 7)))
+        requests.append(request)
+
+    pending = sum(1 for request in requests if request["status"] == "Pending")
+    listing["request_count"] = count
+    listing["pending_count"] = pending
+    listing["status"] = "Adopted" if adopted else ("Pending" if pending else "Available")
+    return requests
+
+
+def seed_database(db, users=2000, listings=10000, requests_per_listing=3, admins=5, owners=None,
+                  seed=42, batch_size=1000):
+    """Insert the synthetic data set into ``db``; returns the document counts."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    owners = owners or max(1, users // 5)
+    emails = [user_email(i) for i in range(users)]
+    owner_emails = emails[admins:admins + owners]
+    applicant_emails = emails[admins + owners:] or emails[admins:]
+
+    # One hash for every account: seeding stays fast and logins still pay the full cost
+    password_hash = generate_password_hash(BENCH_PASSWORD, DEFAULT_HASH_METHOD)
+    for start in range(0, users, batch_size):
+        db.users.insert_many([
+            {
+                "name": f"Bench User {i}",
+                "email": emails[i],
+                "password": password_hash,
+                "role": "admin" if i < admins else "user"
+            }
+            for i in range(start, min(users, start + batch_size))
+        ], ordered=False)
+
+    centroids = PostalCentroids()
+    codes = postal_codes()
+    listing_count = request_count = 0
+    for start in range(0, listings, batch_size):
+        batch_listings, batch_requests = [], []
+        for index in range(start, min(listings, start + batch_size)):
+            listing = listing_from_form(listing_row(rng, index, codes), rng.choice(owner_emails), centroids)
+            listing["_id"] = ObjectId()
+            listing["image"] = "/uploads/bench.jpg"
+            listing["created_at"] = now - timedelta(minutes=rng.randint(0, HISTORY_DAYS * 24 * 60))
+            count = min(len(applicant_emails), rng.randint(0, 2 * requests_per_listing))
+            batch_requests += build_requests(rng, listing, applicant_emails, count, now)
+            batch_listings.append(listing)
+        db.pet_listings.insert_many(batch_listings, ordered=False)
+        if batch_requests:
+            db.adoption_requests.insert_many(batch_requests, ordered=False)
+        listing_count += len(batch_listings)
+        request_count += len(batch_requests)
+
+    ensure_indexes(db)
+    reconcile_stats(db)
+    return {"users": users, "pet_listings": listing_count, "adoption_requests": request_count}
+
+
+def reset_database(db):
+    for name in SEEDED_COLLECTIONS:
+        db.drop_collection(name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/petpal_bench")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--listings", type=int, default=10000)
+    parser.add_argument("--requests-per-listing", type=int, default=3)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop the seeded collections first.")
+    parser.add_argument("--force", action="store_true", help="Allow --reset on a database not named *bench*.")
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_uri).get_default_database()
+    if args.reset:
+        if "bench" not in db.name and not args.force:
+            parser.error(f"refusing to reset database {db.name!r}; pass --force")
+        reset_database(db)
+    counts = seed_database(
+        db, args.users, args.listings, args.requests_per_listing, args.admins, seed=args.seed
+    )
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# backend/cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import Response, request
+
+CachedResponse = namedtuple("CachedResponse", ["etag", "body"])
+
+
+class LocalCacheBackend:
+    """In-process LRU with per-entry expiry; the version counter is per process.
+
+    Only invalidates the process that handled the write, so with several
+    workers the others serve stale entries until CACHE_TTL runs out. Meant
+    for a single process; multi-worker deployments set CACHE_REDIS_URL.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self):
+        return self._version
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+            # Entries of older versions can never be read again
+            self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend so every worker sees the same entries and version counter."""
+
+    def __init__(self, url, prefix="petpal:cache:"):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        value = self._redis.get(self._prefix + key)
+        if value is None:
+            return None
+        etag, _, body = value.partition(b":")
+        return CachedResponse(etag.decode(), body)
+
+    def set(self, key, value, ttl):
+        self._redis.setex(
+            self._prefix + key, max(1, int(ttl)), value.etag.encode() + b":" + value.body
+        )
+
+    def version(self):
+        return int(self._redis.get(self._prefix + "version") or 0)
+
+    def bump(self):
+        self._redis.incr(self._prefix + "version")
+
+
+class ResponseCache:
+    """Serialized JSON responses keyed by request and a write version.
+
+    Write handlers call invalidate(), which bumps the version so every
+    entry cached before the write is skipped.
+    """
+
+    def __init__(self, backend, ttl=30):
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, key):
+        """Namespace ``key`` by the current version.
+
+        Take the key before querying so a response built while a write lands
+        is stored under the old version, never under the new one.
+        """
+        return f"v{self.backend.version()}:{key}"
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, body):
+        entry = CachedResponse(hashlib.sha256(body).hexdigest()[:32], body)
+        self.backend.set(key, entry, self.ttl)
+        return entry
+
+    def invalidate(self):
+        self.backend.bump()
+
+    @staticmethod
+    def tag(response, entry):
+        """Set the ETag and revalidation headers of ``entry`` on a Flask or Quart response."""
+        response.set_etag(entry.etag)
+        # Clients must revalidate, which is a cheap 304 while nothing changed
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @classmethod
+    def respond(cls, entry):
+        """Build the response for ``entry``, answering 304 when If-None-Match matches."""
+        response = cls.tag(Response(entry.body, mimetype="application/json"), entry)
+        return response.make_conditional(request)
+
+
+def create_response_cache(app):
+    redis_url = app.config.get("CACHE_REDIS_URL")
+    if redis_url:
+        backend = RedisCacheBackend(redis_url)
+    else:
+        backend = LocalCacheBackend(app.config.get("CACHE_MAX_ENTRIES", 256))
+    return ResponseCache(backend, app.config.get("CACHE_TTL", 30))
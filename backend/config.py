@@ -0,0 +1,111 @@
+# backend/config.py
+import os
+from hashing import DEFAULT_HASH_METHOD
+from media import DEFAULT_MAX_IMAGE_BYTES
+from models import DEFAULT_MONGO_URI
+from tokens import DEFAULT_STREAM_TOKEN_TTL, DEFAULT_TOKEN_CACHE_ENTRIES, TOKEN_AUDIENCE, TOKEN_ISSUER
+
+
+def load_config(config):
+    """Apply settings shared by the WSGI and ASGI apps to ``config``."""
+    config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "super-secret-key")
+    config["JWT_ACCESS_TOKEN_EXPIRES"] = False
+    config["JWT_SUBJECT_CLAIM"] = None
+    config["JWT_IDENTITY_CLAIM"] = "identity"
+    # Compact tokens: iss/aud come from here and are checked on decode; nbf
+    # repeats iat and csrf only matters for cookie tokens, which are unused
+    config["JWT_ENCODE_ISSUER"] = config["JWT_DECODE_ISSUER"] = TOKEN_ISSUER
+    config["JWT_ENCODE_AUDIENCE"] = config["JWT_DECODE_AUDIENCE"] = TOKEN_AUDIENCE
+    config["JWT_ENCODE_NBF"] = False
+    config["JWT_COOKIE_CSRF_PROTECT"] = False
+    # Recently verified tokens skip the HMAC check; 0 disables the cache
+    config["JWT_TOKEN_CACHE_SIZE"] = int(os.environ.get("JWT_TOKEN_CACHE_SIZE", DEFAULT_TOKEN_CACHE_ENTRIES))
+    config['UPLOAD_FOLDER'] = 'uploads'
+    # MongoDB client; unset pool/timeout values keep the driver defaults
+    config["MONGO_URI"] = os.environ.get("MONGO_URI", DEFAULT_MONGO_URI)
+    # wsgi.py applies the index manifest before serving (0 when a deploy step
+    # runs `flask ensure-indexes` instead); PETPAL_CHECK_QUERY_PLANS also fails
+    # startup on a collection scan in any registered query shape
+    config["ENSURE_INDEXES"] = os.environ.get("ENSURE_INDEXES", "1") == "1"
+    config["CHECK_QUERY_PLANS"] = bool(os.environ.get("PETPAL_CHECK_QUERY_PLANS"))
+    config["MONGO_MAX_POOL_SIZE"] = int(os.environ.get("MONGO_MAX_POOL_SIZE", 0)) or None
+    config["MONGO_MIN_POOL_SIZE"] = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0)) or None
+    config["MONGO_CONNECT_TIMEOUT_MS"] = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", 0)) or None
+    config["MONGO_SERVER_SELECTION_TIMEOUT_MS"] = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 0)) or None
+    config["MONGO_SOCKET_TIMEOUT_MS"] = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", 0)) or None
+    config["MONGO_WAIT_QUEUE_TIMEOUT_MS"] = int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None
+    # Public feeds, search and admin exports; e.g. secondaryPreferred on a replica set
+    config["MONGO_READ_PREFERENCE"] = os.environ.get("MONGO_READ_PREFERENCE", "primary")
+    config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
+    # Whole request body; Werkzeug answers 413 from Content-Length before reading
+    config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_CONTENT_LENGTH", 12 * 1024 * 1024))
+    config["MAX_IMAGE_BYTES"] = int(os.environ.get("MAX_IMAGE_BYTES", DEFAULT_MAX_IMAGE_BYTES))
+    config["MAX_BULK_CONTENT_LENGTH"] = int(os.environ.get("MAX_BULK_CONTENT_LENGTH", 512 * 1024 * 1024))
+    config["UPLOAD_TMP_DIR"] = os.environ.get("UPLOAD_TMP_DIR")
+    config["MEDIA_STORAGE"] = os.environ.get("MEDIA_STORAGE", "local")
+    config["MEDIA_OFFLOAD"] = os.environ.get("MEDIA_OFFLOAD")
+    config["MEDIA_ACCEL_PREFIX"] = os.environ.get("MEDIA_ACCEL_PREFIX", "/protected-uploads")
+    config["IMAGE_WORKERS"] = int(os.environ.get("IMAGE_WORKERS", 2))
+    # Listing feed cache. Without CACHE_REDIS_URL each worker process keeps its
+    # own entries and write version, so a write only invalidates the worker
+    # that served it and the others answer with the old feed for up to
+    # CACHE_TTL seconds; set it whenever more than one worker runs
+    config["CACHE_TTL"] = int(os.environ.get("CACHE_TTL", 30))
+    config["CACHE_MAX_ENTRIES"] = int(os.environ.get("CACHE_MAX_ENTRIES", 256))
+    config["CACHE_REDIS_URL"] = os.environ.get("CACHE_REDIS_URL")
+    # postal_code,latitude,longitude CSV for listing locations; unset falls back
+    # to the small bundled sample in data/ and logs a warning at startup
+    config["POSTAL_CENTROIDS_PATH"] = os.environ.get("POSTAL_CENTROIDS_PATH")
+    config["MEDIA_BASE_URL"] = os.environ.get("MEDIA_BASE_URL")
+    config["TELEMETRY_SAMPLE_RATE"] = float(os.environ.get("TELEMETRY_SAMPLE_RATE", 0.01))
+    config["TELEMETRY_LOG_HEADERS"] = os.environ.get("TELEMETRY_LOG_HEADERS") == "1"
+    # Bearer token Prometheus sends for /metrics. Unset, /metrics answers no one
+    config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+    # 1 lets loopback connections read /metrics without the token. Only for
+    # hosts with no local proxy: everything a proxy on the same host forwards
+    # arrives from loopback too
+    config["METRICS_ALLOW_LOOPBACK"] = os.environ.get("METRICS_ALLOW_LOOPBACK", "0") == "1"
+    # Each server process starts the stats reconciler, the archiver and the
+    # change-stream watcher behind /api/events; 0 skips all three (tests, or a
+    # process that should only serve requests)
+    config["BACKGROUND_WORK"] = os.environ.get("BACKGROUND_WORK", "1") == "1"
+    # Seconds between full $merge rebuilds of the admin stats counters, run by one
+    # process across the deployment (a lease in Mongo); 0 disables, e.g. to
+    # schedule `flask reconcile-stats` from cron instead
+    config["STATS_RECONCILE_INTERVAL"] = int(os.environ.get("STATS_RECONCILE_INTERVAL", 3600))
+    # Listings Adopted for ARCHIVE_ADOPTED_DAYS, or Available and idle for
+    # ARCHIVE_STALE_DAYS, move to the archive every ARCHIVE_INTERVAL seconds; 0 disables each.
+    # One process across the deployment runs each pass (a lease in Mongo); with
+    # ARCHIVE_INTERVAL=0, schedule `flask archive-listings` from cron instead
+    config["ARCHIVE_ADOPTED_DAYS"] = int(os.environ.get("ARCHIVE_ADOPTED_DAYS", 90))
+    config["ARCHIVE_STALE_DAYS"] = int(os.environ.get("ARCHIVE_STALE_DAYS", 365))
+    config["ARCHIVE_INTERVAL"] = int(os.environ.get("ARCHIVE_INTERVAL", 3600))
+    config["ARCHIVE_BATCH_SIZE"] = int(os.environ.get("ARCHIVE_BATCH_SIZE", 200))
+    # Seconds between SSE keepalive comments, under typical proxy idle timeouts
+    config["EVENTS_HEARTBEAT"] = int(os.environ.get("EVENTS_HEARTBEAT", 15))
+    # Open /api/events streams per process under gunicorn, where each holds a
+    # worker thread (GUNICORN_THREADS); more get 503. 0 disables. asgi.py holds
+    # no thread per stream and ignores it
+    config["EVENTS_MAX_STREAMS"] = int(os.environ.get("EVENTS_MAX_STREAMS", 8))
+    # Lifetime of the single-purpose token EventSource sends in its URL
+    config["EVENTS_TOKEN_TTL"] = int(os.environ.get("EVENTS_TOKEN_TTL", DEFAULT_STREAM_TOKEN_TTL))
+    # Reverse proxies in front of the app that append X-Forwarded-For (nginx,
+    # a load balancer: usually 1). Anonymous quotas key on the client address,
+    # so behind a proxy this must be set or every client shares the proxy's
+    # bucket; left at 0 when clients connect directly, so they cannot spoof it
+    config["TRUSTED_PROXY_HOPS"] = int(os.environ.get("TRUSTED_PROXY_HOPS", 0))
+    # Per-identity quotas for the write views (see ratelimit.DEFAULT_RATE_LIMITS),
+    # shared across workers through Redis when RATE_LIMIT_REDIS_URL is set
+    config["RATE_LIMITS"] = os.environ.get("RATE_LIMITS")
+    config["RATE_LIMIT_REDIS_URL"] = os.environ.get("RATE_LIMIT_REDIS_URL")
+    config["RATE_LIMIT_MAX_KEYS"] = int(os.environ.get("RATE_LIMIT_MAX_KEYS", 10000))
+    # Write requests running at once in each worker process, so the server-wide
+    # cap is workers x WRITE_CONCURRENCY; the rest get 503. 0 disables
+    config["WRITE_CONCURRENCY"] = int(os.environ.get("WRITE_CONCURRENCY", 8))
+    config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+    # Hashing processes in each server process's pool (default 2), so the
+    # server-wide total is workers x PASSWORD_HASH_WORKERS; keep that near the
+    # core count. Started from a forkserver, not forked from the worker
+    config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", 0)) or None
+    config["PASSWORD_HASH_MAX_PENDING"] = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 0)) or None
+    config["PASSWORD_HASH_TIMEOUT"] = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 5))
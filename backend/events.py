@@ -0,0 +1,166 @@
+# backend/events.py
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger("petpal.events")
+
+EVENTS_COLLECTION = "events"
+# Change streams need a replica set; standalone servers answer with this code
+CHANGE_STREAM_UNSUPPORTED = 40573
+MAX_REPLAY = 500
+RETRY_MS = 3000
+WATCH_RETRY_SECONDS = 5
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+KEEPALIVE = ": keepalive\n\n"
+RETRY_FIELD = f"retry: {RETRY_MS}\n\n"
+
+
+def new_event(users, event_type, data):
+    return {
+        "_id": ObjectId(),
+        "users": sorted({user for user in users if user}),
+        "type": event_type,
+        "data": data,
+        "created_at": datetime.utcnow()
+    }
+
+
+def record_event(db, users, event_type, data, session=None):
+    """Store an event for ``users`` and return it.
+
+    Events are written next to the change they describe (in the same
+    transaction when there is one), so a client never sees an event for a
+    write that rolled back, and reconnecting clients can replay them.
+    """
+    event = new_event(users, event_type, data)
+    if event["users"]:
+        db[EVENTS_COLLECTION].insert_one(event, session=session)
+    return event
+
+
+def parse_event_id(value):
+    try:
+        return ObjectId(value) if value else None
+    except (InvalidId, TypeError):
+        return None
+
+
+def replay_query(user, last_id):
+    return {"users": user, "_id": {"$gt": last_id}}
+
+
+def format_event(event):
+    return f"id: {event['_id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+class EventBroker:
+    """Fans stored events out to the SSE connections of this process.
+
+    One daemon thread per process tails a change stream on the events
+    collection and hands each insert to the subscribers of its users, so
+    every process sees events written by any other. Without a replica set
+    there is no change stream; the write routes then pass their events to
+    ``published`` and delivery is limited to this process.
+
+    ``max_streams`` caps the open streams of this process, for servers
+    where each one holds a worker thread; None leaves them uncapped.
+    """
+
+    def __init__(self, max_streams=None):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._streams = threading.BoundedSemaphore(max_streams) if max_streams else None
+        self.streaming = False
+
+    def open_stream(self):
+        """Take a stream slot; False when all ``max_streams`` are in use."""
+        return self._streams is None or self._streams.acquire(blocking=False)
+
+    def close_stream(self):
+        if self._streams is not None:
+            self._streams.release()
+
+    def subscribe(self, user, callback):
+        with self._lock:
+            self._subscribers[user].add(callback)
+
+    def unsubscribe(self, user, callback):
+        with self._lock:
+            self._subscribers[user].discard(callback)
+            if not self._subscribers[user]:
+                del self._subscribers[user]
+
+    def dispatch(self, event):
+        with self._lock:
+            callbacks = [cb for user in event["users"] for cb in self._subscribers.get(user, ())]
+        for callback in callbacks:
+            callback(event)
+
+    def published(self, events):
+        # The change stream delivers these when it is running
+        if not self.streaming:
+            for event in events:
+                self.dispatch(event)
+
+    def watch(self, db):
+        threading.Thread(target=self._watch, args=(db,), name="event-stream", daemon=True).start()
+
+    def _watch(self, db):
+        resume_token = None
+        while True:
+            try:
+                with db[EVENTS_COLLECTION].watch(
+                    [{"$match": {"operationType": "insert"}}], resume_after=resume_token
+                ) as stream:
+                    self.streaming = True
+                    for change in stream:
+                        resume_token = stream.resume_token
+                        self.dispatch(change["fullDocument"])
+            except OperationFailure as e:
+                self.streaming = False
+                if e.code == CHANGE_STREAM_UNSUPPORTED:
+                    logger.info("Change streams unavailable; delivering events in-process only")
+                    return
+                # The server rejected the stream (e.g. the resume point left the oplog)
+                resume_token = None
+                logger.exception("Event change stream failed; retrying")
+            except PyMongoError:
+                self.streaming = False
+                logger.exception("Event change stream failed; retrying")
+            time.sleep(WATCH_RETRY_SECONDS)
+
+
+def event_stream(db, broker, user, last_event_id=None, heartbeat=15):
+    """SSE body for one client: missed events after ``last_event_id``, then live ones.
+
+    The subscription starts before the replay query so nothing falls in
+    between; events seen in the replay are not sent twice.
+    """
+    pending = queue.Queue()
+    broker.subscribe(user, pending.put)
+    try:
+        yield RETRY_FIELD
+        replayed = set()
+        last_id = parse_event_id(last_event_id)
+        if last_id:
+            for event in db[EVENTS_COLLECTION].find(replay_query(user, last_id)).sort("_id", 1).limit(MAX_REPLAY):
+                replayed.add(event["_id"])
+                yield format_event(event)
+        while True:
+            try:
+                event = pending.get(timeout=heartbeat)
+            except queue.Empty:
+                yield KEEPALIVE
+                continue
+            if event["_id"] not in replayed:
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(user, pending.put)
@@ -0,0 +1,134 @@
+# backend/geo.py
+import csv
+import logging
+import os
+from pagination import decode_rank_cursor, encode_rank_cursor
+from search import SEARCH_RESULT_FIELDS
+from validation import ValidationError
+
+logger = logging.getLogger("petpal.geo")
+
+# A small sample of major city codes, enough for development; production
+# points POSTAL_CENTROIDS_PATH at a full postal_code,latitude,longitude file
+DEFAULT_CENTROIDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "postal_centroids.csv")
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+
+
+def geo_point(longitude, latitude):
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+
+def normalize_postal_code(postal_code):
+    return "".join(str(postal_code).split()).upper()
+
+
+class PostalCentroids:
+    """Postal code -> GeoJSON point, from a bundled CSV (postal_code,latitude,longitude).
+
+    Loaded on first lookup so listing creation never needs the network.
+    """
+
+    def __init__(self, path=DEFAULT_CENTROIDS_PATH):
+        self.path = path
+        self._points = None
+
+    @classmethod
+    def from_config(cls, config):
+        if config.get("POSTAL_CENTROIDS_PATH"):
+            return cls(config["POSTAL_CENTROIDS_PATH"])
+        centroids = cls(DEFAULT_CENTROIDS_PATH)
+        centroids._points = centroids._load()
+        logger.warning(
+            "POSTAL_CENTROIDS_PATH is not set; using the bundled sample of %d postal codes. "
+            "Listings with any other postal code get no location and never show up in "
+            "/api/pet-listings/near. Set it to a full postal_code,latitude,longitude CSV "
+            "and run `flask backfill-locations`.",
+            len(centroids._points)
+        )
+        return centroids
+
+    def _load(self):
+        points = {}
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                points[normalize_postal_code(row["postal_code"])] = geo_point(
+                    float(row["longitude"]), float(row["latitude"])
+                )
+        return points
+
+    def lookup(self, postal_code):
+        if self._points is None:
+            self._points = self._load()
+        if not postal_code:
+            return None
+        return self._points.get(normalize_postal_code(postal_code))
+
+
+def near_origin(args, centroids):
+    """Resolve the search origin from lat/lng or postal_code query parameters."""
+    if args.get("lat") and args.get("lng"):
+        try:
+            latitude, longitude = float(args["lat"]), float(args["lng"])
+        except ValueError:
+            raise ValidationError("lat and lng must be numbers")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError("lat/lng out of range")
+        return geo_point(longitude, latitude)
+
+    if args.get("postal_code"):
+        origin = centroids.lookup(args["postal_code"])
+        if origin is None:
+            raise ValidationError("Unknown postal code", 404)
+        return origin
+    raise ValidationError("Provide lat and lng or postal_code")
+
+
+def near_radius(args):
+    try:
+        radius_km = float(args.get("radius_km", DEFAULT_RADIUS_KM))
+    except ValueError:
+        raise ValidationError("radius_km must be a number")
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValidationError(f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+    return radius_km
+
+
+def near_pipeline(origin, radius_km, query, cursor, size):
+    """Aggregation pipeline for one page of listings within ``radius_km`` of ``origin``.
+
+    Results are ordered by (distance, _id). A cursor restarts $geoNear at the
+    last distance seen (minDistance) so later pages do not rescan the
+    nearer rings; the $match drops ties already returned.
+    """
+    geo_near = {
+        "near": origin,
+        "distanceField": "distance",
+        "maxDistance": radius_km * 1000,
+        "query": query,
+        "key": "location",
+        "spherical": True
+    }
+    pipeline = [{"$geoNear": geo_near}]
+    if cursor:
+        distance, last_id = decode_rank_cursor(cursor)
+        geo_near["minDistance"] = distance
+        pipeline.append({"$match": {"$or": [
+            {"distance": {"$gt": distance}},
+            {"distance": distance, "_id": {"$gt": last_id}}
+        ]}})
+    return pipeline + [
+        {"$sort": {"distance": 1, "_id": 1}},
+        {"$limit": size + 1},
+        {"$project": dict(SEARCH_RESULT_FIELDS, distance=1)}
+    ]
+
+
+def near_results(results, size):
+    """Return the response body; ``distance`` is in meters."""
+    results = list(results)
+    next_cursor = None
+    if len(results) > size:
+        last = results[size - 1]
+        next_cursor = encode_rank_cursor(last["distance"], last["_id"])
+    return {"items": results[:size], "next": next_cursor}
@@ -0,0 +1,38 @@
+# backend/gunicorn.conf.py
+"""gunicorn settings for wsgi:app; every value can be overridden from the environment."""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Threads per worker; an open /api/events stream holds one, so
+# EVENTS_MAX_STREAMS (default 8) keeps the rest free for other requests.
+# Deployments with many live clients should serve /api/events from asgi.py
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+# create_app neither connects nor starts threads, so importing it in the
+# master and forking is safe and makes worker (re)starts cheap
+preload_app = True
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+accesslog = None  # telemetry.py writes sampled access logs
+
+
+def on_starting(server):
+    # The default in-process listing cache is only invalidated in the worker
+    # that handled a write; see CACHE_REDIS_URL in config.py
+    if server.cfg.workers > 1 and not os.environ.get("CACHE_REDIS_URL"):
+        server.log.warning(
+            "CACHE_REDIS_URL is not set: each of the %d workers caches the listing feed on its own, "
+            "so after a write the others serve the old feed for up to CACHE_TTL seconds",
+            server.cfg.workers
+        )
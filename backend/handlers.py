@@ -0,0 +1,416 @@
+# backend/handlers.py
+"""Request handling shared by the Flask app (app.py) and the Quart app (asgi.py).
+
+Views read the request and pass plain values in; these functions return
+(body, status) or (body, status, headers) tuples that either framework
+returns as they are. The write and login handlers run on PyMongo: asgi.py
+calls them through asyncio.to_thread on the client Motor wraps, where
+WRITE_CONCURRENCY already bounds how many run at once. The read routes
+stay on Motor there and share their query building from here.
+"""
+from datetime import datetime
+import jwt as pyjwt
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+from events import record_event
+from hashing import HasherBusy
+from ingest import ingest_listings
+from media import existing_variants, image_url, release_image
+from models import (
+    ADD_PENDING_REQUEST,
+    AdoptionRequestError,
+    approve_adoption_request,
+    create_user,
+    find_user,
+    reject_adoption_request
+)
+from geo import near_origin, near_pipeline, near_radius
+from pagination import InvalidCursor, page_size
+from ratelimit import busy_response
+from search import search_filter, search_pipeline
+from stats import (
+    listing_changes,
+    reconcile_stats,
+    record_stats,
+    removed_request_changes,
+    removed_requests_pipeline,
+    request_added_changes,
+    request_removed_changes,
+    stats_summary,
+    status_change
+)
+from tokens import stream_token_identity
+from validation import ValidationError, adoption_request_from_json, allowed_file, listing_from_form
+
+# Listings the public feed and /near show
+FEED_QUERY = {"status": {"$in": ["Available", "Pending"]}}
+INVALID_FILE_TYPE = "Invalid file type. Allowed types: png, jpg, jpeg, gif"
+
+
+def error(message, status, **extra):
+    return {"error": message, **extra}, status
+
+
+def request_error(e):
+    """The response for a ValidationError or InvalidCursor raised while reading the request."""
+    if isinstance(e, InvalidCursor):
+        return error("Invalid cursor", 400)
+    return e.body, e.status_code
+
+
+def role_error(user, role):
+    """403 unless the verified identity has ``role``; None lets the view run."""
+    if user.get("role") != role:
+        return error("Unauthorized, admin only", 403)
+    return None
+
+
+def token_identity(user):
+    """The user fields access tokens carry; never the password hash."""
+    return {"email": user["email"], "role": user["role"], "name": user.get("name")}
+
+# --- Authentication; ``issue_token`` turns an identity into an access token
+
+def login(mongo, hasher, data, issue_token):
+    user = find_user(mongo, data.get("email"))
+    password = data.get("password")
+    try:
+        if not user or not hasher.verify(user["password"], password):
+            return error("Invalid credentials", 401)
+    except HasherBusy:
+        return busy_response()
+
+    # Upgrade hashes made with older parameters once the password is known
+    if hasher.needs_rehash(user["password"]):
+        db = mongo.db
+        hasher.rehash_later(password, lambda new_hash: db.users.update_one(
+            {"_id": user["_id"], "password": user["password"]},
+            {"$set": {"password": new_hash}}
+        ))
+    return {"access_token": issue_token(token_identity(user)), "role": user["role"]}, 200
+
+
+def signup(mongo, hasher, data, issue_token):
+    # The unique index on users.email rejects duplicates atomically
+    try:
+        user = create_user(
+            mongo, data.get("name"), data.get("email"), data.get("password"), role="user", hasher=hasher
+        )
+    except DuplicateKeyError:
+        return error("User already exists", 400)
+    except HasherBusy:
+        return busy_response()
+    return {"access_token": issue_token(token_identity(user)), "role": user["role"]}, 201
+
+# --- Listings
+
+def add_pet_listing(db, storage, cache, centroids, allowed_extensions, owner, form, files, process_image_later):
+    """Create a listing from its form fields and uploaded image.
+
+    ``files["image"].stream`` is the HashedUpload the request parser wrote
+    the image to; it only moves into storage once the listing exists, and
+    on any failure the view's teardown removes it.
+    """
+    if not form:
+        return error("No form data received", 400)
+    try:
+        listing = listing_from_form(form, owner, centroids)
+    except ValidationError as e:
+        return request_error(e)
+
+    if 'image' not in files:
+        return error("No image file provided", 400)
+    image_file = files['image']
+    if image_file.filename == '':
+        return error("No selected image file", 400)
+    if not allowed_file(image_file.filename, allowed_extensions):
+        return error(INVALID_FILE_TYPE, 400)
+    upload = image_file.stream
+    if upload.image_type is None:
+        return error(INVALID_FILE_TYPE, 400)
+
+    filename = upload.filename
+    listing["image"] = image_url(filename)
+    variants = existing_variants(filename, storage)
+    if variants:
+        listing["image_variants"] = variants
+
+    try:
+        db.pet_listings.insert_one(listing)
+    except Exception as e:
+        return error(f"Database error: {str(e)}", 500)
+
+    try:
+        storage.commit(upload)
+    except Exception as e:
+        db.pet_listings.delete_one({"_id": listing["_id"]})
+        return error(f"Failed to save image: {str(e)}", 500)
+
+    record_stats(db, listing_changes([listing]))
+    # A concurrent release_image may have taken the variants seen above
+    if not variants or not existing_variants(filename, storage):
+        process_image_later(filename)
+    cache.invalidate()
+    return {"message": "Pet listing created successfully!", "listing": listing}, 201
+
+
+def bulk_ingest_pet_listings(db, storage, cache, centroids, config, owner, files, process_image_later):
+    if 'manifest' not in files or 'images' not in files:
+        return error("Provide a manifest file and an images zip", 400)
+    try:
+        report = ingest_listings(
+            db,
+            files['manifest'],
+            files['images'],
+            owner,
+            storage,
+            config['ALLOWED_EXTENSIONS'],
+            centroids,
+            on_image_stored=process_image_later,
+            max_image_bytes=config["MAX_IMAGE_BYTES"]
+        )
+    except ValidationError as e:
+        return request_error(e)
+
+    if report["inserted"]:
+        cache.invalidate()
+    return report, 201 if report["inserted"] else 400
+
+
+def search_query(args):
+    """(query, pipeline, cursor, size) for /api/pet-listings/search; raises ValidationError or InvalidCursor."""
+    cursor = args.get("cursor")
+    size = page_size(args.get("limit"))
+    query = search_filter(args)
+    return query, search_pipeline(query, cursor, size), cursor, size
+
+
+def near_query(args, centroids):
+    """(pipeline, size) for /api/pet-listings/near; raises ValidationError or InvalidCursor."""
+    size = page_size(args.get("limit"))
+    query = dict(FEED_QUERY)
+    if args.get("species"):
+        query["species"] = args["species"]
+    pipeline = near_pipeline(
+        near_origin(args, centroids), near_radius(args), query, args.get("cursor"), size
+    )
+    return pipeline, size
+
+
+def owner_requests_query(listings):
+    """One indexed query for the requests of every listing on a page."""
+    return {"pet_id": {"$in": [pet["_id"] for pet in listings]}}
+
+
+def attach_adoption_requests(listings, adoption_requests):
+    """Set each listing's "adoption_requests" from ``adoption_requests``, keeping their order."""
+    requests_by_pet = {pet["_id"]: [] for pet in listings}
+    for adoption_request in adoption_requests:
+        requests_by_pet[adoption_request.pop("pet_id")].append(adoption_request)
+    for pet in listings:
+        pet["adoption_requests"] = requests_by_pet[pet["_id"]]
+
+
+def update_pet_status(db, broker, cache, user, pet_id, data):
+    if "status" not in data:
+        return error("Missing status field", 400)
+
+    pet = db.pet_listings.find_one({"_id": ObjectId(pet_id)}, {"owner": 1, "status": 1, "name": 1})
+    if not pet or pet["owner"] != user["email"]:
+        return error("Unauthorized", 403)
+
+    result = db.pet_listings.update_one(
+        {"_id": ObjectId(pet_id)},
+        {"$set": {"status": data["status"], "updated_at": datetime.utcnow()}}
+    )
+    if result.modified_count == 0:
+        return error("Failed to update pet status", 400)
+
+    record_stats(db, status_change("listings_by_status", pet.get("status"), data["status"]))
+    applicants = db.adoption_requests.distinct("requester_id", {"pet_id": pet["_id"]})
+    broker.published([record_event(db, applicants, "listing.status", {
+        "pet_id": pet_id,
+        "pet_name": pet.get("name"),
+        "status": data["status"]
+    })])
+    cache.invalidate()
+    return {"message": "Pet status updated successfully"}, 200
+
+
+def delete_pet_listing(db, storage, cache, user, pet_id):
+    try:
+        pet_listing_id = ObjectId(pet_id)
+    except InvalidId:
+        return error("Invalid pet listing ID format", 400)
+
+    pet = db.pet_listings.find_one({"_id": pet_listing_id}, {"owner": 1, "image": 1, "status": 1, "species": 1})
+    if not pet:
+        return error("Pet listing not found", 404)
+    if pet["owner"] != user["email"]:
+        return error("Unauthorized to delete this listing", 403)
+
+    result = db.pet_listings.delete_one({"_id": pet_listing_id})
+    if result.deleted_count == 0:
+        return error("Failed to delete pet listing", 400)
+
+    changes = listing_changes([pet], sign=-1)
+    changes.update(removed_request_changes(
+        db.adoption_requests.aggregate(removed_requests_pipeline(pet_listing_id))
+    ))
+    db.adoption_requests.delete_many({"pet_id": pet_listing_id})
+    record_stats(db, changes)
+    release_image(db, storage, pet.get("image"))
+    cache.invalidate()
+    return {"message": "Pet listing deleted successfully"}, 200
+
+# --- Adoption requests
+
+def send_adoption_request(db, broker, cache, user, data, debug=False):
+    try:
+        try:
+            adoption_request = adoption_request_from_json(data, user)
+        except ValidationError as e:
+            return request_error(e)
+        pet_listing_id = adoption_request["pet_id"]
+
+        # The partial unique index on (pet_id, requester_id) admits one
+        # pending request per requester, so the duplicate check is the insert
+        try:
+            db.adoption_requests.insert_one(adoption_request)
+        except DuplicateKeyError:
+            existing_request = db.adoption_requests.find_one(
+                {"pet_id": pet_listing_id, "requester_id": user["email"], "status": "Pending"},
+                {"_id": 1}
+            )
+            return error(
+                "You already have a pending request for this pet",
+                409,
+                request_id=existing_request["_id"] if existing_request else None
+            )
+
+        # Count the request and flip Available -> Pending in one conditional
+        # write; the pre-image tells a missing pet apart from an adopted one
+        pet = db.pet_listings.find_one_and_update(
+            {"_id": pet_listing_id},
+            [{"$set": ADD_PENDING_REQUEST}],
+            projection={"status": 1, "owner": 1, "name": 1}
+        )
+        if not pet or pet["status"] == "Adopted":
+            db.adoption_requests.delete_one({"_id": adoption_request["_id"]})
+            if not pet:
+                return error("Pet listing not found", 404)
+            return error("This pet has already been adopted", 400)
+
+        record_stats(db, request_added_changes(pet["status"]))
+        broker.published([record_event(db, [pet["owner"]], "adoption_request.created", {
+            "request_id": adoption_request["_id"],
+            "pet_id": str(pet_listing_id),
+            "pet_name": pet.get("name"),
+            "requester_name": adoption_request["requester_name"],
+            "status": "Pending"
+        })])
+        cache.invalidate()
+        return {
+            "message": "Adoption request submitted!",
+            "request": adoption_request,
+            "pet_listing_id": str(pet_listing_id)
+        }, 201
+
+    except Exception as e:
+        print(f"Error in send_adoption_request: {str(e)}")
+        return error("Internal server error", 500, details=str(e) if debug else None)
+
+
+def update_adoption_request(mongo, broker, cache, user, pet_listing_id, request_id, data):
+    """Approve or reject a request; ``mongo`` is the (cx, db) pair the transactions run on."""
+    try:
+        if not data or "status" not in data:
+            return error("Missing status in request body", 400)
+        if data["status"] not in ["Approved", "Rejected"]:
+            return error("Invalid status value", 400)
+        try:
+            pet_listing_obj_id = ObjectId(pet_listing_id)
+        except InvalidId:
+            return error("Invalid pet listing ID format", 400)
+
+        # Each decision is one transaction, so a crash cannot leave the
+        # request and listing statuses out of step
+        resolve = approve_adoption_request if data["status"] == "Approved" else reject_adoption_request
+        try:
+            events = resolve(mongo, pet_listing_obj_id, request_id, user["email"])
+        except AdoptionRequestError as e:
+            return error(e.message, e.status_code)
+        broker.published(events)
+        cache.invalidate()
+        return {"message": f"Request {data['status'].lower()} successfully"}, 200
+
+    except Exception as e:
+        print(f"Error in update_adoption_request: {str(e)}")
+        return error("Internal server error", 500)
+
+
+def delete_adoption_request(db, broker, cache, user, request_id):
+    removed = db.adoption_requests.find_one_and_delete(
+        {'_id': request_id, 'requester_id': user['email']},
+        projection={'pet_id': 1, 'status': 1, 'updated_at': 1}
+    )
+    if not removed:
+        return error("Request not found or already removed", 404)
+
+    # Keep the listing counters in step with the requests collection
+    counters = {'request_count': -1}
+    if removed['status'] == 'Pending':
+        counters['pending_count'] = -1
+    pet = db.pet_listings.find_one_and_update(
+        {'_id': removed['pet_id']}, {'$inc': counters}, projection={'owner': 1, 'name': 1}
+    )
+    reopened = db.pet_listings.update_one(
+        {'_id': removed['pet_id'], 'status': 'Pending', 'pending_count': {'$lte': 0}},
+        {'$set': {'status': 'Available'}}
+    )
+    changes = request_removed_changes(removed)
+    changes.update(status_change("listings_by_status", "Pending", "Available", reopened.modified_count))
+    record_stats(db, changes)
+    if pet:
+        broker.published([record_event(db, [pet["owner"]], "adoption_request.withdrawn", {
+            "request_id": request_id,
+            "pet_id": str(removed['pet_id']),
+            "pet_name": pet.get("name"),
+            "status": removed['status']
+        })])
+    cache.invalidate()
+    return {"message": "Adoption request removed successfully"}, 200
+
+# --- Events and admin
+
+def stream_user(args, secret):
+    """(identity, None) for the ?token= stream token, else (None, error response).
+
+    EventSource cannot set headers, so browsers pass a stream token from
+    /api/events/token; access tokens are not accepted here. JWT errors use
+    the "msg" key, like flask_jwt_extended's.
+    """
+    token = args.get("token")
+    if not token:
+        return None, ({"msg": "Missing stream token"}, 401)
+    try:
+        return stream_token_identity(token, secret), None
+    except pyjwt.ExpiredSignatureError:
+        return None, ({"msg": "Token has expired"}, 401)
+    except pyjwt.InvalidTokenError as e:
+        return None, ({"msg": str(e)}, 422)
+
+
+def last_event_id(headers, args):
+    return headers.get("Last-Event-ID") or args.get("last_event_id")
+
+
+def admin_stats(db):
+    # Counters are kept current by the write handlers; this is one small read
+    summary = stats_summary(db.admin_stats.find())
+    if summary["reconciled_at"] is None:
+        # First request after deploy: build the counters from the collections
+        reconcile_stats(db)
+        summary = stats_summary(db.admin_stats.find())
+    return summary, 200
@@ -0,0 +1,107 @@
+# backend/hashing.py
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_HASH_METHOD = "scrypt:32768:8:1"
+# Per server process; gunicorn already runs about two workers per core, so a
+# pool per core in each of them would oversubscribe the CPUs many times over
+DEFAULT_WORKERS = 2
+
+
+def _pool_context():
+    # Forking a worker that already runs threads (background jobs, Mongo
+    # monitors) can copy a held lock into the child
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not finish in time."""
+
+
+class PasswordHasher:
+    """Runs password hashing and verification in a bounded process pool.
+
+    KDF work holds the GIL, so doing it on request threads stalls every
+    other route. At most ``max_pending`` jobs may be queued or running;
+    beyond that calls fail fast with HasherBusy instead of piling up.
+    Pool processes come from a forkserver (spawn where that is missing),
+    never by forking the server process with its threads and sockets.
+    """
+
+    def __init__(self, method=DEFAULT_HASH_METHOD, workers=None, max_pending=None, timeout=5.0):
+        self.method = method
+        # Werkzeug fills in defaults ("pbkdf2" -> "pbkdf2:sha256:1000000"), so
+        # compare stored hashes with the prefix it actually writes; this also
+        # rejects an unknown method at startup
+        self.prefix = generate_password_hash("", method).split("$", 1)[0]
+        self.workers = workers or DEFAULT_WORKERS
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            method=config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD),
+            workers=config.get("PASSWORD_HASH_WORKERS"),
+            max_pending=config.get("PASSWORD_HASH_MAX_PENDING"),
+            timeout=config.get("PASSWORD_HASH_TIMEOUT", 5.0)
+        )
+
+    def _executor(self):
+        # Created on first use so a pre-forking server starts it in each worker
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+                    atexit.register(self._pool.shutdown, wait=False)
+        return self._pool
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy("Password hashing queue is full")
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherBusy("Password hashing timed out")
+
+    def hash(self, password):
+        return self._result(self.submit(generate_password_hash, password, self.method))
+
+    def verify(self, pwhash, password):
+        return self._result(self.submit(check_password_hash, pwhash, password))
+
+    def needs_rehash(self, pwhash):
+        return pwhash.split("$", 1)[0] != self.prefix
+
+    def rehash_later(self, password, on_done):
+        """Hash ``password`` with the current method and pass the result to ``on_done``.
+
+        Runs in the background; a full queue just skips the upgrade until
+        the next login.
+        """
+        try:
+            future = self.submit(generate_password_hash, password, self.method)
+        except HasherBusy:
+            return
+
+        def finished(f):
+            if f.exception() is None:
+                on_done(f.result())
+
+        future.add_done_callback(finished)
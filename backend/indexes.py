@@ -0,0 +1,166 @@
+# backend/indexes.py
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+from stats import ARCHIVE_COLLECTIONS
+
+# Events older than this are gone; a client offline longer reloads instead of replaying
+EVENT_RETENTION_SECONDS = 7 * 24 * 3600
+
+# Declarative index manifest: collection name -> indexes the routes rely on.
+# create_indexes is a no-op for indexes that already exist, so applying the
+# manifest on every startup is safe.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "pet_listings": [
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="status_feed"
+        ),
+        IndexModel(
+            [("owner", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="owner_feed"
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="feed"),
+        # Search filters: equality fields first, then the feed sort, then the age range
+        IndexModel(
+            [("species", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING),
+             ("_id", DESCENDING), ("age", ASCENDING)],
+            name="species_feed"
+        ),
+        IndexModel(
+            [("owner_contact.address.state", ASCENDING), ("owner_contact.address.city", ASCENDING),
+             ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="location_feed"
+        ),
+        IndexModel(
+            [("name", TEXT), ("description", TEXT)],
+            name="listing_text",
+            weights={"name": 10, "description": 1}
+        ),
+        # $geoNear for /api/pet-listings/near; listings without a location are not indexed
+        IndexModel(
+            [("location", GEOSPHERE), ("status", ASCENDING), ("species", ASCENDING)],
+            name="listing_location"
+        ),
+        # release_image and the variant attach look listings up by stored image
+        IndexModel([("image", ASCENDING)], name="image"),
+    ],
+    "adoption_requests": [
+        IndexModel(
+            [("pet_id", ASCENDING), ("status", ASCENDING), ("request_date", ASCENDING)],
+            name="pet_requests"
+        ),
+        IndexModel(
+            [("requester_id", ASCENDING), ("request_date", DESCENDING)],
+            name="requester_history"
+        ),
+        IndexModel(
+            [("pet_id", ASCENDING), ("requester_id", ASCENDING)],
+            name="one_pending_per_requester",
+            unique=True,
+            partialFilterExpression={"status": "Pending"}
+        ),
+    ],
+    # Archived tier: requester history, the move's per-listing lookups and image references
+    ARCHIVE_COLLECTIONS["adoption_requests"]: [
+        IndexModel(
+            [("requester_id", ASCENDING), ("request_date", DESCENDING)],
+            name="requester_history"
+        ),
+        IndexModel([("pet_id", ASCENDING)], name="pet_requests"),
+    ],
+    ARCHIVE_COLLECTIONS["pet_listings"]: [
+        IndexModel([("image", ASCENDING)], name="image"),
+    ],
+    "events": [
+        # SSE replay after Last-Event-ID
+        IndexModel([("users", ASCENDING), ("_id", ASCENDING)], name="user_events"),
+        IndexModel([("created_at", ASCENDING)], name="event_ttl", expireAfterSeconds=EVENT_RETENTION_SECONDS),
+    ],
+}
+
+# Representative query shape of every hot route, checked with explain()
+FEED_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+QUERY_SHAPES = {
+    "find_user": ("users", {"email": "probe@example.com"}, None),
+    "get_pet_listings": ("pet_listings", {"status": {"$in": ["Available", "Pending"]}}, FEED_SORT),
+    "get_my_pet_listings": ("pet_listings", {"owner": "probe@example.com"}, FEED_SORT),
+    "get_all_pet_listings": ("pet_listings", {}, FEED_SORT),
+    "search_pet_listings_species": (
+        "pet_listings",
+        {"species": "Dog", "status": {"$in": ["Available", "Pending"]}, "age": {"$lte": 3}},
+        FEED_SORT
+    ),
+    "search_pet_listings_location": (
+        "pet_listings",
+        {
+            "owner_contact.address.state": "CA",
+            "owner_contact.address.city": "Oakland",
+            "status": {"$in": ["Available", "Pending"]}
+        },
+        FEED_SORT
+    ),
+    "get_my_pet_listings_requests": (
+        "adoption_requests", {"pet_id": {"$in": [ObjectId()]}}, [("request_date", ASCENDING)]
+    ),
+    "get_user_adoption_requests": (
+        "adoption_requests", {"requester_id": "probe@example.com"}, [("request_date", DESCENDING)]
+    ),
+    "get_user_adoption_requests_archived": (
+        ARCHIVE_COLLECTIONS["adoption_requests"], {"requester_id": "probe@example.com"}, [("request_date", DESCENDING)]
+    ),
+    "send_adoption_request": (
+        "adoption_requests",
+        {"pet_id": ObjectId(), "requester_id": "probe@example.com", "status": "Pending"},
+        None
+    ),
+    "update_adoption_request": (
+        "adoption_requests", {"pet_id": ObjectId(), "status": "Pending"}, None
+    ),
+    "delete_adoption_request": (
+        "adoption_requests", {"_id": "probe", "requester_id": "probe@example.com"}, None
+    ),
+    "release_image": ("pet_listings", {"image": "/uploads/probe.jpg"}, None),
+    "release_image_archived": (ARCHIVE_COLLECTIONS["pet_listings"], {"image": "/uploads/probe.jpg"}, None),
+}
+
+
+class QueryPlanError(RuntimeError):
+    pass
+
+
+def ensure_indexes(db):
+    """Create every index in the manifest; returns {collection: [index names]}."""
+    return {
+        collection: db[collection].create_indexes(models)
+        for collection, models in INDEXES.items()
+    }
+
+
+def _plan_stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def verify_query_plans(db):
+    """Explain every registered query shape and raise if any falls back to a COLLSCAN."""
+    plans = {}
+    for route, (collection, query, sort) in QUERY_SHAPES.items():
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        plans[route] = list(_plan_stages(winning_plan))
+
+    scans = [route for route, stages in plans.items() if "COLLSCAN" in stages]
+    if scans:
+        raise QueryPlanError(f"Collection scan in query plan for: {', '.join(scans)}")
+    return plans
@@ -0,0 +1,171 @@
+# backend/ingest.py
+import codecs
+import csv
+import json
+import os
+import zipfile
+from pymongo.errors import BulkWriteError
+from werkzeug.exceptions import RequestEntityTooLarge
+from media import DEFAULT_MAX_IMAGE_BYTES, InvalidImage, existing_variants, image_url, release_image
+from stats import listing_changes, record_stats
+from validation import ValidationError, allowed_file, listing_from_form
+
+INGEST_BATCH_SIZE = 500
+MAX_INGEST_ROWS = 10000
+NDJSON_EXTENSIONS = {"ndjson", "jsonl"}
+
+
+def manifest_rows(manifest):
+    """Yield (row number, row dict or error message) from a CSV or NDJSON upload.
+
+    The upload is decoded as it is read, so the manifest is never held in
+    memory as a whole.
+    """
+    extension = manifest.filename.rsplit(".", 1)[-1].lower() if manifest.filename else ""
+    text = codecs.getreader("utf-8-sig")(manifest.stream)
+
+    if extension in NDJSON_EXTENSIONS or manifest.mimetype == "application/x-ndjson":
+        row_number = 0
+        for line in text:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield row_number, "Invalid JSON"
+                continue
+            yield row_number, row if isinstance(row, dict) else "Expected a JSON object"
+    elif extension == "csv" or manifest.mimetype == "text/csv":
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            # Short rows come back with None values; treat them as missing fields
+            yield row_number, {k: v for k, v in row.items() if k is not None and v is not None}
+    else:
+        raise ValidationError("Manifest must be a .csv or .ndjson file")
+
+
+def open_image_archive(images):
+    try:
+        archive = zipfile.ZipFile(images.stream)
+    except zipfile.BadZipFile:
+        raise ValidationError("images must be a zip archive")
+    members = {
+        os.path.basename(info.filename): info
+        for info in archive.infolist()
+        if not info.is_dir() and os.path.basename(info.filename)
+    }
+    return archive, members
+
+
+def _insert_batch(db, batch, errors):
+    """insert_many one batch and count it in the admin stats; returns the image filename of every row that was written."""
+    listings = [listing for _, listing, _ in batch]
+    try:
+        db.pet_listings.insert_many(listings, ordered=False)
+        failed = {}
+    except BulkWriteError as e:
+        failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details["writeErrors"]}
+    except Exception as e:
+        failed = {index: str(e) for index in range(len(batch))}
+
+    for index, message in failed.items():
+        errors.append({"row": batch[index][0], "error": f"Database error: {message}"})
+    written = [entry for index, entry in enumerate(batch) if index not in failed]
+    record_stats(db, listing_changes(listing for _, listing, _ in written))
+    return [filename for _, _, filename in written]
+
+
+def ingest_listings(db, manifest, images, owner, storage, allowed_extensions,
+                    centroids=None, on_image_stored=None, batch_size=INGEST_BATCH_SIZE,
+                    max_image_bytes=DEFAULT_MAX_IMAGE_BYTES):
+    """Create one listing per manifest row, with its image taken from the zip archive.
+
+    Rows are validated with the same rules as add_pet_listing; the ``image``
+    column names a file in the archive. Valid rows are written in unordered
+    insert_many batches, so one bad row does not block the rest. Images
+    stored by this import that no written row uses are released at the end
+    (another listing with the same bytes may show them by then), and
+    ``on_image_stored`` is called once per new image that still needs
+    variants. Images over ``max_image_bytes`` fail their row.
+    Returns {"inserted", "failed", "errors": [{"row", "error"}]}.
+    """
+    archive, members = open_image_archive(images)
+    inserted = 0
+    errors = []
+    batch = []
+    created_files = set()
+    used_files = set()
+    sources = {}
+
+    with archive:
+        for row_number, row in manifest_rows(manifest):
+            if row_number > MAX_INGEST_ROWS:
+                errors.append({"row": row_number, "error": f"Row limit of {MAX_INGEST_ROWS} reached; rest skipped"})
+                break
+            if isinstance(row, str):
+                errors.append({"row": row_number, "error": row})
+                continue
+
+            try:
+                listing = listing_from_form(row, owner, centroids)
+            except ValidationError as e:
+                errors.append({"row": row_number, "error": e.body["error"]})
+                continue
+
+            member = members.get(os.path.basename(str(row.get("image") or "")))
+            if member is None:
+                errors.append({"row": row_number, "error": "Image not found in archive"})
+                continue
+            if not allowed_file(member.filename, allowed_extensions):
+                errors.append({"row": row_number, "error": "Invalid file type. Allowed types: png, jpg, jpeg, gif"})
+                continue
+            if member.file_size > max_image_bytes:
+                errors.append({"row": row_number, "error": "Image too large"})
+                continue
+
+            try:
+                with archive.open(member) as image_stream:
+                    filename, created = storage.save(image_stream, max_image_bytes)
+            except InvalidImage:
+                errors.append({"row": row_number, "error": "Invalid file type. Allowed types: png, jpg, jpeg, gif"})
+                continue
+            except RequestEntityTooLarge:
+                errors.append({"row": row_number, "error": "Image too large"})
+                continue
+            except Exception as e:
+                errors.append({"row": row_number, "error": f"Failed to save image: {str(e)}"})
+                continue
+            if created:
+                created_files.add(filename)
+            sources[filename] = member
+            listing["image"] = image_url(filename)
+            variants = existing_variants(filename, storage)
+            if variants:
+                listing["image_variants"] = variants
+            batch.append((row_number, listing, filename))
+
+            if len(batch) >= batch_size:
+                written = _insert_batch(db, batch, errors)
+                inserted += len(written)
+                used_files.update(written)
+                batch = []
+        if batch:
+            written = _insert_batch(db, batch, errors)
+            inserted += len(written)
+            used_files.update(written)
+        # An image found already stored may have been released by a listing
+        # deleted before these rows were written; store it again if so
+        for filename in used_files - created_files:
+            if not storage.exists(filename):
+                with archive.open(sources[filename]) as image_stream:
+                    storage.save(image_stream, max_image_bytes)
+                created_files.add(filename)
+
+    for filename in created_files - used_files:
+        release_image(db, storage, image_url(filename))
+    if on_image_stored:
+        for filename in created_files & used_files:
+            on_image_stored(filename)
+
+    errors.sort(key=lambda err: err["row"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
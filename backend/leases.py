@@ -0,0 +1,54 @@
+# backend/leases.py
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+
+LEASES_COLLECTION = "leases"
+# Added to a job's interval: the holder's next tick, or the next batch of a
+# long pass, renews well before the lease runs out
+DEFAULT_GRACE_SECONDS = 300
+
+
+class Lease:
+    """A named, expiring lease document, so one process across every worker and host runs a periodic job.
+
+    Each gunicorn worker (and each ASGI process) starts the same background
+    threads; they all call ``acquire`` on every tick and only the holder goes
+    on to do the work. The lease lasts ``interval`` plus ``grace`` seconds,
+    so the holder's next tick renews it before it lapses. Long jobs call
+    ``acquire`` again between batches, which extends it, and stop as soon
+    as that fails. If the holder exits, another process takes over once the
+    lease has lapsed. Takes the connection rather than a database, so it
+    follows the per-process client after a fork.
+    """
+
+    def __init__(self, mongo, name, interval, grace=DEFAULT_GRACE_SECONDS):
+        self._mongo = mongo
+        self.name = name
+        self.ttl = timedelta(seconds=interval + grace)
+        self._holder = (None, None)
+
+    @property
+    def holder(self):
+        """This process's id; made after any fork, so forked workers never share one."""
+        pid, holder = self._holder
+        if pid != os.getpid():
+            holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            self._holder = (os.getpid(), holder)
+        return holder
+
+    def acquire(self, now=None):
+        """Take or renew the lease; False while another live process holds it."""
+        now = now or datetime.utcnow()
+        try:
+            # A held, unexpired lease does not match, so the upsert's insert hits the _id
+            self._mongo.db[LEASES_COLLECTION].update_one(
+                {"_id": self.name, "$or": [{"holder": self.holder}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"holder": self.holder, "expires_at": now + self.ttl}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
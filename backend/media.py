@@ -0,0 +1,474 @@
+# backend/media.py
+import atexit
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import namedtuple
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from flask import Request, Response, abort, current_app, request
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.wsgi import wrap_file
+from werkzeug.security import safe_join
+from stats import ARCHIVE_COLLECTIONS
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger("petpal.media")
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_IMAGE_BYTES = 10 * 1024 * 1024
+# Variant name -> (longest side in px, Pillow format, file suffix)
+IMAGE_VARIANTS = {
+    "thumb": (400, "JPEG", "_thumb.jpg"),
+    "webp": (400, "WEBP", "_thumb.webp"),
+}
+
+# Content-addressed names (and their variants) never change content
+HASHED_NAME = re.compile(r"^([0-9a-f]{32})(_[a-z]+)?\.[a-z0-9]+$")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# modified is a Unix timestamp for every backend
+MediaStat = namedtuple("MediaStat", ["size", "modified"])
+
+
+def image_url(filename):
+    return f"/uploads/{filename}"
+
+
+def filename_from_url(url):
+    return url.rsplit("/", 1)[-1]
+
+
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+SNIFF_BYTES = 16
+
+
+class InvalidImage(ValueError):
+    """Raised when stored bytes are not a PNG, JPEG or GIF image."""
+
+
+def sniff_image_type(head):
+    """File extension for the image format in ``head`` (magic bytes), or None."""
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+class HashedUpload:
+    """An upload written straight to a temp file, hashed and size-checked as it arrives.
+
+    Used as the form parser's file stream, so multipart bodies go to disk
+    in chunks instead of being buffered first. The content hash and image
+    type are known as soon as parsing ends. The temp file is removed on
+    close unless a storage backend committed it.
+    """
+
+    def __init__(self, tmp_dir, limit=None):
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix=".upload-", dir=tmp_dir)
+        self._file = os.fdopen(fd, "w+b")
+        self._digest = hashlib.sha256()
+        self._head = b""
+        self.size = 0
+        self.limit = limit
+
+    @classmethod
+    def from_stream(cls, stream, tmp_dir, limit=None):
+        upload = cls(tmp_dir, limit)
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                upload.write(chunk)
+            upload.seek(0)
+        except Exception:
+            upload.close()
+            raise
+        return upload
+
+    def write(self, data):
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            # The parser never hands this file to the request, so clean up here
+            self.close()
+            raise RequestEntityTooLarge(f"Upload exceeds {self.limit} bytes")
+        if len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        if name == "_file":
+            raise AttributeError(name)
+        return getattr(self._file, name)
+
+    @property
+    def image_type(self):
+        return sniff_image_type(self._head)
+
+    @property
+    def filename(self):
+        """Content-addressed name; the extension comes from the bytes, not the client."""
+        if self.image_type is None:
+            raise InvalidImage("Not a PNG, JPEG or GIF image")
+        return f"{self._digest.hexdigest()[:32]}.{self.image_type}"
+
+    def close(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def sweep_stale_uploads(tmp_dir, max_age=3600):
+    """Remove temp uploads and released images left behind by a crashed worker."""
+    if not os.path.isdir(tmp_dir):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(tmp_dir):
+        if entry.name.startswith((".upload-", ".released-")) and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+class LocalStorage:
+    """Media files in a directory on local disk."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        # Same filesystem as the destination, so commit is an atomic rename
+        self.tmp_dir = folder
+
+    def path(self, filename):
+        return safe_join(os.path.abspath(self.folder), filename)
+
+    def commit(self, upload):
+        """Move a finished upload into place under its content hash.
+
+        Returns False when identical content is already stored; the temp
+        file is then dropped when the upload is closed.
+        """
+        if self.exists(upload.filename):
+            return False
+        upload.flush()
+        os.chmod(upload.path, 0o644)
+        os.replace(upload.path, self.path(upload.filename))
+        return True
+
+    def save(self, stream, limit=None):
+        """Store ``stream`` under its content hash; returns (filename, created)."""
+        upload = HashedUpload.from_stream(stream, self.tmp_dir, limit)
+        with closing(upload):
+            return upload.filename, self.commit(upload)
+
+    def put(self, filename, data):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = os.path.join(self.folder, f".put-{uuid.uuid4().hex}")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path(filename))
+
+    def open(self, filename):
+        path = self.path(filename)
+        return open(path, "rb") if path else None
+
+    def exists(self, filename):
+        path = self.path(filename)
+        return bool(path) and os.path.isfile(path)
+
+    def stat(self, filename):
+        path = self.path(filename)
+        if not path or not os.path.isfile(path):
+            return None
+        st = os.stat(path)
+        return MediaStat(st.st_size, st.st_mtime)
+
+    def delete(self, filename):
+        path = self.path(filename)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def rename(self, filename, new_filename):
+        path, new_path = self.path(filename), self.path(new_filename)
+        if path and new_path and os.path.exists(path):
+            os.replace(path, new_path)
+
+
+class GridFSStorage:
+    """Media files in a GridFS bucket, for deployments without shared disk.
+
+    Takes the connection (anything with a ``db`` attribute) rather than a
+    database, so the bucket follows the per-process client after a fork.
+    """
+
+    def __init__(self, mongo, bucket_name="uploads", tmp_dir=None):
+        self._mongo = mongo
+        self.bucket_name = bucket_name
+        self.tmp_dir = tmp_dir or tempfile.gettempdir()
+
+    @property
+    def _bucket(self):
+        import gridfs
+        return gridfs.GridFSBucket(self._mongo.db, bucket_name=self.bucket_name)
+
+    @property
+    def _files(self):
+        return self._mongo.db[f"{self.bucket_name}.files"]
+
+    def commit(self, upload):
+        if self.exists(upload.filename):
+            return False
+        upload.seek(0)
+        self._bucket.upload_from_stream(upload.filename, upload)
+        return True
+
+    def save(self, stream, limit=None):
+        upload = HashedUpload.from_stream(stream, self.tmp_dir, limit)
+        with closing(upload):
+            return upload.filename, self.commit(upload)
+
+    def put(self, filename, data):
+        self.delete(filename)
+        self._bucket.upload_from_stream(filename, io.BytesIO(data))
+
+    def open(self, filename):
+        import gridfs
+        try:
+            return self._bucket.open_download_stream_by_name(filename)
+        except gridfs.errors.NoFile:
+            return None
+
+    def exists(self, filename):
+        return self._files.find_one({"filename": filename}, {"_id": 1}) is not None
+
+    def stat(self, filename):
+        doc = self._files.find_one(
+            {"filename": filename}, {"length": 1, "uploadDate": 1}, sort=[("uploadDate", -1)]
+        )
+        if not doc:
+            return None
+        return MediaStat(doc["length"], doc["uploadDate"].replace(tzinfo=timezone.utc).timestamp())
+
+    def delete(self, filename):
+        for doc in self._files.find({"filename": filename}, {"_id": 1}):
+            self._bucket.delete(doc["_id"])
+
+    def rename(self, filename, new_filename):
+        for doc in self._files.find({"filename": filename}, {"_id": 1}):
+            self._bucket.rename(doc["_id"], new_filename)
+
+
+def create_media_storage(config, mongo):
+    if config.get("MEDIA_STORAGE") == "gridfs":
+        return GridFSStorage(mongo, tmp_dir=config.get("UPLOAD_TMP_DIR"))
+    return LocalStorage(config["UPLOAD_FOLDER"])
+
+
+def variant_filenames(filename):
+    stem = filename.rsplit(".", 1)[0]
+    return {name: stem + suffix for name, (_, _, suffix) in IMAGE_VARIANTS.items()}
+
+
+def existing_variants(filename, storage):
+    """Variant URLs for ``filename`` if they were all generated already, else None."""
+    names = variant_filenames(filename)
+    if all(storage.exists(name) for name in names.values()):
+        return {variant: image_url(name) for variant, name in names.items()}
+    return None
+
+
+def render_variants(filename, storage):
+    """Write every IMAGE_VARIANTS size/format of ``filename``; returns {variant: url}."""
+    names = variant_filenames(filename)
+    with storage.open(filename) as f, Image.open(f) as original:
+        original = ImageOps.exif_transpose(original)
+        for variant, (size, image_format, _) in IMAGE_VARIANTS.items():
+            image = original.copy()
+            image.thumbnail((size, size))
+            if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            out = io.BytesIO()
+            image.save(out, image_format, quality=80)
+            storage.put(names[variant], out.getvalue())
+    return {variant: image_url(name) for variant, name in names.items()}
+
+
+def image_in_use(db, url):
+    """True if a listing, live or archived, shows the image at ``url``."""
+    return bool(
+        db.pet_listings.find_one({"image": url}, {"_id": 1}) or
+        db[ARCHIVE_COLLECTIONS["pet_listings"]].find_one({"image": url}, {"_id": 1})
+    )
+
+
+def release_image(db, storage, url):
+    """Delete an image and its variants once no listing, live or archived, refers to it.
+
+    Stored images are shared between listings with identical uploads, so
+    removing a listing must not remove a file another listing still shows.
+    An identical upload can land between the check and the delete, find the
+    file present and skip storing its own copy; so the files are moved aside
+    first and the references checked again, and a listing that appeared in
+    the meantime gets them back.
+    """
+    if not url or image_in_use(db, url):
+        return
+    filename = filename_from_url(url)
+    names = [filename, *variant_filenames(filename).values()]
+    aside = {name: f".released-{uuid.uuid4().hex}-{name}" for name in names}
+    for name in names:
+        storage.rename(name, aside[name])
+    if image_in_use(db, url):
+        for name in names:
+            storage.rename(aside[name], name)
+        return
+    for name in names:
+        storage.delete(aside[name])
+
+
+def media_etag(filename, stat):
+    if HASHED_NAME.match(filename):
+        return filename.rsplit(".", 1)[0]
+    return f"{int(stat.modified)}-{stat.size}"
+
+
+def apply_cache_policy(response, filename):
+    """Hashed names are cached for a year as immutable; legacy names revalidate."""
+    response.cache_control.public = True
+    if HASHED_NAME.match(filename):
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def media_mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def offload_header(storage, filename, config):
+    """Header that hands the transfer to the front proxy, if one is configured.
+
+    MEDIA_OFFLOAD=x-accel makes nginx serve MEDIA_ACCEL_PREFIX/<filename>
+    from an internal location; x-sendfile passes the absolute path for
+    Apache/lighttpd. Only local storage can be offloaded.
+    """
+    mode = config.get("MEDIA_OFFLOAD")
+    if not isinstance(storage, LocalStorage) or not mode:
+        return None
+    if mode == "x-accel":
+        return "X-Accel-Redirect", f"{config.get('MEDIA_ACCEL_PREFIX', '/protected-uploads')}/{filename}"
+    if mode == "x-sendfile":
+        return "X-Sendfile", storage.path(filename)
+    return None
+
+
+def send_media(storage, filename, config):
+    """Serve a stored file with ETag/If-None-Match, byte ranges and cache headers."""
+    stat = storage.stat(filename)
+    if stat is None:
+        abort(404)
+
+    offload = offload_header(storage, filename, config)
+    if offload:
+        # The proxy streams the bytes and answers range requests itself
+        response = Response(mimetype=media_mimetype(filename))
+        response.headers[offload[0]] = offload[1]
+        response.set_etag(media_etag(filename, stat))
+        apply_cache_policy(response, filename)
+        return response.make_conditional(request)
+
+    response = Response(
+        wrap_file(request.environ, storage.open(filename)),
+        mimetype=media_mimetype(filename),
+        direct_passthrough=True
+    )
+    response.content_length = stat.size
+    response.last_modified = stat.modified
+    response.set_etag(media_etag(filename, stat))
+    apply_cache_policy(response, filename)
+    return response.make_conditional(request, accept_ranges=True, complete_length=stat.size)
+
+
+class UploadRequest(Request):
+    """Request that streams file parts into HashedUpload temp files.
+
+    ``max_file_size`` caps each file (MAX_IMAGE_BYTES unless a route
+    overrides it). Every temp file is closed with the request, so aborted
+    or failed uploads never leave files behind.
+    """
+
+    max_file_size = None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload = HashedUpload(
+            current_app.config["media_storage"].tmp_dir,
+            self.max_file_size or current_app.config["MAX_IMAGE_BYTES"]
+        )
+        self.__dict__.setdefault("_uploads", []).append(upload)
+        return upload
+
+    def close(self):
+        super().close()
+        for upload in self.__dict__.get("_uploads", []):
+            upload.close()
+
+
+class ImageProcessor:
+    """Generates image variants on a small thread pool after the request returns.
+
+    Pillow releases the GIL while decoding, resizing and encoding, so
+    threads are enough to keep this off the request path. Without Pillow
+    installed listings keep serving the original image.
+    """
+
+    def __init__(self, storage, workers=2):
+        self.storage = storage
+        self.workers = workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, storage):
+        return cls(storage, workers=config.get("IMAGE_WORKERS", 2))
+
+    def _executor(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="images")
+                    atexit.register(self._pool.shutdown, wait=False)
+        return self._pool
+
+    def process_later(self, filename, on_done):
+        """Generate variants of ``filename`` and pass {variant: url} to ``on_done``."""
+        if Image is None:
+            return
+
+        def run():
+            try:
+                variants = existing_variants(filename, self.storage) or \
+                    render_variants(filename, self.storage)
+                on_done(variants)
+            except Exception:
+                logger.exception("Image processing failed for %s", filename)
+
+        self._executor().submit(run)
@@ -0,0 +1,101 @@
+# backend/migrations.py
+import logging
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+logger = logging.getLogger("petpal.migrations")
+
+
+def migrate_embedded_adoption_requests(db, batch_size=500):
+    """Move pet_listings.adoption_requests arrays into the adoption_requests collection.
+
+    Request _ids are kept, so re-running after an interruption skips the
+    requests that were already copied. A second pending request from the
+    same requester is refused by the one-pending-per-requester index; those
+    are logged and returned rather than lost silently. Counters are taken
+    from the requests that made it into the collection. Returns
+    ``(moved, dropped)``: the number of requests in the collection for the
+    migrated listings, and the embedded requests that were refused.
+    """
+    moved = 0
+    dropped = []
+    listings = db.pet_listings.find(
+        {"adoption_requests": {"$exists": True}},
+        {"adoption_requests": 1},
+        batch_size=batch_size
+    )
+    for pet in listings:
+        embedded = pet.get("adoption_requests") or []
+        if embedded:
+            try:
+                db.adoption_requests.insert_many(
+                    [dict(req, pet_id=pet["_id"]) for req in embedded],
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                if any(err["code"] != DUPLICATE_KEY for err in e.details["writeErrors"]):
+                    raise
+            # A duplicate _id was copied by an earlier run; any other duplicate was refused
+            copied = {doc["_id"] for doc in db.adoption_requests.find(
+                {"_id": {"$in": [req["_id"] for req in embedded]}}, {"_id": 1}
+            )}
+            for req in embedded:
+                if req["_id"] not in copied:
+                    logger.warning(
+                        "Dropped adoption request %s on pet %s: %s already has a pending request",
+                        req["_id"], pet["_id"], req.get("requester_id")
+                    )
+                    dropped.append(dict(req, pet_id=pet["_id"]))
+
+        request_count = db.adoption_requests.count_documents({"pet_id": pet["_id"]})
+        db.pet_listings.update_one(
+            {"_id": pet["_id"]},
+            {
+                "$set": {
+                    "pending_count": db.adoption_requests.count_documents(
+                        {"pet_id": pet["_id"], "status": "Pending"}
+                    ),
+                    "request_count": request_count
+                },
+                "$unset": {"adoption_requests": ""}
+            }
+        )
+        moved += request_count
+
+    # Listings that never had the embedded array still need counters
+    db.pet_listings.update_many(
+        {"pending_count": {"$exists": False}},
+        {"$set": {"pending_count": 0, "request_count": 0}}
+    )
+    return moved, dropped
+
+
+def backfill_listing_locations(db, centroids, batch_size=500):
+    """Set ``location`` on listings created before geo support, from their postal code.
+
+    Listings whose postal code is not in the centroid table are left
+    without a location. Returns the number of listings updated.
+    """
+    updated = 0
+    batch = []
+    listings = db.pet_listings.find(
+        {"location": {"$exists": False}},
+        {"owner_contact.address.postal_code": 1},
+        batch_size=batch_size
+    )
+    for pet in listings:
+        postal_code = pet.get("owner_contact", {}).get("address", {}).get("postal_code")
+        location = centroids.lookup(postal_code)
+        if location:
+            batch.append(UpdateOne(
+                {"_id": pet["_id"], "location": {"$exists": False}},
+                {"$set": {"location": location}}
+            ))
+        if len(batch) >= batch_size:
+            updated += db.pet_listings.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += db.pet_listings.bulk_write(batch, ordered=False).modified_count
+    return updated
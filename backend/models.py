@@ -1,14 +1,114 @@
 # backend/models.py
-from flask_pymongo import PyMongo
+import os
+import threading
 from werkzeug.security import generate_password_hash, check_password_hash
+from pymongo import MongoClient, ReturnDocument
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from pymongo.errors import OperationFailure
+from datetime import datetime
+from stats import day_key, record_stats, status_change
+from events import record_event
 
-def init_db(app):
-    app.config["MONGO_URI"] = "mongodb://localhost:27017/petpal"
-    mongo = PyMongo(app)
-    return mongo
+# Server error code for transactions on a standalone mongod
+ILLEGAL_OPERATION = 20
 
-def create_user(mongo, name, email, password, role="user"):
-    hashed_password = generate_password_hash(password)
+# Fields needed to render a listing card; keeps adoption requests (and the
+# applicants' contact details) out of public and admin feeds
+LISTING_CARD_FIELDS = {
+    "name": 1,
+    "species": 1,
+    "age": 1,
+    "description": 1,
+    # Cards show the thumbnail once the image worker has produced it
+    "image": {"$ifNull": ["$image_variants.thumb", "$image"]},
+    "image_variants": 1,
+    "owner": 1,
+    "status": 1,
+    "pending_count": 1,
+    "created_at": 1
+}
+
+# Pipeline update for a new pending request; a no-op once the pet is Adopted
+_ADOPTABLE = {"$ne": ["$status", "Adopted"]}
+ADD_PENDING_REQUEST = {
+    "pending_count": {
+        "$cond": [_ADOPTABLE, {"$add": [{"$ifNull": ["$pending_count", 0]}, 1]}, "$pending_count"]
+    },
+    "request_count": {
+        "$cond": [_ADOPTABLE, {"$add": [{"$ifNull": ["$request_count", 0]}, 1]}, "$request_count"]
+    },
+    "status": {"$cond": [{"$eq": ["$status", "Available"]}, "Pending", "$status"]}
+}
+
+DEFAULT_MONGO_URI = "mongodb://localhost:27017/petpal"
+
+def mongo_client_options(config):
+    """MongoClient keyword arguments from the MONGO_* settings; unset ones keep the driver defaults."""
+    options = {
+        "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": config.get("MONGO_MIN_POOL_SIZE"),
+        "connectTimeoutMS": config.get("MONGO_CONNECT_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+        "socketTimeoutMS": config.get("MONGO_SOCKET_TIMEOUT_MS"),
+        "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+def read_preference(config):
+    """Read preference for read-only routes, e.g. MONGO_READ_PREFERENCE=secondaryPreferred."""
+    return make_read_preference(read_pref_mode_from_name(config.get("MONGO_READ_PREFERENCE", "primary")), None)
+
+class MongoConnection:
+    """``cx``/``db`` like flask_pymongo, but the client is created on first use in each process.
+
+    Building the app never connects, so it can be imported by CLI tools and
+    preloaded by a pre-fork server; each worker then opens its own pool
+    instead of sharing sockets with the parent. ``read_db`` applies the
+    configured read preference, for routes that tolerate replica lag.
+    """
+
+    def __init__(self, uri=DEFAULT_MONGO_URI, read_preference=None, **client_kwargs):
+        self.uri = uri
+        self.read_preference = read_preference
+        self.client_kwargs = client_kwargs
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def cx(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # A client inherited across fork is dropped, never closed:
+                    # its sockets still belong to the parent
+                    self._client = MongoClient(self.uri, **self.client_kwargs)
+                    self._pid = os.getpid()
+        return self._client
+
+    @property
+    def db(self):
+        return self.cx.get_default_database()
+
+    @property
+    def read_db(self):
+        if self.read_preference is None:
+            return self.db
+        return self.db.with_options(read_preference=self.read_preference)
+
+def init_db(app, **client_kwargs):
+    return MongoConnection(
+        app.config["MONGO_URI"],
+        read_preference(app.config),
+        **mongo_client_options(app.config),
+        **client_kwargs
+    )
+
+def create_user(mongo, name, email, password, role="user", hasher=None):
+    if hasher:
+        hashed_password = hasher.hash(password)
+    else:
+        hashed_password = generate_password_hash(password)
     user_data = {
         "name": name,
         "email": email,
@@ -16,7 +116,156 @@ def create_user(mongo, name, email, password, role="user"):
         "role": role
     }
     mongo.db.users.insert_one(user_data)
+    record_stats(mongo.db, {("users_by_role", role): 1})
     return user_data
 
 def find_user(mongo, email):
     return mongo.db.users.find_one({"email": email})
+
+class AdoptionRequestError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def run_in_transaction(mongo, callback):
+    """Run ``callback(session)`` in a transaction, retrying transient conflicts.
+
+    Standalone servers cannot run transactions; there the callback runs
+    without a session so a local dev database keeps working.
+    """
+    with mongo.cx.start_session() as session:
+        try:
+            return session.with_transaction(callback)
+        except OperationFailure as e:
+            if e.code != ILLEGAL_OPERATION:
+                raise
+    return callback(None)
+
+def _explain_listing_miss(mongo, pet_id, owner, session):
+    pet = mongo.db.pet_listings.find_one({"_id": pet_id}, {"owner": 1}, session=session)
+    if not pet:
+        return AdoptionRequestError("Pet listing not found", 404)
+    if pet["owner"] != owner:
+        return AdoptionRequestError("Unauthorized to modify this listing", 403)
+    return AdoptionRequestError("This pet has already been adopted", 409)
+
+def request_event(mongo, requester, pet, request_id, status, session=None):
+    return record_event(mongo.db, [requester], "adoption_request.updated", {
+        "request_id": request_id,
+        "pet_id": str(pet["_id"]),
+        "pet_name": pet.get("name"),
+        "status": status
+    }, session=session)
+
+def approve_adoption_request(mongo, pet_id, request_id, owner):
+    """Approve one request, reject the other pending ones and mark the pet Adopted.
+
+    Claiming the listing is the first write, so of two concurrent approvals
+    only one transaction can move it out of the non-Adopted state. Only a
+    Pending request can be approved; others fail with 409. Returns the
+    events recorded for the affected applicants.
+    """
+    def approve(session):
+        now = datetime.utcnow()
+        pet = mongo.db.pet_listings.find_one_and_update(
+            {"_id": pet_id, "owner": owner, "status": {"$ne": "Adopted"}},
+            {"$set": {"status": "Adopted", "pending_count": 0}},
+            projection={"status": 1, "pending_count": 1, "name": 1},
+            session=session
+        )
+        if not pet:
+            raise _explain_listing_miss(mongo, pet_id, owner, session)
+
+        approved = mongo.db.adoption_requests.find_one_and_update(
+            {"_id": request_id, "pet_id": pet_id, "status": "Pending"},
+            {"$set": {"status": "Approved", "updated_at": now}},
+            projection={"status": 1, "requester_id": 1},
+            session=session
+        )
+        if not approved:
+            if session is None:
+                # Nothing to roll back without a transaction; restore the claim
+                mongo.db.pet_listings.update_one(
+                    {"_id": pet_id, "status": "Adopted"},
+                    {"$set": {"status": pet["status"], "pending_count": pet.get("pending_count", 0)}}
+                )
+            if mongo.db.adoption_requests.find_one({"_id": request_id, "pet_id": pet_id}, {"_id": 1}, session=session):
+                raise AdoptionRequestError("Adoption request is no longer pending", 409)
+            raise AdoptionRequestError("Adoption request not found", 404)
+
+        rejected = list(mongo.db.adoption_requests.find(
+            {"pet_id": pet_id, "status": "Pending", "_id": {"$ne": request_id}},
+            {"requester_id": 1},
+            session=session
+        ))
+        others = mongo.db.adoption_requests.update_many(
+            {"_id": {"$in": [other["_id"] for other in rejected]}, "status": "Pending"},
+            {"$set": {"status": "Rejected", "updated_at": now}},
+            session=session
+        )
+
+        changes = status_change("listings_by_status", pet["status"], "Adopted")
+        changes.update(status_change("requests_by_status", approved["status"], "Approved"))
+        changes.update(status_change("requests_by_status", "Pending", "Rejected", others.modified_count))
+        changes[("adoptions_by_day", day_key(now))] += 1
+        record_stats(mongo.db, changes, session=session)
+
+        events = [request_event(mongo, approved.get("requester_id"), pet, request_id, "Approved", session)]
+        for other in rejected:
+            events.append(request_event(mongo, other.get("requester_id"), pet, other["_id"], "Rejected", session))
+        return events
+
+    return run_in_transaction(mongo, approve)
+
+def reject_adoption_request(mongo, pet_id, request_id, owner):
+    """Reject one request and recompute the listing's pending count and status.
+
+    Returns the event recorded for the applicant, in a list like approve.
+    """
+    def reject(session):
+        pet = mongo.db.pet_listings.find_one({"_id": pet_id}, {"owner": 1, "status": 1, "name": 1}, session=session)
+        if not pet:
+            raise AdoptionRequestError("Pet listing not found", 404)
+        if pet["owner"] != owner:
+            raise AdoptionRequestError("Unauthorized to modify this listing", 403)
+
+        previous = mongo.db.adoption_requests.find_one_and_update(
+            {"_id": request_id, "pet_id": pet_id, "status": {"$ne": "Rejected"}},
+            {"$set": {"status": "Rejected", "updated_at": datetime.utcnow()}},
+            projection={"status": 1, "updated_at": 1, "requester_id": 1},
+            session=session
+        )
+        if not previous:
+            raise AdoptionRequestError("Adoption request not found or already rejected", 404)
+
+        # Rejecting the approved request reopens the listing
+        keep_adopted = previous["status"] != "Approved"
+        updated = mongo.db.pet_listings.find_one_and_update(
+            {"_id": pet_id},
+            [
+                {"$set": {"pending_count": {"$max": [0, {"$subtract": [
+                    {"$ifNull": ["$pending_count", 0]},
+                    1 if previous["status"] == "Pending" else 0
+                ]}]}}},
+                {"$set": {"status": {"$cond": [
+                    {"$and": [keep_adopted, {"$eq": ["$status", "Adopted"]}]},
+                    "Adopted",
+                    {"$cond": [{"$gt": ["$pending_count", 0]}, "Pending", "Available"]}
+                ]}}}
+            ],
+            projection={"status": 1},
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+
+        changes = status_change("requests_by_status", previous["status"], "Rejected")
+        if updated:
+            changes.update(status_change("listings_by_status", pet.get("status"), updated["status"]))
+        if previous["status"] == "Approved" and previous.get("updated_at"):
+            changes[("adoptions_by_day", day_key(previous["updated_at"]))] -= 1
+        record_stats(mongo.db, changes, session=session)
+
+        return [request_event(mongo, previous.get("requester_id"), pet, request_id, "Rejected", session)]
+
+    return run_in_transaction(mongo, reject)
@@ -0,0 +1,95 @@
+# backend/pagination.py
+import base64
+import json
+from datetime import datetime
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Newest first; _id breaks ties between listings created in the same millisecond
+SORT_ORDER = [("created_at", -1), ("_id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def page_size(value):
+    try:
+        size = int(value) if value is not None else DEFAULT_PAGE_SIZE
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _encode(payload):
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(doc):
+    return _encode({"t": doc["created_at"].isoformat(), "id": str(doc["_id"])})
+
+
+def decode_cursor(cursor):
+    try:
+        payload = _decode(cursor)
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise InvalidCursor(cursor)
+
+
+def encode_rank_cursor(rank, doc_id):
+    """Cursor for results ordered by a computed rank (text score, distance)."""
+    return _encode({"r": rank, "id": str(doc_id)})
+
+
+def decode_rank_cursor(cursor):
+    try:
+        payload = _decode(cursor)
+        return float(payload["r"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise InvalidCursor(cursor)
+
+
+def keyset_query(query, cursor=None):
+    """Restrict ``query`` to documents after ``cursor`` in feed order."""
+    if not cursor:
+        return query
+    created_at, last_id = decode_cursor(cursor)
+    return {
+        "$and": [
+            query,
+            {"$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": last_id}}
+            ]}
+        ]
+    }
+
+
+def split_page(docs, size):
+    """Trim the look-ahead document and return (page, next cursor)."""
+    next_cursor = encode_cursor(docs[size - 1]) if len(docs) > size else None
+    return docs[:size], next_cursor
+
+
+def paginate(collection, query, projection=None, cursor=None, limit=None):
+    """Return one page of ``query`` in feed order plus the cursor for the next page.
+
+    Uses keyset pagination on (created_at, _id) so every page is a bounded
+    index range instead of a growing skip.
+    """
+    size = page_size(limit)
+    # Fetch one extra document to know whether another page exists
+    docs = list(
+        collection.find(keyset_query(query, cursor), projection).sort(SORT_ORDER).limit(size + 1)
+    )
+    return split_page(docs, size)
@@ -0,0 +1,173 @@
+# backend/ratelimit.py
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+Quota = namedtuple("Quota", ["limit", "period"])
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# View function name -> requests allowed per identity; RATE_LIMITS overrides
+# entries as "login=10/minute,signup=off"
+DEFAULT_RATE_LIMITS = {
+    "signup": "5/minute",
+    "login": "10/minute",
+    "add_pet_listing": "20/hour",
+    "bulk_ingest_pet_listings": "5/hour",
+    "send_adoption_request": "30/hour",
+}
+
+
+def parse_quota(value):
+    """Parse "10/minute" into Quota(10, 60); "off" or "0" means no limit (None)."""
+    if value in ("off", "0", ""):
+        return None
+    limit, _, period = value.partition("/")
+    if period not in PERIODS or not limit.isdigit() or int(limit) <= 0:
+        raise ValueError(f"Invalid rate limit {value!r}; use e.g. 10/minute")
+    return Quota(int(limit), PERIODS[period])
+
+
+def parse_rate_limits(overrides=None):
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for item in filter(None, (overrides or "").split(",")):
+        view, _, value = item.strip().partition("=")
+        limits[view] = value
+    quotas = {view: parse_quota(value) for view, value in limits.items()}
+    return {view: quota for view, quota in quotas.items() if quota}
+
+
+class LocalBucketStore:
+    """Token buckets in this process, so each worker enforces its own share.
+
+    At most ``max_keys`` buckets are kept; the least recently used is
+    dropped first, which only ever refills an idle client.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, quota):
+        """Take a token; returns 0 when allowed, else seconds until one is available."""
+        now = time.monotonic()
+        rate = quota.limit / quota.period
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (quota.limit, now))
+            tokens = min(quota.limit, tokens + (now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1 if not wait else tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# Same bucket arithmetic as LocalBucketStore, atomic on the Redis server and
+# timed by its clock so every worker agrees
+_TAKE_SCRIPT = """
+local limit, rate = tonumber(ARGV[1]), tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = math.min(limit, (tonumber(bucket[1]) or limit) + math.max(0, now - (tonumber(bucket[2]) or now)) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(limit / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Shared buckets so a quota holds across every worker and host."""
+
+    def __init__(self, url, prefix="petpal:ratelimit:"):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+        self._prefix = prefix
+
+    def take(self, key, quota):
+        return float(self._take(keys=[self._prefix + key], args=[quota.limit, quota.limit / quota.period]))
+
+
+class RateLimiter:
+    """Per-identity token-bucket quotas and a concurrency cap for the write views.
+
+    Views opt in with @rate_limited, which checks both before the view
+    body runs, so a rejected request costs no Mongo or disk work. At most
+    ``max_concurrent`` limited requests run at once in each worker process
+    (the server-wide cap is workers x max_concurrent); excess ones are shed
+    with 503, which leaves threads free for reads.
+    """
+
+    def __init__(self, store, quotas, max_concurrent=0):
+        self.store = store
+        self.quotas = quotas
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    @classmethod
+    def from_config(cls, config):
+        redis_url = config.get("RATE_LIMIT_REDIS_URL")
+        if redis_url:
+            store = RedisBucketStore(redis_url)
+        else:
+            store = LocalBucketStore(config.get("RATE_LIMIT_MAX_KEYS", 10000))
+        return cls(store, parse_rate_limits(config.get("RATE_LIMITS")), config.get("WRITE_CONCURRENCY", 0))
+
+    def acquire(self):
+        return self._slots is None or self._slots.acquire(blocking=False)
+
+    def release(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    def retry_after(self, view, quota, identity):
+        return self.store.take(f"{view}:{identity}", quota)
+
+
+def identity_key(user, remote_addr):
+    """Bucket key: the JWT email when the view verified a token, else the client address."""
+    return f"user:{user['email']}" if user else f"ip:{remote_addr}"
+
+
+def rate_limited(fn):
+    """Apply the app's RateLimiter quota for this view (by function name).
+
+    Use below @jwt_required() so the identity it verified is reused; views
+    without it (login, signup) are limited by client address.
+    """
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        limiter = current_app.config["rate_limiter"]
+        quota = limiter.quotas.get(fn.__name__)
+        if quota is None or request.method == "OPTIONS":
+            return fn(*args, **kwargs)
+        if not limiter.acquire():
+            return busy_response()
+        try:
+            try:
+                user = get_jwt_identity()
+            except RuntimeError:
+                user = None
+            wait = limiter.retry_after(fn.__name__, quota, identity_key(user, request.remote_addr))
+            if wait:
+                return rate_limited_response(wait)
+            return fn(*args, **kwargs)
+        finally:
+            limiter.release()
+    return decorator
+
+
+# Plain (body, status, headers) tuples, so the Quart app returns them too
+
+def busy_response():
+    return {"error": "Server busy, please retry shortly"}, 503, {"Retry-After": "1"}
+
+
+def rate_limited_response(wait):
+    return {"error": "Too many requests, please retry later"}, 429, {"Retry-After": str(math.ceil(wait))}
@@ -0,0 +1,131 @@
+# backend/search.py
+from models import LISTING_CARD_FIELDS
+from pagination import (
+    SORT_ORDER,
+    decode_rank_cursor,
+    encode_rank_cursor,
+    keyset_query,
+    split_page
+)
+from validation import ValidationError
+
+SEARCH_STATUSES = ["Available", "Pending", "Adopted"]
+DEFAULT_SEARCH_STATUSES = ["Available", "Pending"]
+FACET_LIMIT = 20
+
+# Facet name -> listing field it counts
+FACETS = {
+    "species": "$species",
+    "city": "$owner_contact.address.city",
+}
+
+SEARCH_RESULT_FIELDS = {
+    **LISTING_CARD_FIELDS,
+    "owner_contact.address.city": 1,
+    "owner_contact.address.state": 1
+}
+
+
+def search_filter(args):
+    """Build the listing filter from the search query string.
+
+    Supported parameters: q (full-text), species, city, state, min_age,
+    max_age and status (repeatable; defaults to Available and Pending).
+    """
+    statuses = args.getlist("status") or DEFAULT_SEARCH_STATUSES
+    invalid = sorted(set(statuses) - set(SEARCH_STATUSES))
+    if invalid:
+        raise ValidationError("Invalid status value", invalid=invalid)
+    query = {"status": {"$in": statuses}}
+
+    for param, field in [
+        ("species", "species"),
+        ("city", "owner_contact.address.city"),
+        ("state", "owner_contact.address.state")
+    ]:
+        if args.get(param):
+            query[field] = args[param]
+
+    age = {}
+    for param, operator in [("min_age", "$gte"), ("max_age", "$lte")]:
+        if args.get(param):
+            try:
+                age[operator] = int(args[param])
+            except ValueError:
+                raise ValidationError(f"{param} must be an integer")
+    if age:
+        query["age"] = age
+
+    if args.get("q", "").strip():
+        query["$text"] = {"$search": args["q"].strip()}
+    return query
+
+
+def search_pipeline(query, cursor, size):
+    """Aggregation pipeline for one page of search results.
+
+    Without ``q`` results come in feed order and the cursor folds into the
+    first $match, so every page is an index range. With ``q`` they are
+    ranked by text score. The first page also carries facet counts over the
+    whole filtered set, computed in the same round trip with $facet; later
+    pages skip them since the client already has them.
+    """
+    text = "$text" in query
+    if text:
+        pipeline = [
+            {"$match": query},
+            {"$addFields": {"score": {"$meta": "textScore"}}}
+        ]
+        if cursor:
+            score, last_id = decode_rank_cursor(cursor)
+            pipeline.append({"$match": {"$or": [
+                {"score": {"$lt": score}},
+                {"score": score, "_id": {"$lt": last_id}}
+            ]}})
+        pipeline.append({"$sort": {"score": -1, "_id": -1}})
+    else:
+        pipeline = [
+            {"$match": keyset_query(query, cursor)},
+            {"$sort": dict(SORT_ORDER)}
+        ]
+
+    fields = dict(SEARCH_RESULT_FIELDS, score=1) if text else SEARCH_RESULT_FIELDS
+    page = [{"$limit": size + 1}, {"$project": fields}]
+    if cursor:
+        return pipeline + page
+
+    facets = {
+        name: [
+            {"$group": {"_id": field, "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": FACET_LIMIT},
+            {"$project": {"_id": 0, "value": "$_id", "count": 1}}
+        ]
+        for name, field in FACETS.items()
+    }
+    return pipeline + [{"$facet": {"items": page, **facets}}]
+
+
+def search_results(results, query, cursor, size):
+    """Shape the documents ``search_pipeline`` returned into the response body."""
+    results = list(results)
+    facets = None
+    if not cursor:
+        facet_doc = results[0] if results else {}
+        results = facet_doc.get("items", [])
+        facets = {name: facet_doc.get(name, []) for name in FACETS}
+
+    if "$text" in query:
+        next_cursor = None
+        if len(results) > size:
+            next_cursor = encode_rank_cursor(results[size - 1]["score"], results[size - 1]["_id"])
+        items = results[:size]
+        for doc in items:
+            doc.pop("score", None)
+    else:
+        items, next_cursor = split_page(results, size)
+
+    body = {"items": items, "next": next_cursor}
+    if facets is not None:
+        body["facets"] = facets
+    return body
@@ -0,0 +1,77 @@
+# backend/serialization.py
+import json
+from datetime import date, datetime, timezone
+from bson.objectid import ObjectId
+from flask import has_request_context, request
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Stored image paths (image and its variants) are relative; responses
+# point them at this server. A quote inside a JSON string is escaped, so
+# this only ever matches the start of a string value.
+MEDIA_PATH = b'":"/uploads/'
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return obj.isoformat().replace("+00:00", "Z")
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class BSONJSONProvider(JSONProvider):
+    """JSON provider that encodes ObjectId and datetime natively.
+
+    Uses orjson when it is installed and the stdlib encoder otherwise; both
+    produce the same compact output. Naive datetimes are treated as UTC,
+    which is how Mongo returns them. Image paths are made absolute on the
+    encoded bytes, so handlers no longer rewrite documents one by one.
+    """
+
+    mimetype = "application/json"
+
+    def _encode(self, obj):
+        if orjson is not None:
+            return orjson.dumps(
+                obj, default=_default, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+            )
+        return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+    def dumps(self, obj, **kwargs):
+        return self.dumpb(obj).decode()
+
+    def dumpb(self, obj):
+        encoded = self._encode(obj)
+        if MEDIA_PATH in encoded:
+            base_url = self.media_base_url()
+            if base_url:
+                encoded = encoded.replace(MEDIA_PATH, f'":"{base_url}/uploads/'.encode())
+        return encoded
+
+    def request_host(self):
+        return request.host if has_request_context() else None
+
+    def media_base_url(self):
+        configured = self._app.config.get("MEDIA_BASE_URL")
+        if configured:
+            return configured
+        host = self.request_host()
+        return f"http://{host}" if host else None
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
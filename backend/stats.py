@@ -0,0 +1,231 @@
+# backend/stats.py
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from leases import Lease
+
+logger = logging.getLogger("petpal.stats")
+
+# One counter document per (metric, key): {"_id": {"m": metric, "k": key}, "n": count}.
+# Keys are free text (species), so they are never used as field names.
+STATS_COLLECTION = "admin_stats"
+ADOPTION_DAYS = 30
+DAY_FORMAT = "%Y-%m-%d"
+# Live collection -> its archive (see archive.py); counters cover both tiers,
+# so moving documents between them leaves the counters unchanged
+ARCHIVE_COLLECTIONS = {
+    "pet_listings": "pet_listings_archive",
+    "adoption_requests": "adoption_requests_archive",
+}
+
+# metric -> (source collection, pipeline producing {_id: key, n: count})
+RECONCILE_PIPELINES = {
+    "users_by_role": ("users", [
+        {"$group": {"_id": "$role", "n": {"$sum": 1}}},
+    ]),
+    "listings_by_status": ("pet_listings", [
+        {"$group": {"_id": "$status", "n": {"$sum": 1}}},
+    ]),
+    "listings_by_species": ("pet_listings", [
+        {"$group": {"_id": "$species", "n": {"$sum": 1}}},
+    ]),
+    "requests_by_status": ("adoption_requests", [
+        {"$group": {"_id": "$status", "n": {"$sum": 1}}},
+    ]),
+    "adoptions_by_day": ("adoption_requests", [
+        {"$match": {"status": "Approved"}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": DAY_FORMAT, "date": "$updated_at"}},
+            "n": {"$sum": 1}
+        }},
+    ]),
+}
+
+
+def day_key(moment):
+    return moment.strftime(DAY_FORMAT)
+
+
+def stat_updates(changes):
+    """UpdateOne ops applying ``changes`` ({(metric, key): delta}) to the counters."""
+    return [
+        UpdateOne({"_id": {"m": metric, "k": key}}, {"$inc": {"n": delta}}, upsert=True)
+        for (metric, key), delta in changes.items()
+        if delta
+    ]
+
+
+def record_stats(db, changes, session=None):
+    updates = stat_updates(changes)
+    if updates:
+        db[STATS_COLLECTION].bulk_write(updates, ordered=False, session=session)
+
+
+def listing_changes(listings, sign=1):
+    """Counter deltas for listings being added (sign=1) or removed (sign=-1)."""
+    changes = Counter()
+    for listing in listings:
+        changes[("listings_by_status", listing.get("status"))] += sign
+        changes[("listings_by_species", listing.get("species"))] += sign
+    return changes
+
+
+def status_change(metric, before, after, count=1):
+    if before == after or not count:
+        return Counter()
+    return Counter({(metric, before): -count, (metric, after): count})
+
+
+def request_added_changes(listing_status):
+    """Counter deltas for a new pending request on a listing that was ``listing_status``."""
+    changes = Counter({("requests_by_status", "Pending"): 1})
+    if listing_status == "Available":
+        changes.update(status_change("listings_by_status", "Available", "Pending"))
+    return changes
+
+
+def removed_requests_pipeline(pet_id):
+    """Group a listing's requests so deleting them can be subtracted from the counters."""
+    return [
+        {"$match": {"pet_id": pet_id}},
+        {"$group": {
+            "_id": {
+                "status": "$status",
+                "day": {"$cond": [
+                    {"$eq": ["$status", "Approved"]},
+                    {"$dateToString": {"format": DAY_FORMAT, "date": "$updated_at"}},
+                    None
+                ]}
+            },
+            "n": {"$sum": 1}
+        }},
+    ]
+
+
+def removed_request_changes(groups):
+    """Counter deltas for requests deleted with a listing (``removed_requests_pipeline`` output)."""
+    changes = Counter()
+    for group in groups:
+        changes[("requests_by_status", group["_id"]["status"])] -= group["n"]
+        if group["_id"].get("day"):
+            changes[("adoptions_by_day", group["_id"]["day"])] -= group["n"]
+    return changes
+
+
+def request_removed_changes(request):
+    """Counter deltas for one deleted request (needs its status and updated_at)."""
+    changes = Counter({("requests_by_status", request["status"]): -1})
+    if request["status"] == "Approved" and request.get("updated_at"):
+        changes[("adoptions_by_day", day_key(request["updated_at"]))] -= 1
+    return changes
+
+
+def reconcile_stats(db, metrics=None, still_held=None):
+    """Recompute counters from the source collections with $merge.
+
+    Fixes any drift from writes that raced or failed between a data change
+    and its counter update. Counters for keys that no longer exist are
+    dropped. ``still_held`` (the scheduled rebuild passes Lease.acquire,
+    which also renews the lease) is checked before each metric and before
+    the cleanup; once it returns False another process may be rebuilding,
+    and this pass's delete could drop the counters that one just wrote, so
+    the rebuild stops. Returns whether it ran to the end.
+    """
+    def lost_lease():
+        if still_held and not still_held():
+            logger.warning("Lost the stats-reconciler lease; stopping this rebuild")
+            return True
+        return False
+
+    run_at = datetime.utcnow()
+    metrics = metrics or list(RECONCILE_PIPELINES)
+    for metric in metrics:
+        if lost_lease():
+            return False
+        collection, pipeline = RECONCILE_PIPELINES[metric]
+        if collection in ARCHIVE_COLLECTIONS:
+            pipeline = [{"$unionWith": ARCHIVE_COLLECTIONS[collection]}] + pipeline
+        db[collection].aggregate(pipeline + [
+            {"$project": {"_id": {"m": metric, "k": "$_id"}, "n": 1, "at": run_at}},
+            {"$merge": {
+                "into": STATS_COLLECTION,
+                "on": "_id",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }},
+        ])
+    if lost_lease():
+        return False
+    # Counters only ever touched by record_stats carry no "at"
+    db[STATS_COLLECTION].delete_many({
+        "_id.m": {"$in": metrics},
+        "$or": [{"at": {"$lt": run_at}}, {"at": {"$exists": False}}]
+    })
+    db[STATS_COLLECTION].update_one(
+        {"_id": {"m": "meta", "k": "reconciled_at"}}, {"$set": {"at": run_at}}, upsert=True
+    )
+    return True
+
+
+def stats_summary(docs, today=None):
+    """Shape the counter documents (one find over admin_stats) for the dashboard."""
+    today = today or datetime.utcnow()
+    first_day = day_key(today - timedelta(days=ADOPTION_DAYS - 1))
+    summary = {
+        "users": {"by_role": {}},
+        "listings": {"by_status": {}, "by_species": {}},
+        "requests": {"by_status": {}},
+        "adoptions_per_day": {},
+        "reconciled_at": None
+    }
+    sections = {
+        "users_by_role": summary["users"]["by_role"],
+        "listings_by_status": summary["listings"]["by_status"],
+        "listings_by_species": summary["listings"]["by_species"],
+        "requests_by_status": summary["requests"]["by_status"],
+    }
+    for doc in docs:
+        metric, key = doc["_id"]["m"], doc["_id"]["k"]
+        if metric == "meta":
+            summary["reconciled_at"] = doc.get("at")
+        elif doc.get("n", 0) <= 0 or key is None:
+            continue
+        elif metric in sections:
+            sections[metric][str(key)] = doc["n"]
+        elif metric == "adoptions_by_day" and key >= first_day:
+            summary["adoptions_per_day"][key] = doc["n"]
+
+    summary["users"]["total"] = sum(summary["users"]["by_role"].values())
+    summary["listings"]["total"] = sum(summary["listings"]["by_status"].values())
+    summary["requests"]["total"] = sum(summary["requests"]["by_status"].values())
+    summary["adoptions_per_day"] = [
+        {"day": day, "count": count} for day, count in sorted(summary["adoptions_per_day"].items())
+    ]
+    return summary
+
+
+def start_reconciler(mongo, interval):
+    """Reconcile every ``interval`` seconds on a daemon thread (0 disables).
+
+    Every worker starts the thread, but only the process holding the
+    "stats-reconciler" lease runs the rebuild, renewing it as it goes.
+    Takes the connection, so the lease and the rebuild follow the
+    per-process client.
+    """
+    if not interval:
+        return None
+    stop = threading.Event()
+    lease = Lease(mongo, "stats-reconciler", interval)
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                if lease.acquire():
+                    reconcile_stats(mongo.db, still_held=lease.acquire)
+            except Exception:
+                logger.exception("Stats reconciliation failed")
+
+    threading.Thread(target=run, name="stats-reconciler", daemon=True).start()
+    return stop
@@ -0,0 +1,41 @@
+# backend/streaming.py
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+EXPORT_BATCH_SIZE = 500
+
+
+def ndjson_requested(accept_mimetypes):
+    return accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def wants_ndjson():
+    return ndjson_requested(request.accept_mimetypes)
+
+
+def export_framing(ndjson):
+    """(mimetype, opening, separator, line end, closing) for a streamed export."""
+    if ndjson:
+        return NDJSON_MIMETYPE, "", "", "\n", ""
+    return "application/json", "[", ",", "", "]"
+
+
+def stream_documents(cursor, transform=None):
+    """Stream a Mongo cursor as a JSON array, or as NDJSON when the client asks for it.
+
+    Documents are written as the cursor yields them, one server-side batch
+    at a time, so memory stays flat and the first byte goes out right away.
+    """
+    cursor = cursor.batch_size(EXPORT_BATCH_SIZE)
+    mimetype, opening, separator, line_end, closing = export_framing(wants_ndjson())
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield opening
+        for count, doc in enumerate(cursor):
+            if transform:
+                doc = transform(doc)
+            yield (separator if count else "") + dumps(doc) + line_end
+        yield closing
+
+    return Response(stream_with_context(generate()), mimetype=mimetype)
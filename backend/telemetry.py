@@ -0,0 +1,239 @@
+# backend/telemetry.py
+import atexit
+import bisect
+import hmac
+import ipaddress
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from flask import Response, g, jsonify, request
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REDACTED_HEADERS = {"authorization", "cookie", "set-cookie", "x-api-key"}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe request and Mongo command metrics, rendered in Prometheus text format."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = defaultdict(lambda: Histogram(self.buckets))
+        self._responses = defaultdict(int)
+        self._commands = defaultdict(lambda: Histogram(self.buckets))
+        self._command_failures = defaultdict(int)
+        # name -> [type, help, value] for counters and gauges kept by background jobs
+        self._series = {}
+
+    def increment(self, name, amount=1, help_text=""):
+        with self._lock:
+            self._series.setdefault(name, ["counter", help_text, 0])[2] += amount
+
+    def set_gauge(self, name, value, help_text=""):
+        with self._lock:
+            self._series[name] = ["gauge", help_text, value]
+
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            self._requests[(route, method)].observe(seconds)
+            self._responses[(route, method, str(status))] += 1
+
+    def observe_command(self, command, seconds, failed=False):
+        with self._lock:
+            self._commands[command].observe(seconds)
+            if failed:
+                self._command_failures[command] += 1
+
+    def _histogram_lines(self, name, labels, histogram):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return lines
+
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP petpal_http_request_duration_seconds Request latency by route.",
+                "# TYPE petpal_http_request_duration_seconds histogram",
+            ]
+            for (route, method), histogram in sorted(self._requests.items()):
+                lines += self._histogram_lines(
+                    "petpal_http_request_duration_seconds",
+                    f'route="{route}",method="{method}"',
+                    histogram
+                )
+            lines += [
+                "# HELP petpal_http_responses_total Responses by route and status.",
+                "# TYPE petpal_http_responses_total counter",
+            ]
+            for (route, method, status), count in sorted(self._responses.items()):
+                lines.append(
+                    f'petpal_http_responses_total{{route="{route}",method="{method}",status="{status}"}} {count}'
+                )
+            lines += [
+                "# HELP petpal_mongo_command_duration_seconds Mongo command latency.",
+                "# TYPE petpal_mongo_command_duration_seconds histogram",
+            ]
+            for command, histogram in sorted(self._commands.items()):
+                lines += self._histogram_lines(
+                    "petpal_mongo_command_duration_seconds", f'command="{command}"', histogram
+                )
+            lines += [
+                "# HELP petpal_mongo_command_failures_total Failed Mongo commands.",
+                "# TYPE petpal_mongo_command_failures_total counter",
+            ]
+            for command, count in sorted(self._command_failures.items()):
+                lines.append(f'petpal_mongo_command_failures_total{{command="{command}"}} {count}')
+            for name, (kind, help_text, value) in sorted(self._series.items()):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.metrics.observe_command(event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.metrics.observe_command(event.command_name, event.duration_micros / 1e6, failed=True)
+
+
+class JSONLineFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record.msg, default=str, separators=(",", ":"))
+
+
+# One queue, handler and writer thread per process, shared by every app built
+# in it; a handler per app would write each record once for every app
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.handlers.QueueHandler(_log_queue)
+# Records are serialized on enqueue; the listener thread only writes lines
+_log_handler.setFormatter(JSONLineFormatter())
+_listener = {"pid": None}
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    """Start this process's writer thread, once, after any fork."""
+    if _listener["pid"] == os.getpid():
+        return
+    with _listener_lock:
+        if _listener["pid"] != os.getpid():
+            listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+            listener.start()
+            atexit.register(listener.stop)
+            _listener["pid"] = os.getpid()
+
+
+def redact_headers(headers):
+    return {
+        name: "[redacted]" if name.lower() in REDACTED_HEADERS else value
+        for name, value in headers.items()
+    }
+
+
+class Telemetry:
+    """Request timing, sampled structured access logs and a /metrics endpoint.
+
+    Log records go through a queue and are written by a background thread,
+    so request threads never block on stdout. The thread is started on the
+    first sampled record in each process, so it survives a pre-fork server.
+    """
+
+    def __init__(self, app=None):
+        self.metrics = Metrics()
+        self.command_listener = MongoCommandListener(self.metrics)
+        self.logger = logging.getLogger("petpal.requests")
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sample_rate = app.config.get("TELEMETRY_SAMPLE_RATE", 0.0)
+        self.log_headers = app.config.get("TELEMETRY_LOG_HEADERS", False)
+        self.metrics_token = app.config.get("METRICS_TOKEN")
+        self.metrics_allow_loopback = app.config.get("METRICS_ALLOW_LOOPBACK", False)
+
+        if _log_handler not in self.logger.handlers:
+            self.logger.addHandler(_log_handler)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+
+        app.before_request(self._start_timer)
+        app.after_request(self._record)
+        app.add_url_rule("/metrics", "metrics", self._metrics_view)
+
+    def _start_timer(self):
+        g.telemetry_start = time.perf_counter()
+
+    def _record(self, response):
+        start = g.pop("telemetry_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        self.metrics.observe_request(route, request.method, response.status_code, elapsed)
+
+        if self.sample_rate and random.random() < self.sample_rate:
+            entry = {
+                "method": request.method,
+                "route": route,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(elapsed * 1000, 3),
+                "remote_addr": request.remote_addr,
+            }
+            if self.log_headers:
+                entry["headers"] = redact_headers(request.headers)
+            _ensure_listener()
+            self.logger.info(entry)
+        return response
+
+    def _metrics_allowed(self):
+        """Scrapers send METRICS_TOKEN as a bearer token; with METRICS_ALLOW_LOOPBACK,
+        connections from this host need none. Otherwise /metrics is closed."""
+        if self.metrics_token:
+            expected = f"Bearer {self.metrics_token}"
+            if hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode()):
+                return True
+        if not self.metrics_allow_loopback:
+            return False
+        try:
+            return ipaddress.ip_address(request.remote_addr or "").is_loopback
+        except ValueError:
+            return False
+
+    def _metrics_view(self):
+        if not self._metrics_allowed():
+            return jsonify({"error": "Metrics are not public"}), 403
+        return Response(self.metrics.render(), mimetype="text/plain; version=0.0.4")
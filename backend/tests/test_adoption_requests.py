@@ -0,0 +1,101 @@
+# backend/tests/test_adoption_requests.py
+import threading
+from datetime import datetime
+import pytest
+from bson.objectid import ObjectId
+import models
+from indexes import ensure_indexes
+from models import AdoptionRequestError, approve_adoption_request
+
+OWNER = "owner@example.com"
+
+
+def add_listing(db, applicants, status="Pending"):
+    pet_id = ObjectId()
+    db.pet_listings.insert_one({
+        "_id": pet_id,
+        "name": "Rex",
+        "species": "Dog",
+        "owner": OWNER,
+        "status": status,
+        "pending_count": len(applicants),
+        "request_count": len(applicants),
+        "created_at": datetime.utcnow()
+    })
+    request_ids = []
+    for email in applicants:
+        request_id = str(ObjectId())
+        db.adoption_requests.insert_one({
+            "_id": request_id,
+            "pet_id": pet_id,
+            "requester_id": email,
+            "status": "Pending",
+            "request_date": datetime.utcnow()
+        })
+        request_ids.append(request_id)
+    return pet_id, request_ids
+
+
+def approve_at_once(mongo, pet_id, request_ids):
+    """Approve every request from its own thread, released together; returns each outcome."""
+    start = threading.Barrier(len(request_ids))
+    outcomes = [None] * len(request_ids)
+
+    def approve(index):
+        start.wait()
+        try:
+            approve_adoption_request(mongo, pet_id, request_ids[index], OWNER)
+            outcomes[index] = "approved"
+        except AdoptionRequestError as e:
+            outcomes[index] = e.status_code
+
+    threads = [threading.Thread(target=approve, args=(i,)) for i in range(len(request_ids))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return outcomes
+
+
+def test_concurrent_approvals_adopt_once(mongo):
+    db = mongo.db
+    ensure_indexes(db)
+    for _ in range(20):
+        pet_id, request_ids = add_listing(db, ["a@example.com", "b@example.com"])
+
+        outcomes = approve_at_once(mongo, pet_id, request_ids)
+
+        assert sorted(outcomes, key=str) == [409, "approved"]
+        assert db.pet_listings.find_one({"_id": pet_id})["status"] == "Adopted"
+        statuses = sorted(r["status"] for r in db.adoption_requests.find({"pet_id": pet_id}))
+        assert statuses == ["Approved", "Rejected"]
+
+
+@pytest.mark.parametrize("transactions", [True, False])
+def test_rejected_request_cannot_be_approved(mongo, monkeypatch, transactions):
+    if not transactions:
+        # The standalone-server path: no session, so the claim is undone by hand
+        monkeypatch.setattr(models, "run_in_transaction", lambda mongo, callback: callback(None))
+    db = mongo.db
+    pet_id, (pending, rejected) = add_listing(db, ["a@example.com", "b@example.com"])
+    db.adoption_requests.update_one({"_id": rejected}, {"$set": {"status": "Rejected"}})
+    db.pet_listings.update_one({"_id": pet_id}, {"$set": {"pending_count": 1}})
+
+    with pytest.raises(AdoptionRequestError) as e:
+        approve_adoption_request(mongo, pet_id, rejected, OWNER)
+
+    assert e.value.status_code == 409
+    listing = db.pet_listings.find_one({"_id": pet_id})
+    assert (listing["status"], listing["pending_count"]) == ("Pending", 1)
+    assert db.adoption_requests.find_one({"_id": pending})["status"] == "Pending"
+    assert db.adoption_requests.find_one({"_id": rejected})["status"] == "Rejected"
+
+
+def test_unknown_request_is_not_found(mongo):
+    pet_id, _ = add_listing(mongo.db, ["a@example.com"])
+
+    with pytest.raises(AdoptionRequestError) as e:
+        approve_adoption_request(mongo, pet_id, str(ObjectId()), OWNER)
+
+    assert e.value.status_code == 404
+    assert mongo.db.pet_listings.find_one({"_id": pet_id})["status"] == "Pending"
@@ -0,0 +1,224 @@
+# backend/tests/test_contract.py
+"""The Flask app (app.py) and the Quart app (asgi.py) must answer alike.
+
+One scripted session runs against each app on its own database, seeded
+with the same documents; the transcripts of status codes and bodies must
+match once generated ids, tokens and timestamps are masked.
+"""
+import asyncio
+import json
+import re
+from datetime import datetime, timedelta
+import pytest
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+from indexes import ensure_indexes
+
+# asgi.py runs on Quart over Motor
+pytest.importorskip("quart")
+pytest.importorskip("motor")
+
+# Every write quota off: the session signs up from one address
+NO_RATE_LIMITS = "signup=off,login=off,add_pet_listing=off,bulk_ingest_pet_listings=off,send_adoption_request=off"
+
+PETS = [ObjectId() for _ in range(4)]
+CREATED = datetime(2024, 1, 1)
+MASKS = [
+    (re.compile(r"^[0-9a-f]{24}$"), "<id>"),
+    (re.compile(r"^[\w-]+\.[\w-]+\.[\w-]+$"), "<token>"),
+    (re.compile(r"^\d{4}-\d\d-\d\dT[\d:.]+Z?$"), "<time>"),
+]
+
+
+def seed(db):
+    ensure_indexes(db)
+    db.pet_listings.insert_many([
+        {
+            "_id": pet_id,
+            "name": name,
+            "species": species,
+            "age": 3,
+            "description": f"{name} the {species.lower()}",
+            "owner": "owner@example.com",
+            "owner_contact": {"phone": "9000000000", "address": {"city": "Pune", "state": "MH"}},
+            "image": f"/uploads/{name.lower()}.png",
+            "status": "Available",
+            "pending_count": 0,
+            "request_count": 0,
+            "created_at": CREATED + timedelta(hours=i)
+        }
+        for i, (pet_id, name, species) in enumerate(zip(PETS, ["Rex", "Luna", "Milo", "Coco"], ["Dog", "Cat", "Dog", "Bird"]))
+    ])
+
+
+def mask(value):
+    if isinstance(value, dict):
+        return {key: mask(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [mask(item) for item in value]
+    if isinstance(value, str):
+        for pattern, replacement in MASKS:
+            if pattern.match(value):
+                return replacement
+        return re.sub(r"^https?://[^/]+/", "<host>/", value)
+    return value
+
+
+def application(pet_id, **changes):
+    return dict({
+        "pet_listing_id": str(pet_id),
+        "contact": "8000000000",
+        "address": "1 Park Street",
+        "city": "Pune",
+        "state": "MH",
+        "postalCode": "411001",
+        "homeType": "House",
+        "hoursAlone": "2",
+        "petExperience": "Some",
+        "adoptionReason": "Companion"
+    }, **changes)
+
+
+async def session(call, db):
+    """The scripted requests; returns the masked transcript."""
+    transcript = []
+
+    async def step(method, path, token=None, body=None, headers=None):
+        status, response = await call(method, path, token, body, headers)
+        path = re.sub(r"[\w-]+\.[\w-]+\.[\w-]+", "<token>", re.sub(r"[0-9a-f]{24}", "<id>", path))
+        transcript.append((method, path, status, mask(response)))
+        return response
+
+    signup = {"password": "correct horse", "name": "Owner", "email": "owner@example.com"}
+    owner = (await step("POST", "/api/signup", body=signup))["access_token"]
+    await step("POST", "/api/signup", body=signup)
+    applicant = (await step("POST", "/api/signup", body=dict(signup, email="a@example.com", name="Ann")))["access_token"]
+    await step("POST", "/api/signup", body=dict(signup, email="admin@example.com", name="Ad"))
+    db.users.update_one({"email": "admin@example.com"}, {"$set": {"role": "admin"}})
+    await step("POST", "/api/login", body={"email": "owner@example.com", "password": "wrong"})
+    await step("POST", "/api/login", body={"email": "nobody@example.com", "password": "wrong"})
+    admin = (await step("POST", "/api/login", body={"email": "admin@example.com", "password": "correct horse"}))["access_token"]
+
+    await step("GET", "/api/me", owner)
+    await step("GET", "/api/me")
+    await step("GET", "/api/me", headers={"Authorization": f"Token {owner}"})
+    await step("GET", "/api/me", headers={"Authorization": f"Bearer {owner} extra"})
+    await step("GET", "/api/me", "not-a-token")
+    stream = (await step("POST", "/api/events/token", owner))["token"]
+    await step("GET", "/api/me", stream)
+    await step("GET", "/api/events")
+    await step("GET", f"/api/events?token={owner}")
+
+    page = await step("GET", "/api/pet-listings?limit=2")
+    await step("GET", f"/api/pet-listings?limit=2&cursor={page['next']}")
+    await step("GET", "/api/pet-listings?cursor=garbage")
+    await step("GET", "/api/pet-listings/search?species=Dog")
+    await step("GET", "/api/pet-listings/search?status=Lost")
+    await step("GET", "/api/pet-listings/search?min_age=old")
+    await step("GET", "/api/pet-listings/near")
+    await step("GET", "/api/pet-listings/near?lat=100&lng=0")
+
+    rex, luna, milo, coco = PETS
+    await step("POST", "/api/adoption-request", body=application(rex))
+    first = (await step("POST", "/api/adoption-request", applicant, application(rex)))["request"]["_id"]
+    await step("POST", "/api/adoption-request", applicant, application(rex))
+    await step("POST", "/api/adoption-request", admin, application(rex))
+    await step("POST", "/api/adoption-request", applicant, application(ObjectId()))
+    await step("POST", "/api/adoption-request", applicant, application("nope"))
+    await step("POST", "/api/adoption-request", applicant, {"contact": "8000000000"})
+    withdrawn = (await step("POST", "/api/adoption-request", applicant, application(luna)))["request"]["_id"]
+    await step("GET", "/api/pet-listings")
+
+    await step("GET", "/api/my-adoption-requests", applicant)
+    await step("GET", "/api/my-pet-listings", owner)
+    await step("PUT", f"/api/adoption-request/{rex}/{first}", applicant, {"status": "Approved"})
+    await step("PUT", f"/api/adoption-request/{rex}/{first}", owner, {"status": "Maybe"})
+    await step("PUT", f"/api/adoption-request/nope/{first}", owner, {"status": "Approved"})
+    await step("PUT", f"/api/adoption-request/{rex}/{first}", owner, {"status": "Approved"})
+    await step("PUT", f"/api/adoption-request/{rex}/{first}", owner, {"status": "Approved"})
+    await step("PUT", f"/api/adoption-request/{rex}/{ObjectId()}", owner, {"status": "Rejected"})
+    await step("POST", "/api/adoption-request", applicant, application(rex))
+
+    await step("DELETE", f"/api/adoption-request/{withdrawn}", applicant)
+    await step("DELETE", f"/api/adoption-request/{withdrawn}", applicant)
+    await step("PATCH", f"/api/pet-listing/{milo}", applicant, {"status": "Adopted"})
+    await step("PATCH", f"/api/pet-listing/{milo}", owner, {})
+    await step("PATCH", f"/api/pet-listing/{milo}", owner, {"status": "Adopted"})
+    await step("GET", "/api/my-adoption-requests", applicant)
+
+    await step("GET", "/api/admin/users", applicant)
+    await step("GET", "/api/admin/users", admin)
+    await step("GET", "/api/admin/stats", admin)
+    await step("GET", "/api/admin/pet-listings", admin)
+
+    await step("DELETE", f"/api/pet-listing/{coco}", applicant)
+    await step("DELETE", "/api/pet-listing/nope", owner)
+    await step("DELETE", f"/api/pet-listing/{coco}", owner)
+    await step("DELETE", f"/api/pet-listing/{coco}", owner)
+    await step("GET", "/api/admin/stats", admin)
+    return transcript
+
+
+def decode(data):
+    try:
+        return json.loads(data)
+    except ValueError:
+        return data.decode()
+
+
+def flask_transcript(app, db):
+    client = app.test_client()
+
+    async def call(method, path, token, body, headers):
+        headers = headers or ({"Authorization": f"Bearer {token}"} if token else {})
+        response = client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, decode(response.get_data())
+
+    return asyncio.run(session(call, db))
+
+
+def quart_transcript(config, db, monkeypatch):
+    import asgi
+    from cache import create_response_cache
+    from ratelimit import RateLimiter
+    for key, value in config.items():
+        monkeypatch.setitem(asgi.app.config, key, value)
+    # Module-level services would otherwise carry state between tests
+    monkeypatch.setattr(asgi, "listing_cache", create_response_cache(asgi.app))
+    monkeypatch.setattr(asgi, "rate_limiter", RateLimiter.from_config(asgi.app.config))
+
+    async def run():
+        async with asgi.app.test_app() as test_app:
+            client = test_app.test_client()
+
+            async def call(method, path, token, body, headers):
+                headers = headers or ({"Authorization": f"Bearer {token}"} if token else {})
+                response = await client.open(path, method=method, json=body, headers=headers)
+                return response.status_code, decode(await response.get_data())
+
+            return await session(call, db)
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def contract_config(app_config):
+    return dict(app_config, RATE_LIMITS=NO_RATE_LIMITS, CACHE_REDIS_URL=None)
+
+
+def seeded(config, database_uri):
+    """(config, db) for one run: the contract config on a fresh, seeded database."""
+    uri = database_uri()
+    db = MongoClient(uri).get_default_database()
+    seed(db)
+    return dict(config, MONGO_URI=uri), db
+
+
+def test_flask_and_quart_answer_alike(contract_config, database_uri, make_app, monkeypatch):
+    config, db = seeded(contract_config, database_uri)
+    flask_steps = flask_transcript(make_app(config), db)
+    quart_steps = quart_transcript(*seeded(contract_config, database_uri), monkeypatch)
+
+    for flask_step, quart_step in zip(flask_steps, quart_steps):
+        assert quart_step == flask_step
+    assert len(quart_steps) == len(flask_steps)
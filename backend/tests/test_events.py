@@ -0,0 +1,53 @@
+# backend/tests/test_events.py
+from flask_jwt_extended import create_access_token
+from tokens import create_stream_token
+
+IDENTITY = {"email": "ann@example.com", "role": "user", "name": "Ann"}
+
+
+def access_token(app):
+    with app.app_context():
+        return create_access_token(identity=IDENTITY)
+
+
+def open_stream(client, token):
+    return client.get(f"/api/events?token={token}", buffered=False)
+
+
+def test_stream_needs_a_stream_token(base_config, make_app):
+    app = make_app(base_config)
+    client = app.test_client()
+    login = access_token(app)
+
+    issued = client.post("/api/events/token", headers={"Authorization": f"Bearer {login}"})
+    assert issued.status_code == 200
+    assert issued.json["expires_in"] == app.config["EVENTS_TOKEN_TTL"]
+    stream = issued.json["token"]
+
+    response = open_stream(client, stream)
+    assert response.status_code == 200
+    assert next(response.response).startswith(b"retry:")
+    response.close()
+
+    assert client.get("/api/events").status_code == 401
+    # The login token never goes in a URL, and the stream token opens nothing else
+    assert open_stream(client, login).status_code == 422
+    assert client.get("/api/me", headers={"Authorization": f"Bearer {stream}"}).status_code == 422
+    expired = create_stream_token(IDENTITY, app.config["JWT_SECRET_KEY"], ttl=-1)
+    assert open_stream(client, expired).status_code == 401
+
+
+def test_streams_over_the_per_process_cap_are_shed(base_config, make_app):
+    app = make_app(dict(base_config, EVENTS_MAX_STREAMS=2))
+    client = app.test_client()
+    token = create_stream_token(IDENTITY, app.config["JWT_SECRET_KEY"])
+
+    streams = [open_stream(client, token) for _ in range(2)]
+    assert [s.status_code for s in streams] == [200, 200]
+    shed = open_stream(client, token)
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+
+    # A closed stream frees its slot, even one whose body was never read
+    streams.pop().close()
+    assert open_stream(client, token).status_code == 200
@@ -0,0 +1,20 @@
+# backend/tests/test_geo.py
+import logging
+from geo import PostalCentroids
+
+
+def test_bundled_sample_is_loud(caplog):
+    with caplog.at_level(logging.WARNING, logger="petpal.geo"):
+        centroids = PostalCentroids.from_config({"POSTAL_CENTROIDS_PATH": None})
+    assert "POSTAL_CENTROIDS_PATH is not set" in caplog.text
+    assert centroids.lookup("110001") is not None
+
+
+def test_configured_file_is_used_quietly(caplog, tmp_path):
+    path = tmp_path / "centroids.csv"
+    path.write_text("postal_code,latitude,longitude\nSW1A 1AA,51.501,-0.1416\n")
+    with caplog.at_level(logging.WARNING, logger="petpal.geo"):
+        centroids = PostalCentroids.from_config({"POSTAL_CENTROIDS_PATH": str(path)})
+    assert not caplog.text
+    assert centroids.lookup("sw1a1aa") == {"type": "Point", "coordinates": [-0.1416, 51.501]}
+    assert centroids.lookup("110001") is None
@@ -0,0 +1,29 @@
+# backend/tests/test_hashing.py
+import pytest
+from werkzeug.security import generate_password_hash
+from hashing import PasswordHasher
+
+
+@pytest.mark.parametrize("method", ["pbkdf2", "pbkdf2:sha256", "scrypt", "scrypt:32768:8:1"])
+def test_hashes_from_the_configured_method_are_current(method):
+    hasher = PasswordHasher(method)
+    assert not hasher.needs_rehash(generate_password_hash("secret", method))
+
+
+def test_hashes_from_another_method_need_a_rehash():
+    hasher = PasswordHasher("scrypt")
+    assert hasher.needs_rehash(generate_password_hash("secret", "pbkdf2"))
+    assert hasher.needs_rehash(generate_password_hash("secret", "scrypt:16384:8:1"))
+
+
+def test_unknown_method_fails_at_startup():
+    with pytest.raises(ValueError):
+        PasswordHasher("md5")
+
+
+def test_pool_is_small_and_not_forked_from_the_server():
+    hasher = PasswordHasher("pbkdf2:sha256:1000")
+
+    assert hasher.workers == 2
+    assert hasher._executor()._mp_context.get_start_method() in ("forkserver", "spawn")
+    assert hasher.verify(hasher.hash("secret"), "secret")
@@ -0,0 +1,15 @@
+# backend/tests/test_indexes.py
+from app import prepare_database
+
+
+def test_prepare_database_applies_the_manifest(app_config, mongo, make_app):
+    app = make_app(app_config)
+    prepare_database(app)
+
+    assert "email_unique" in mongo.db.users.index_information()
+    assert "one_pending_per_requester" in mongo.db.adoption_requests.index_information()
+    client = app.test_client()
+    signup = {"name": "Ann", "email": "ann@example.com", "password": "correct horse"}
+    assert client.post("/api/signup", json=signup).status_code == 201
+    assert client.post("/api/signup", json=signup).status_code == 400
+    assert mongo.db.users.count_documents({"email": "ann@example.com"}) == 1
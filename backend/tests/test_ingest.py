@@ -0,0 +1,71 @@
+# backend/tests/test_ingest.py
+import io
+import json
+import zipfile
+from bson.objectid import ObjectId
+from werkzeug.datastructures import FileStorage
+import ingest
+from ingest import ingest_listings
+from media import LocalStorage
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+ROW = {
+    "name": "Rex", "species": "Dog", "age": "3", "description": "Friendly", "ownerName": "Ann",
+    "phone": "9000000000", "street": "1 Park Street", "city": "Pune", "state": "MH",
+    "postalCode": "411001", "image": "rex.png"
+}
+
+
+def upload(rows, images):
+    manifest = "".join(json.dumps(row) + "\n" for row in rows).encode()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, data in images.items():
+            zf.writestr(name, data)
+    archive.seek(0)
+    return (
+        FileStorage(io.BytesIO(manifest), filename="rows.ndjson"),
+        FileStorage(archive, filename="images.zip")
+    )
+
+
+def run(db, storage, rows, images, **kwargs):
+    manifest, archive = upload(rows, images)
+    return ingest_listings(db, manifest, archive, "ann@example.com", storage, {"png"}, **kwargs)
+
+
+def test_unused_image_another_listing_shows_is_kept(mongo, tmp_path, monkeypatch):
+    db = mongo.db
+    storage = LocalStorage(str(tmp_path))
+
+    def insert_fails(db, batch, errors):
+        # Meanwhile an identical upload was stored and its listing written
+        db.pet_listings.insert_one({"_id": ObjectId(), "image": batch[0][1]["image"]})
+        errors.append({"row": batch[0][0], "error": "Database error: boom"})
+        return []
+    monkeypatch.setattr(ingest, "_insert_batch", insert_fails)
+
+    report = run(db, storage, [ROW], {"rex.png": PNG})
+
+    assert report["inserted"] == 0
+    (listing,) = db.pet_listings.find()
+    assert storage.exists(listing["image"].rsplit("/", 1)[-1])
+
+
+def test_unused_image_nobody_shows_is_removed(mongo, tmp_path, monkeypatch):
+    storage = LocalStorage(str(tmp_path))
+    monkeypatch.setattr(ingest, "_insert_batch", lambda db, batch, errors: [])
+
+    run(mongo.db, storage, [ROW], {"rex.png": PNG})
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_image_size_limit_comes_from_the_caller(mongo, tmp_path):
+    storage = LocalStorage(str(tmp_path))
+
+    report = run(mongo.db, storage, [ROW], {"rex.png": PNG}, max_image_bytes=len(PNG) - 1)
+
+    assert report["errors"] == [{"row": 1, "error": "Image too large"}]
+    assert mongo.db.pet_listings.count_documents({}) == 0
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,68 @@
+# backend/tests/test_leases.py
+import os
+import threading
+from datetime import datetime, timedelta
+from archive import ARCHIVED_LISTINGS, ListingArchiver
+from leases import Lease
+
+NOW = datetime(2024, 1, 1)
+
+
+def as_process(lease, name):
+    """Give ``lease`` its own holder id, as a separate worker process would have."""
+    lease._holder = (os.getpid(), name)
+    return lease
+
+
+def test_one_holder_until_the_lease_lapses(mongo):
+    first = as_process(Lease(mongo, "job", 60, grace=0), "worker-1")
+    second = as_process(Lease(mongo, "job", 60, grace=0), "worker-2")
+
+    assert first.acquire(NOW)
+    assert not second.acquire(NOW + timedelta(seconds=30))
+    # The holder renews on its own tick
+    assert first.acquire(NOW + timedelta(seconds=50))
+    assert not second.acquire(NOW + timedelta(seconds=100))
+    # A holder that stopped renewing loses it once the ttl has passed
+    assert second.acquire(NOW + timedelta(seconds=111))
+    assert not first.acquire(NOW + timedelta(seconds=120))
+    assert as_process(Lease(mongo, "other-job", 60), "worker-1").acquire(NOW)
+
+
+def test_only_the_lease_holder_archives(mongo, monkeypatch):
+    archivers = [ListingArchiver(mongo, interval=0.05) for _ in range(4)]
+    for i, archiver in enumerate(archivers):
+        as_process(archiver.lease, f"worker-{i}").ttl = timedelta(seconds=60)
+    runs = []
+
+    def run_once(self, still_held=None):
+        runs.append(self)
+    monkeypatch.setattr(ListingArchiver, "run_once", run_once)
+
+    stops = [archiver.start() for archiver in archivers]
+    threading.Event().wait(0.5)
+    for stop in stops:
+        stop.set()
+
+    assert runs and len(set(map(id, runs))) == 1
+
+
+def test_lease_outlasts_the_interval():
+    lease = Lease(None, "job", 60)
+
+    assert lease.ttl > timedelta(seconds=60)
+
+
+def test_pass_stops_once_the_lease_is_lost(mongo):
+    old = NOW - timedelta(days=200)
+    mongo.db.pet_listings.insert_many([
+        {"name": f"Pet {i}", "status": "Adopted", "created_at": old, "updated_at": old} for i in range(5)
+    ])
+    archiver = ListingArchiver(mongo, adopted_days=90, stale_days=0, batch_size=2)
+    renewals = iter([True, False])
+
+    moved = archiver.run_once(NOW, still_held=lambda: next(renewals))
+
+    assert moved == {"Adopted": (2, 0)}
+    assert mongo.db[ARCHIVED_LISTINGS].count_documents({}) == 2
+    assert mongo.db.pet_listings.count_documents({}) == 3
@@ -0,0 +1,69 @@
+# backend/tests/test_media.py
+import io
+import os
+from bson.objectid import ObjectId
+from indexes import ensure_indexes, verify_query_plans
+from media import LocalStorage, image_url, release_image, variant_filenames
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+
+
+def store_image(storage):
+    """Save one image with its variants; returns (url, every stored filename)."""
+    filename, _ = storage.save(io.BytesIO(PNG))
+    names = [filename, *variant_filenames(filename).values()]
+    for name in names[1:]:
+        storage.put(name, b"variant")
+    return image_url(filename), names
+
+
+class UploadDuringRelease(LocalStorage):
+    """Lets an identical upload's listing land while the files are moved aside."""
+
+    def __init__(self, folder, on_first_rename):
+        super().__init__(folder)
+        self.on_first_rename = on_first_rename
+
+    def rename(self, filename, new_filename):
+        if self.on_first_rename:
+            self.on_first_rename()
+            self.on_first_rename = None
+        super().rename(filename, new_filename)
+
+
+def test_unreferenced_image_is_deleted(mongo, tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    url, names = store_image(storage)
+
+    release_image(mongo.db, storage, url)
+
+    assert not any(storage.exists(name) for name in names)
+    assert os.listdir(tmp_path) == []
+
+
+def test_image_shown_by_another_listing_is_kept(mongo, tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    url, names = store_image(storage)
+    mongo.db.pet_listings.insert_one({"_id": ObjectId(), "image": url})
+
+    release_image(mongo.db, storage, url)
+
+    assert all(storage.exists(name) for name in names)
+
+
+def test_listing_added_during_release_keeps_its_image(mongo, tmp_path):
+    # The upload saw the file present, so it never stored its own copy
+    db = mongo.db
+    url = None
+    storage = UploadDuringRelease(str(tmp_path), lambda: db.pet_listings.insert_one({"_id": ObjectId(), "image": url}))
+    url, names = store_image(storage)
+
+    release_image(db, storage, url)
+
+    assert all(storage.exists(name) for name in names)
+    assert sorted(os.listdir(tmp_path)) == sorted(names)
+
+
+def test_image_lookups_use_an_index(mongo):
+    ensure_indexes(mongo.db)
+    verify_query_plans(mongo.db)
@@ -0,0 +1,42 @@
+# backend/tests/test_migrations.py
+from bson.objectid import ObjectId
+from indexes import ensure_indexes
+from migrations import migrate_embedded_adoption_requests
+
+
+def embedded_request(requester, status="Pending"):
+    return {"_id": ObjectId(), "requester_id": requester, "status": status}
+
+
+def test_duplicate_pending_requests_are_reported_not_counted(mongo):
+    db = mongo.db
+    ensure_indexes(db)
+    first, duplicate, rejected = (
+        embedded_request("a@example.com"),
+        embedded_request("a@example.com"),
+        embedded_request("b@example.com", "Rejected")
+    )
+    pet_id = db.pet_listings.insert_one({"adoption_requests": [first, duplicate, rejected]}).inserted_id
+
+    moved, dropped = migrate_embedded_adoption_requests(db)
+
+    assert moved == 2
+    assert [req["_id"] for req in dropped] == [duplicate["_id"]]
+    pet = db.pet_listings.find_one({"_id": pet_id})
+    assert (pet["pending_count"], pet["request_count"]) == (1, 2)
+    assert "adoption_requests" not in pet
+
+
+def test_rerun_counts_requests_an_earlier_run_copied(mongo):
+    db = mongo.db
+    ensure_indexes(db)
+    requests = [embedded_request("a@example.com"), embedded_request("b@example.com")]
+    pet_id = db.pet_listings.insert_one({"adoption_requests": requests}).inserted_id
+    # Interrupted after the copy, before the array was unset
+    db.adoption_requests.insert_one(dict(requests[0], pet_id=pet_id))
+
+    moved, dropped = migrate_embedded_adoption_requests(db)
+
+    assert (moved, dropped) == (2, [])
+    pet = db.pet_listings.find_one({"_id": pet_id})
+    assert (pet["pending_count"], pet["request_count"]) == (2, 2)
@@ -0,0 +1,152 @@
+# backend/tests/test_ratelimit.py
+import threading
+import pytest
+from flask_jwt_extended import create_access_token, jwt_required
+import ratelimit
+from ratelimit import LocalBucketStore, Quota, parse_rate_limits, rate_limited
+
+
+@pytest.fixture
+def build_app(make_app):
+    """Factory for the real app plus probe views that share the limiter with the write routes."""
+    return lambda config: with_probes(make_app(config))
+
+
+def with_probes(app):
+    held = threading.Event()
+    entered = threading.Event()
+
+    @jwt_required()
+    @rate_limited
+    def account_write():
+        return "", 201
+
+    @rate_limited
+    def address_write():
+        return "", 201
+
+    @rate_limited
+    def held_write():
+        entered.set()
+        held.wait(5)
+        return "", 201
+
+    for view in (account_write, address_write, held_write):
+        app.add_url_rule(f"/test/{view.__name__}", view.__name__, view, methods=["POST"])
+    app.extensions["test"] = {"held": held, "entered": entered}
+    return app
+
+
+def token_for(app, email):
+    with app.app_context():
+        return create_access_token(identity={"email": email, "role": "user", "name": email})
+
+
+def test_bucket_refills_at_the_quota_rate(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    store = LocalBucketStore()
+    quota = Quota(2, 60)
+
+    assert [store.take("k", quota) for _ in range(3)] == [0, 0, 30]
+    now[0] += 30
+    assert store.take("k", quota) == 0
+    assert store.take("other", quota) == 0
+
+
+def test_bucket_store_drops_least_recently_used_keys():
+    store = LocalBucketStore(max_keys=2)
+    for key in ["a", "b", "a", "c"]:
+        store.take(key, Quota(1, 60))
+    assert list(store._buckets) == ["a", "c"]
+
+
+def test_rate_limit_overrides():
+    quotas = parse_rate_limits("login=1/second,signup=off")
+    assert quotas["login"] == Quota(1, 1)
+    assert "signup" not in quotas
+    assert quotas["send_adoption_request"] == Quota(30, 3600)
+    for bad in ["login=x/minute", "login=5/fortnight", "login=-1/hour"]:
+        with pytest.raises(ValueError):
+            parse_rate_limits(bad)
+
+
+def test_quota_is_per_account_for_verified_tokens(base_config, build_app):
+    app = build_app(dict(base_config, RATE_LIMITS="account_write=2/minute"))
+    client = app.test_client()
+    ann = {"Authorization": f"Bearer {token_for(app, 'ann@example.com')}"}
+    bob = {"Authorization": f"Bearer {token_for(app, 'bob@example.com')}"}
+
+    # A new address does not reset an account's bucket
+    codes = [
+        client.post("/test/account_write", headers=ann, environ_base={"REMOTE_ADDR": f"10.0.0.{i}"}).status_code
+        for i in range(3)
+    ]
+    assert codes == [201, 201, 429]
+    limited = client.post("/test/account_write", headers=ann)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) == 30
+    assert client.post("/test/account_write", headers=bob).status_code == 201
+    # An invalid token is rejected by @jwt_required before it can spend a quota
+    assert client.post("/test/account_write", headers={"Authorization": "Bearer junk"}).status_code == 422
+
+
+def test_quota_is_per_address_without_a_token(base_config, build_app):
+    app = build_app(dict(base_config, RATE_LIMITS="address_write=2/minute,signup=1/minute"))
+    client = app.test_client()
+
+    codes = [client.post("/test/address_write").status_code for _ in range(3)]
+    assert codes == [201, 201, 429]
+    assert client.post("/test/address_write", environ_base={"REMOTE_ADDR": "10.0.0.9"}).status_code == 201
+    # The real routes carry the decorator too; the quota check comes before any Mongo work
+    assert client.post("/api/signup", json={}, environ_base={"REMOTE_ADDR": "10.0.0.8"}).status_code != 429
+    assert client.post("/api/signup", json={}, environ_base={"REMOTE_ADDR": "10.0.0.8"}).status_code == 429
+
+
+def test_quota_follows_the_forwarded_client_behind_a_trusted_proxy(base_config, build_app):
+    app = build_app(dict(base_config, RATE_LIMITS="address_write=1/minute", TRUSTED_PROXY_HOPS=1))
+    client = app.test_client()
+
+    def post(forwarded_for):
+        return client.post(
+            "/test/address_write",
+            headers={"X-Forwarded-For": forwarded_for},
+            environ_base={"REMOTE_ADDR": "10.0.0.1"}  # the proxy
+        ).status_code
+
+    assert [post("198.51.100.1"), post("198.51.100.2")] == [201, 201]
+    assert post("198.51.100.1") == 429
+    # Only the hop the proxy appended counts; a client cannot pick its own bucket
+    assert post("203.0.113.9, 198.51.100.2") == 429
+
+
+def test_writes_over_the_concurrency_cap_are_shed(base_config, build_app):
+    app = build_app(dict(base_config, RATE_LIMITS="held_write=100/second,address_write=100/second", WRITE_CONCURRENCY=1))
+    events = app.extensions["test"]
+    first = threading.Thread(target=lambda: app.test_client().post("/test/held_write"))
+    first.start()
+    assert events["entered"].wait(5)
+
+    shed = app.test_client().post("/test/address_write")
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+
+    events["held"].set()
+    first.join()
+    assert app.test_client().post("/test/address_write").status_code == 201
+
+
+def test_reads_pass_while_every_write_slot_is_held(app_config, build_app):
+    # The read p99 under a real flood is measured by benchmarks/bench_write_flood.py
+    app = build_app(dict(app_config, RATE_LIMITS="held_write=100/second,address_write=100/second", WRITE_CONCURRENCY=1))
+    events = app.extensions["test"]
+    writer = threading.Thread(target=lambda: app.test_client().post("/test/held_write"))
+    writer.start()
+    assert events["entered"].wait(5)
+    try:
+        assert app.test_client().post("/test/address_write").status_code == 503
+        assert app.test_client().get("/api/pet-listings").status_code == 200
+        assert writer.is_alive()
+    finally:
+        events["held"].set()
+        writer.join()
@@ -0,0 +1,30 @@
+# backend/tests/test_stats.py
+from collections import Counter
+from stats import STATS_COLLECTION, reconcile_stats, record_stats, stats_summary
+
+
+def test_reconcile_drops_counters_only_record_stats_wrote(mongo):
+    db = mongo.db
+    db.pet_listings.insert_one({"name": "Rex", "species": "Dog", "status": "Available"})
+    # An incremental update for a species whose listings are all gone again
+    record_stats(db, Counter({("listings_by_species", "Dog"): 1, ("listings_by_species", "Ferret"): 1}))
+    assert db[STATS_COLLECTION].count_documents({"_id": {"m": "listings_by_species", "k": "Ferret"}}) == 1
+
+    reconcile_stats(db)
+
+    summary = stats_summary(db[STATS_COLLECTION].find())
+    assert summary["listings"]["by_species"] == {"Dog": 1}
+    assert db[STATS_COLLECTION].count_documents({"_id.m": "listings_by_species"}) == 1
+
+
+def test_reconcile_stops_without_deleting_once_the_lease_is_lost(mongo):
+    db = mongo.db
+    db.pet_listings.insert_one({"name": "Rex", "species": "Dog", "status": "Available"})
+    record_stats(db, Counter({("listings_by_species", "Dog"): 1, ("listings_by_status", "Available"): 1}))
+    renewals = iter([True, False])
+
+    assert not reconcile_stats(db, ["listings_by_species", "listings_by_status"], still_held=lambda: next(renewals))
+
+    # Only the first metric was rebuilt; nothing was swept
+    assert db[STATS_COLLECTION].count_documents({"_id.m": "listings_by_status"}) == 1
+    assert db[STATS_COLLECTION].count_documents({"_id.m": "meta"}) == 0
@@ -0,0 +1,33 @@
+# backend/tests/test_telemetry.py
+import logging
+import logging.handlers
+
+
+def test_apps_share_one_log_handler(base_config, make_app):
+    for _ in range(3):
+        make_app(base_config)
+    handlers = logging.getLogger("petpal.requests").handlers
+    assert sum(isinstance(h, logging.handlers.QueueHandler) for h in handlers) == 1
+
+
+def test_metrics_are_closed_without_a_token(base_config, make_app):
+    client = make_app(base_config).test_client()
+    assert client.get("/metrics").status_code == 403
+
+
+def test_loopback_reads_metrics_only_when_allowed(base_config, make_app):
+    client = make_app(dict(base_config, METRICS_ALLOW_LOOPBACK=True)).test_client()
+    assert client.get("/metrics").status_code == 200
+    remote = client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.7"})
+    assert remote.status_code == 403
+
+
+def test_metrics_need_the_token_when_set(base_config, make_app):
+    client = make_app(dict(base_config, METRICS_TOKEN="scrape-me")).test_client()
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    scraped = client.get(
+        "/metrics", headers={"Authorization": "Bearer scrape-me"}, environ_base={"REMOTE_ADDR": "203.0.113.7"}
+    )
+    assert scraped.status_code == 200
+    assert b"petpal_http_request_duration_seconds" in scraped.data
@@ -0,0 +1,39 @@
+# backend/tests/test_tokens.py
+import flask_jwt_extended
+from flask_jwt_extended import create_access_token
+import app as app_module
+import tokens
+from tokens import CachingJWTManager, decode_hook_supported
+
+IDENTITY = {"email": "ann@example.com", "role": "user", "name": "Ann"}
+
+
+def me(app):
+    with app.app_context():
+        token = create_access_token(identity=IDENTITY)
+    return token, app.test_client().get("/api/me", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_installed_version_supports_the_decode_hook():
+    assert decode_hook_supported()
+
+
+def test_verified_tokens_are_cached(base_config, make_app):
+    app = make_app(base_config)
+    token, response = me(app)
+    assert response.status_code == 200
+    assert app.config["token_cache"].get(token) is not None
+
+
+def test_changed_decode_hook_falls_back_to_full_verification(base_config, monkeypatch, make_app):
+    def changed(self, encoded_token, csrf_value=None, allow_expired=False, *, verify=True):
+        return upstream(self, encoded_token, csrf_value, allow_expired)
+    upstream = flask_jwt_extended.JWTManager._decode_jwt_from_config
+    monkeypatch.setattr(flask_jwt_extended.JWTManager, "_decode_jwt_from_config", changed)
+    monkeypatch.setattr(app_module, "jwt", CachingJWTManager())
+
+    app = make_app(base_config)
+    token, response = me(app)
+    assert response.status_code == 200
+    assert app.config["token_cache"].get(token) is None
+    assert tokens.decode_hook_supported() is False
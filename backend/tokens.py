@@ -0,0 +1,209 @@
+# backend/tokens.py
+import hashlib
+import inspect
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from types import MethodType
+import jwt as pyjwt
+from flask import current_app
+from flask_jwt_extended import JWTManager
+
+logger = logging.getLogger("petpal.tokens")
+
+TOKEN_ISSUER = "pet-pal-app"
+TOKEN_AUDIENCE = "pet-pal-users"
+# Stream tokens carry their own audience, so access token checks reject them
+# and the /api/events check rejects access tokens
+STREAM_TOKEN_AUDIENCE = "pet-pal-events"
+DEFAULT_TOKEN_CACHE_ENTRIES = 4096
+DEFAULT_STREAM_TOKEN_TTL = 60
+
+
+class VerifiedTokenCache:
+    """LRU of the decoded claims of tokens that already passed verification.
+
+    Entries are keyed by the token's SHA-256 digest, so the cache holds no
+    usable credentials. A token with an ``exp`` claim is dropped once it
+    expires and goes through full verification again, which rejects it.
+    """
+
+    def __init__(self, max_entries=DEFAULT_TOKEN_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get("JWT_TOKEN_CACHE_SIZE", DEFAULT_TOKEN_CACHE_ENTRIES))
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode() if isinstance(token, str) else token).digest()
+
+    def get(self, token):
+        key = self.digest(token)
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                return None
+            if "exp" in claims and claims["exp"] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Callers may add defaults to the claims; keep the cached copy intact
+        return dict(claims)
+
+    def set(self, token, claims):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[self.digest(token)] = dict(claims)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def decode_hook_supported():
+    """True if JWTManager still decodes through the private method CachingJWTManager overrides.
+
+    flask_jwt_extended offers no public hook for caching decodes, so the
+    override is tied to the 4.x signature of _decode_jwt_from_config; any
+    other shape means the override could skip or break verification.
+    """
+    method = getattr(JWTManager, "_decode_jwt_from_config", None)
+    if method is None:
+        return False
+    return list(inspect.signature(method).parameters) == ["self", "encoded_token", "csrf_value", "allow_expired"]
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips the signature check for recently verified tokens.
+
+    Reads the app's VerifiedTokenCache from ``config["token_cache"]``; apps
+    without one decode every token as usual. Cookie tokens (CSRF checks)
+    and allow_expired decodes always take the full path, and so does every
+    token when the installed flask_jwt_extended no longer matches the
+    private method overridden here (see decode_hook_supported).
+    """
+
+    def __init__(self, app=None, **kwargs):
+        if not decode_hook_supported():
+            logger.warning(
+                "flask_jwt_extended changed JWTManager._decode_jwt_from_config; "
+                "verified tokens are not cached and every request checks the signature"
+            )
+            # Shadow the override with the upstream method, whatever its signature
+            upstream = getattr(JWTManager, "_decode_jwt_from_config", None)
+            if upstream is not None:
+                self._decode_jwt_from_config = MethodType(upstream, self)
+        super().__init__(app, **kwargs)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = current_app.config.get("token_cache")
+        if cache is None or csrf_value or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        claims = cache.get(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            cache.set(encoded_token, claims)
+        return claims
+
+
+# --- Access tokens without flask_jwt_extended, for the Quart app (asgi.py).
+# Tokens and error answers match what flask_jwt_extended issues and sends.
+
+class AuthorizationError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def bearer_token(header):
+    """The JWT from an ``Authorization: Bearer <JWT>`` header; raises AuthorizationError."""
+    header = (header or "").strip().strip(",")
+    if not header:
+        raise AuthorizationError("Missing Authorization Header", 401)
+    bearer = [value for value in re.split(r",\s*", header) if value and value.split()[0] == "Bearer"]
+    if len(bearer) != 1:
+        raise AuthorizationError(
+            "Missing 'Bearer' type in 'Authorization' header. Expected 'Authorization: Bearer <JWT>'", 401
+        )
+    parts = bearer[0].split()
+    if len(parts) != 2:
+        raise AuthorizationError("Bad Authorization header. Expected 'Authorization: Bearer <JWT>'", 422)
+    return parts[1]
+
+
+def encode_access_token(identity, config):
+    now = datetime.now(timezone.utc)
+    return pyjwt.encode({
+        "fresh": False,
+        "iat": now,
+        "jti": str(uuid.uuid4()),
+        "type": "access",
+        "identity": identity,
+        "iss": config["JWT_ENCODE_ISSUER"],
+        "aud": config["JWT_ENCODE_AUDIENCE"]
+    }, config["JWT_SECRET_KEY"], algorithm="HS256")
+
+
+def decode_access_token(token, config, cache):
+    """Claims of a valid access token, from ``cache`` when it was seen before.
+
+    Raises pyjwt.InvalidTokenError; token_error gives the response for it.
+    """
+    claims = cache.get(token)
+    if claims is None:
+        claims = pyjwt.decode(
+            token,
+            config["JWT_SECRET_KEY"],
+            algorithms=["HS256"],
+            audience=config["JWT_DECODE_AUDIENCE"],
+            issuer=config["JWT_DECODE_ISSUER"]
+        )
+        if "identity" not in claims:
+            raise pyjwt.MissingRequiredClaimError("identity")
+        cache.set(token, claims)
+    return claims
+
+
+def token_error(e):
+    """The (body, status) flask_jwt_extended answers a rejected token with."""
+    if isinstance(e, AuthorizationError):
+        return {"msg": e.message}, e.status_code
+    if isinstance(e, pyjwt.ExpiredSignatureError):
+        return {"msg": "Token has expired"}, 401
+    if isinstance(e, pyjwt.MissingRequiredClaimError):
+        return {"msg": f"Missing claim: {e.claim}"}, 422
+    return {"msg": str(e)}, 422
+
+
+def create_stream_token(identity, secret, ttl=DEFAULT_STREAM_TOKEN_TTL):
+    """A short-lived token that only opens the /api/events stream.
+
+    EventSource cannot send headers, so the stream token travels in the URL
+    where proxies and browser history keep it; it is only checked when the
+    stream connects, so it can expire quickly.
+    """
+    now = datetime.now(timezone.utc)
+    return pyjwt.encode({
+        "identity": identity,
+        "iss": TOKEN_ISSUER,
+        "aud": STREAM_TOKEN_AUDIENCE,
+        "iat": now,
+        "exp": now + timedelta(seconds=ttl)
+    }, secret, algorithm="HS256")
+
+
+def stream_token_identity(token, secret):
+    """Identity of a valid stream token; raises pyjwt.InvalidTokenError."""
+    claims = pyjwt.decode(
+        token, secret, algorithms=["HS256"], audience=STREAM_TOKEN_AUDIENCE, issuer=TOKEN_ISSUER,
+        options={"require": ["exp", "identity"]}
+    )
+    return claims["identity"]
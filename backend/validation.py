@@ -0,0 +1,122 @@
+# backend/validation.py
+from datetime import datetime
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+LISTING_FIELDS = ["name", "species", "age", "description", "ownerName", "phone", "street", "city", "state", "postalCode"]
+ADOPTION_REQUEST_FIELDS = [
+    "pet_listing_id", "contact", "address", "city",
+    "state", "postalCode", "homeType", "hoursAlone",
+    "petExperience", "adoptionReason"
+]
+
+
+class ValidationError(Exception):
+    def __init__(self, message, status_code=400, **extra):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = {"error": message, **extra}
+
+
+def allowed_file(filename, allowed_extensions):
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in allowed_extensions
+
+
+def listing_from_form(data, owner, centroids=None):
+    """Validate pet listing form fields and build the listing document.
+
+    The caller fills in ``image`` once the upload has been stored. With
+    ``centroids`` the listing gets a GeoJSON ``location`` from its postal
+    code when the code is known.
+    """
+    if not all(field in data for field in LISTING_FIELDS):
+        raise ValidationError("Missing required fields")
+
+    # Validate string fields
+    for field in ["name", "species", "description"]:
+        if not isinstance(data.get(field), str) or not data[field].strip():
+            raise ValidationError(f"{field} must be a non-empty string", 422)
+
+    # Validate age
+    try:
+        age = int(data["age"])
+        if age <= 0:
+            raise ValueError
+    except (ValueError, TypeError):
+        raise ValidationError("Age must be a positive integer", 422)
+
+    # Validate phone
+    phone = str(data["phone"])
+    if not phone.isdigit() or len(phone) != 10:
+        raise ValidationError("Phone must be 10 digits", 422)
+
+    listing = {
+        "name": data["name"],
+        "species": data["species"],
+        "age": age,
+        "description": data["description"],
+        "image": None,
+        "owner": owner,
+        "owner_contact": {
+            "name": data["ownerName"],
+            "phone": phone,
+            "address": {
+                "street": data["street"],
+                "city": data["city"],
+                "state": data["state"],
+                "postal_code": data["postalCode"]
+            }
+        },
+        "status": "Available",
+        "pending_count": 0,
+        "request_count": 0,
+        "created_at": datetime.utcnow()
+    }
+    location = centroids.lookup(data["postalCode"]) if centroids else None
+    if location:
+        listing["location"] = location
+    return listing
+
+
+def adoption_request_from_json(data, user):
+    """Validate an adoption application and build the request document."""
+    if not data:
+        raise ValidationError("No JSON data received")
+
+    missing_fields = [field for field in ADOPTION_REQUEST_FIELDS if field not in data]
+    if missing_fields:
+        raise ValidationError("Missing required fields", missing=missing_fields)
+
+    try:
+        pet_listing_id = ObjectId(data["pet_listing_id"])
+    except (InvalidId, TypeError):
+        raise ValidationError("Invalid pet listing ID format")
+
+    return {
+        "_id": str(ObjectId()),
+        "pet_id": pet_listing_id,
+        "requester_id": user["email"],
+        "requester_name": user.get("name", ""),
+        "contact_info": {
+            "phone": data["contact"],
+            "address": {
+                "street": data["address"],
+                "city": data["city"],
+                "state": data["state"],
+                "postal_code": data["postalCode"]
+            }
+        },
+        "home_info": {
+            "type": data["homeType"],
+            "yard_size": data.get("yardSize", ""),
+            "hours_alone": data["hoursAlone"]
+        },
+        "experience": {
+            "other_pets": data.get("otherPets", ""),
+            "previous_experience": data["petExperience"]
+        },
+        "reason": data["adoptionReason"],
+        "status": "Pending",
+        "request_date": datetime.utcnow()
+    }
@@ -0,0 +1,17 @@
+# backend/wsgi.py
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is built once in the gunicorn master (preload_app) and shared by
+the forked workers; each worker opens its own MongoDB pool on first use.
+The index manifest is applied here, before any worker serves; if the
+database is unreachable, or PETPAL_CHECK_QUERY_PLANS finds a collection scan,
+the server does not start. Set ENSURE_INDEXES=0 when a deploy step runs
+`flask ensure-indexes --check` instead.
+"""
+from app import create_app, prepare_database
+
+app = create_app()
+if app.config["ENSURE_INDEXES"]:
+    prepare_database(app)
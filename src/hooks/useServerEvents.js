@@ -0,0 +1,84 @@
+// src/hooks/useServerEvents.js
+import { useEffect, useRef } from 'react';
+import axios from 'axios';
+
+const RECONNECT_MS = 3000;
+
+// Subscribes to the server's /api/events stream while the component is mounted.
+// EventSource cannot send headers, so the stream is opened with a short-lived
+// token that only works for /api/events, never with the login token. Stream
+// tokens expire within a minute, so when the connection closes for good (the
+// server refused it, or the browser's retry used an expired token) a new token
+// is fetched and the stream reopened from the last event seen.
+const useServerEvents = (types, onEvent) => {
+  const handler = useRef(onEvent);
+
+  useEffect(() => {
+    handler.current = onEvent;
+  }, [onEvent]);
+
+  const typeList = types.join(',');
+  useEffect(() => {
+    const token = localStorage.getItem('token');
+    if (!token) {
+      return undefined;
+    }
+    let source = null;
+    let retry = null;
+    let closed = false;
+    let lastEventId = '';
+
+    const listener = (event) => {
+      lastEventId = event.lastEventId || lastEventId;
+      handler.current(event.type, JSON.parse(event.data));
+    };
+
+    const reconnect = () => {
+      if (!closed) {
+        retry = setTimeout(connect, RECONNECT_MS);
+      }
+    };
+
+    const connect = async () => {
+      try {
+        const { data } = await axios.post(
+          'http://localhost:5000/api/events/token',
+          null,
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
+        if (closed) {
+          return;
+        }
+        const params = new URLSearchParams({ token: data.token });
+        if (lastEventId) {
+          params.set('last_event_id', lastEventId);
+        }
+        source = new EventSource(`http://localhost:5000/api/events?${params}`);
+        typeList.split(',').forEach(type => source.addEventListener(type, listener));
+        source.onerror = () => {
+          // CONNECTING means the browser retries by itself; CLOSED means it gave up
+          if (source.readyState === EventSource.CLOSED) {
+            reconnect();
+          }
+        };
+      } catch (err) {
+        // A rejected login token will not get better by retrying
+        const status = err.response?.status;
+        if (status !== 401 && status !== 422) {
+          reconnect();
+        }
+      }
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      if (source) {
+        source.close();
+      }
+    };
+  }, [typeList]);
+};
+
+export default useServerEvents;
@@ -1,31 +1,95 @@
   // src/pages/AdminDashboard.js
   import React, { useState, useEffect } from 'react';
   import axios from 'axios';
-  import { Container, Tab, Tabs, Table, Card } from 'react-bootstrap';
+  import { Container, Tab, Tabs, Table, Card, Button, Row, Col } from 'react-bootstrap';
 
   const AdminDashboard = () => {
     const [users, setUsers]         = useState([]);
     const [petListings, setPetListings] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [stats, setStats]         = useState(null);
     const token = localStorage.getItem('token');
 
     useEffect(() => {
+      axios.get('http://localhost:5000/api/admin/stats', {
+        headers: { Authorization: `Bearer ${token}` }
+      })
+      .then(res => setStats(res.data))
+      .catch(err => console.error(err));
+
       axios.get('http://localhost:5000/api/admin/users', {
         headers: { Authorization: `Bearer ${token}` }
       })
       .then(res => setUsers(res.data))
       .catch(err => console.error(err));
 
+      fetchPetListings();
+    }, [token]);
+
+    const fetchPetListings = (cursor = null) => {
       axios.get('http://localhost:5000/api/admin/pet-listings', {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: { Authorization: `Bearer ${token}` },
+        params: cursor ? { cursor } : {}
+      })
+      .then(res => {
+        setPetListings(prev => cursor ? [...prev, ...res.data.items] : res.data.items);
+        setNextCursor(res.data.next);
       })
-      .then(res => setPetListings(res.data))
       .catch(err => console.error(err));
-    }, [token]);
+    };
+
+    const countList = (counts) => (
+      Object.entries(counts).map(([key, count]) => (
+        <div key={key}>{key}: {count}</div>
+      ))
+    );
 
     return (
       <Container className="my-4">
         <h2>Admin Dashboard</h2>
-        <Tabs defaultActiveKey="users" id="admin-tabs" className="mb-3">
+        <Tabs defaultActiveKey="overview" id="admin-tabs" className="mb-3">
+          <Tab eventKey="overview" title="Overview">
+            {stats && (
+              <Row>
+                <Col md={3}>
+                  <Card className="mb-3">
+                    <Card.Body>
+                      <Card.Title>Users ({stats.users.total})</Card.Title>
+                      {countList(stats.users.by_role)}
+                    </Card.Body>
+                  </Card>
+                </Col>
+                <Col md={3}>
+                  <Card className="mb-3">
+                    <Card.Body>
+                      <Card.Title>Listings ({stats.listings.total})</Card.Title>
+                      {countList(stats.listings.by_status)}
+                      <hr />
+                      {countList(stats.listings.by_species)}
+                    </Card.Body>
+                  </Card>
+                </Col>
+                <Col md={3}>
+                  <Card className="mb-3">
+                    <Card.Body>
+                      <Card.Title>Requests ({stats.requests.total})</Card.Title>
+                      {countList(stats.requests.by_status)}
+                    </Card.Body>
+                  </Card>
+                </Col>
+                <Col md={3}>
+                  <Card className="mb-3">
+                    <Card.Body>
+                      <Card.Title>Adoptions (30 days)</Card.Title>
+                      {stats.adoptions_per_day.map(day => (
+                        <div key={day.day}>{day.day}: {day.count}</div>
+                      ))}
+                    </Card.Body>
+                  </Card>
+                </Col>
+              </Row>
+            )}
+          </Tab>
           <Tab eventKey="users" title="Users">
             <Table striped bordered hover>
               <thead>
@@ -60,6 +124,11 @@
                 </Card.Body>
               </Card>
             ))}
+            {nextCursor && (
+              <Button variant="outline-primary" onClick={() => fetchPetListings(nextCursor)}>
+                Load more
+              </Button>
+            )}
           </Tab>
         </Tabs>
       </Container>
@@ -1,9 +1,10 @@
-import React, { useState, useEffect, useContext } from 'react';
+import React, { useState, useEffect, useContext, useCallback } from 'react';
 import axios from 'axios';
 import { Container, Card, Button, Row, Col, Badge, Alert, Modal } from 'react-bootstrap';
 import { AuthContext } from '../contexts/AuthContext';
 import { FaPaw, FaTimes, FaCheck, FaClock, FaTrash, FaInfoCircle } from 'react-icons/fa';
 import { useNavigate } from 'react-router-dom';
+import useServerEvents from '../hooks/useServerEvents';
 
 const MyAdoptionRequests = () => {
   const [requests, setRequests] = useState([]);
@@ -15,25 +16,33 @@ const MyAdoptionRequests = () => {
   const { user } = useContext(AuthContext);
   const navigate = useNavigate();
 
-  useEffect(() => {
-    const fetchRequests = async () => {
-      try {
-        const response = await axios.get('http://localhost:5000/api/my-adoption-requests', {
-          headers: { Authorization: `Bearer ${localStorage.getItem('token')}` }
-        });
-        setRequests(response.data);
-      } catch (err) {
-        console.error('Error fetching requests:', err);
-        setError('Failed to load your adoption requests');
-      } finally {
-        setLoading(false);
-      }
-    };
+  const fetchRequests = useCallback(async () => {
+    try {
+      const response = await axios.get('http://localhost:5000/api/my-adoption-requests', {
+        headers: { Authorization: `Bearer ${localStorage.getItem('token')}` }
+      });
+      setRequests(response.data);
+    } catch (err) {
+      console.error('Error fetching requests:', err);
+      setError('Failed to load your adoption requests');
+    } finally {
+      setLoading(false);
+    }
+  }, []);
 
+  useEffect(() => {
     if (user) {
       fetchRequests();
     }
-  }, [user]);
+  }, [user, fetchRequests]);
+
+  // Decisions on a request and listing status changes are pushed by the server
+  useServerEvents(['adoption_request.updated', 'listing.status'], (type, data) => {
+    if (type === 'adoption_request.updated') {
+      setMessage(`Your request for ${data.pet_name} was ${data.status.toLowerCase()}`);
+    }
+    fetchRequests();
+  });
 
   const handleWithdrawRequest = (requestId) => {
     setRequestToDelete(requestId);
@@ -2,6 +2,25 @@ import React, { useState, useEffect, useContext } from 'react';
 import axios from 'axios';
 import { Container, Card, Button, Alert, Badge, Accordion, Modal } from 'react-bootstrap';
 import { AuthContext } from '../contexts/AuthContext';
+import useServerEvents from '../hooks/useServerEvents';
+
+// The endpoint is cursor-paginated; follow `next` until every listing is loaded
+const fetchMyListings = async (token) => {
+  let listings = [];
+  let cursor = null;
+  do {
+    const { data } = await axios.get(
+      'http://localhost:5000/api/my-pet-listings',
+      {
+        headers: { Authorization: `Bearer ${token}` },
+        params: cursor ? { cursor } : {}
+      }
+    );
+    listings = listings.concat(data.items);
+    cursor = data.next;
+  } while (cursor);
+  return listings;
+};
 
 const MyPetListings = () => {
   const [listings, setListings] = useState([]);
@@ -15,11 +34,7 @@ const MyPetListings = () => {
   useEffect(() => {
     const fetchListings = async () => {
       try {
-        const response = await axios.get(
-          'http://localhost:5000/api/my-pet-listings',
-          { headers: { Authorization: `Bearer ${token}` } }
-        );
-        setListings(response.data);
+        setListings(await fetchMyListings(token));
       } catch (err) {
         console.error('Error fetching listings:', err);
         setError('Failed to load your pet listings');
@@ -31,6 +46,18 @@ const MyPetListings = () => {
     }
   }, [token, user]);
 
+  // New and withdrawn applications are pushed by the server instead of reloaded
+  useServerEvents(['adoption_request.created', 'adoption_request.withdrawn'], async (type, data) => {
+    setMessage(type === 'adoption_request.created'
+      ? `New adoption request for ${data.pet_name}`
+      : `An adoption request for ${data.pet_name} was withdrawn`);
+    try {
+      setListings(await fetchMyListings(token));
+    } catch (err) {
+      console.error('Error refreshing listings:', err);
+    }
+  });
+
   const handleDeleteClick = (petId) => {
     setPetToDelete(petId);
     setShowDeleteModal(true);
@@ -56,43 +83,16 @@ const MyPetListings = () => {
 
   const handleApproveRequest = async (petId, requestId) => {
     try {
-      // Approve the selected request
+      // The server marks the pet adopted and rejects the other pending requests
       await axios.put(
         `http://localhost:5000/api/adoption-request/${petId}/${requestId}`,
         { status: 'Approved' },
         { headers: { Authorization: `Bearer ${token}` } }
       );
 
-      // Mark pet as adopted
-      await axios.patch(
-        `http://localhost:5000/api/pet-listing/${petId}`,
-        { status: 'Adopted' },
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
-
-      // Reject all other pending requests
-      const pet = listings.find(p => p._id === petId);
-      const otherRequests = pet.adoption_requests.filter(
-        req => req._id !== requestId && req.status === 'Pending'
-      );
-
-      await Promise.all(
-        otherRequests.map(req =>
-          axios.put(
-            `http://localhost:5000/api/adoption-request/${petId}/${req._id}`,
-            { status: 'Rejected' },
-            { headers: { Authorization: `Bearer ${token}`, 'Content-Type': 'application/json' } }
-          )
-        )
-      );
-
       setMessage('Adoption request approved successfully!');
       // Refresh listings
-      const updatedResponse = await axios.get(
-        'http://localhost:5000/api/my-pet-listings',
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
-      setListings(updatedResponse.data);
+      setListings(await fetchMyListings(token));
     } catch (err) {
       console.error('Error approving request:', err);
       setError('Failed to approve adoption request');
@@ -101,35 +101,16 @@ const MyPetListings = () => {
 
   const handleRejectRequest = async (petId, requestId) => {
     try {
-      // Reject the specific request
+      // The server returns the pet to Available once no requests are pending
       await axios.put(
         `http://localhost:5000/api/adoption-request/${petId}/${requestId}`,
         { status: 'Rejected' },
         { headers: { Authorization: `Bearer ${token}` } }
       );
 
-      // Check if this was the last pending request
-      const pet = listings.find(p => p._id === petId);
-      const hasPendingRequests = pet.adoption_requests.some(
-        req => req.status === 'Pending' && req._id !== requestId
-      );
-
-      // If no more pending requests, set status back to Available
-      if (!hasPendingRequests) {
-        await axios.patch(
-          `http://localhost:5000/api/pet-listing/${petId}`,
-          { status: 'Available' },
-          { headers: { Authorization: `Bearer ${token}` } }
-        );
-      }
-
       setMessage('Adoption request rejected successfully!');
       // Refresh listings
-      const updatedResponse = await axios.get(
-        'http://localhost:5000/api/my-pet-listings',
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
-      setListings(updatedResponse.data);
+      setListings(await fetchMyListings(token));
     } catch (err) {
       console.error('Error rejecting request:', err);
       setError('Failed to reject adoption request');